@@ -10,12 +10,39 @@ class NodePubEntry(DataClassJsonMixin):
     ip: str
     port: int
 
+    # Publisher's process and endpoints per transport (tcp, ipc, inproc)
+    pid: int = 0
+    endpoints: Dict[str, str] = field(default_factory=dict)
+
 
 @dataclass
 class NodePubTable(DataClassJsonMixin):
     table: Dict[str, NodePubEntry] = field(default_factory=dict)
 
 
+@dataclass
+class PublisherStats(DataClassJsonMixin):
+    queued: int = 0  # messages accepted by the publisher
+    sent: int = 0
+    dropped: int = 0  # by the backpressure policy
+
+
+@dataclass
+class SubscriberStats(DataClassJsonMixin):
+    received: int = 0
+    gaps: int = 0  # breaks in the publisher's sequence numbers
+    dropped: int = 0  # messages missing from the sequence
+    unmatched: int = 0  # discarded by the poller's synchronization
+
+
+@dataclass
+class SchedulerStats(DataClassJsonMixin):
+    steps: int = 0
+    overruns: int = 0  # steps that ended after the next deadline
+    jitter: float = 0  # ms, mean delay of the steps after their deadline
+    max_jitter: float = 0  # ms
+
+
 @dataclass
 class NodeDiagnostics(DataClassJsonMixin):
     timestamp: str = field(
@@ -26,3 +53,6 @@ class NodeDiagnostics(DataClassJsonMixin):
     memory_usage: float = 0  # KB
     cpu_usage: float = 0  # percentage
     num_of_steps: int = 0
+    publisher: PublisherStats = field(default_factory=PublisherStats)
+    subscribers: Dict[str, SubscriberStats] = field(default_factory=dict)
+    scheduler: SchedulerStats = field(default_factory=SchedulerStats)
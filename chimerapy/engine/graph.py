@@ -1,12 +1,17 @@
 import copy
-from typing import Sequence
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import dill
 import networkx as nx
 import numpy as np
 
 from chimerapy.engine import _logger
 
+from .networking.publisher import BackpressurePolicy
+from .networking.subscriber import DeliveryMode
 from .node import Node
+from .node.poller_service import SyncPolicy
 
 logger = _logger.getLogger("chimerapy-engine")
 
@@ -22,14 +27,116 @@ class Graph:
         name_id_map = {data["object"].name: n for n, data in self.G.nodes(data=True)}
         return name_id_map[node_name]
 
-    def add_node(self, node: Node):
-        self.G.add_node(node.id, object=node, follow=None)
+    def add_node(
+        self,
+        node: Node,
+        publisher_policy: BackpressurePolicy = "drop-newest",
+        publisher_queue_size: int = 1,
+        streams: Optional[Dict[str, List[str]]] = None,
+        sync: SyncPolicy = "follow-latest",
+        sync_slop: Optional[float] = None,
+        sync_buffer_size: Optional[int] = None,
+        replicas: int = 1,
+        batch_size: int = 1,
+        batch_timeout: float = 0.01,
+        rate: Optional[float] = None,
+        pipelined: bool = False,
+        cpu_affinity: Optional[List[int]] = None,
+    ):
+        """Add a ``Node`` to the ``Graph``.
 
-    def add_nodes_from(self, nodes: Sequence[Node]):
-        self.G.add_nodes_from([(n.id, {"object": n, "follow": None}) for n in nodes])
+        Args:
+            node (Node): The node.
+            publisher_policy (BackpressurePolicy): What the node's \
+                publisher does when it cannot keep up, see ``Publisher``.
+            publisher_queue_size (int): Size of the publisher's queue.
+            streams (Optional[Dict[str, List[str]]]): Named streams of the \
+                node, each with only the given records of its outputs, \
+                for edges that don't need all of them.
+            sync (SyncPolicy): How the node combines its inputs to step, \
+                see ``PollerService``.
+            sync_slop (Optional[float]): Maximum time (in seconds) between \
+                inputs matched by ``approximate-time``.
+            sync_buffer_size (Optional[int]): Messages kept per input while \
+                waiting for a match.
+            replicas (int): Number of instances of a stateless node with \
+                inputs, each stepping for its share of the followed input, \
+                see ``expand_replicas``. Each replica still receives all \
+                the inputs, multiplying the node's ingress by ``replicas``.
+            batch_size (int): Above one, ``step`` receives a list of up to \
+                ``batch_size`` input sets. Replicated nodes must return a \
+                list with one output per input set.
+            batch_timeout (float): Maximum time (in seconds) to collect a \
+                batch.
+            rate (Optional[float]): Steps per second of a source node, as \
+                fast as possible by default.
+            pipelined (bool): If a node with inputs steps in a thread, \
+                while the next inputs are decoded and the previous output \
+                encoded and published.
+            cpu_affinity (Optional[List[int]]): CPUs the node's process is \
+                pinned to, with the multiprocessing context.
+
+        """
+        self.G.add_node(
+            node.id,
+            object=node,
+            follow=None,
+            publisher_policy=publisher_policy,
+            publisher_queue_size=publisher_queue_size,
+            streams=streams or {},
+            sync=sync,
+            sync_slop=sync_slop,
+            sync_buffer_size=sync_buffer_size,
+            replicas=replicas,
+            batch_size=batch_size,
+            batch_timeout=batch_timeout,
+            rate=rate,
+            pipelined=pipelined,
+            cpu_affinity=cpu_affinity,
+        )
+
+    def add_nodes_from(self, nodes: Sequence[Node], **kwargs: Any):
+        """Add several ``Node``s to the ``Graph``.
+
+        Args:
+            nodes (Sequence[Node]): The nodes.
+            **kwargs: The options of ``add_node``, for all of them.
+
+        """
+        for node in nodes:
+            self.add_node(node, **kwargs)
+
+    def add_edge(
+        self,
+        src: Node,
+        dst: Node,
+        follow: bool = False,
+        delivery: DeliveryMode = "conflate",
+        hwm: Optional[int] = None,
+        stream: str = "",
+    ):
+        """Connect the output of ``src`` to the input of ``dst``.
+
+        Args:
+            src (Node): The source node.
+            dst (Node): The destination node.
+            follow (bool): If ``dst`` steps when ``src`` has new data.
+            delivery (DeliveryMode): ``conflate`` to only receive the \
+                latest data or ``lossless`` for the complete stream, see \
+                ``Subscriber.subscribe``.
+            hwm (Optional[int]): Maximum number of queued messages with \
+                ``lossless``.
+            stream (str): The stream of ``src`` to receive, its complete \
+                outputs by default.
+
+        Raises:
+            ValueError: If ``src`` has no such stream.
+
+        """
+        if stream and stream not in self.G.nodes[src.id].get("streams", {}):
+            raise ValueError(f"{src.name} has no stream '{stream}'")
 
-    def add_edge(self, src: Node, dst: Node, follow: bool = False):
-        self.G.add_edge(src.id, dst.id)
+        self.G.add_edge(src.id, dst.id, delivery=delivery, hwm=hwm, stream=stream)
 
         # If the first edge, use that as the default follow parameter
         if len(self.G.in_edges(dst.id)) == 1 or follow:
@@ -41,6 +148,61 @@ class Graph:
         for edge in list_of_edges:
             self.add_edge(src=edge[0], dst=edge[1])
 
+    def expand_replicas(self) -> Tuple["Graph", Dict[str, List[str]]]:
+        """Replace the replicated nodes by their replicas.
+
+        Each replica is a copy of the node, with a new id, that receives \
+        all the node's inputs (the ingress of the node, times the number \
+        of replicas, as the publishers don't route messages) but only steps for the messages of the \
+        followed input whose sequence number modulo the number of replicas \
+        is its index. Their edges are therefore ``lossless``. The nodes \
+        after them merge the replicas' outputs back in the order of their \
+        inputs, as a single input named after the replicated node.
+
+        Returns:
+            Tuple[Graph, Dict[str, List[str]]]: The new graph, and the ids \
+                of each replicated node's replicas.
+
+        Raises:
+            ValueError: If a replicated node has no inputs.
+
+        """
+        graph = Graph(self.G)
+        replicas: Dict[str, List[str]] = {}
+
+        for node_id, data in self.G.nodes(data=True):
+            count = data.get("replicas", 1)
+            if count <= 1:
+                continue
+
+            node = data["object"]
+            if not self.G.in_degree(node_id):
+                raise ValueError(f"{node.name} has no inputs to be replicated")
+
+            node_bytes = dill.dumps(node, recurse=True)
+            replicas[node_id] = []
+            for index in range(count):
+                replica = dill.loads(node_bytes)
+                replica.state.id = str(uuid.uuid4())
+                replica.state.name = f"{node.name}-{index}"
+                replicas[node_id].append(replica.id)
+
+                attributes = {**graph.G.nodes[node_id], "object": replica}
+                attributes.update(replicas=1, replica=(index, count))
+                attributes.update(replica_of=node_id, replica_of_name=node.name)
+                graph.G.add_node(replica.id, **attributes)
+
+                for src, _, edge in graph.G.in_edges(node_id, data=True):
+                    graph.G.add_edge(
+                        src, replica.id, **{**edge, "delivery": "lossless"}
+                    )
+                for _, dst, edge in graph.G.out_edges(node_id, data=True):
+                    graph.G.add_edge(replica.id, dst, **edge)
+
+            graph.G.remove_node(node_id)
+
+        return graph, replicas
+
     def is_valid(self):
         """Checks if ``Graph`` is a true DAG."""
         return nx.is_directed_acyclic_graph(self.G)
@@ -19,10 +19,11 @@ from ..eventbus import Event, EventBus, TypedObserver, make_evented
 from ..exceptions import CommitGraphError
 from ..graph import Graph
 from ..networking import Client, DataChunk
+from ..networking.subscriber import DeliveryMode
 from ..node import NodeConfig
 from ..service import Service
 from ..states import ManagerState, WorkerState
-from ..utils import async_waiting_for
+from ..utils import ChangeNotifier
 from .events import (
     DeregisterEntityEvent,
     MoveTransferredFilesEvent,
@@ -47,10 +48,13 @@ class WorkerHandlerService(Service):
         # Containers
         self.graph: Graph = Graph()
         self.graph_dumps: Dict[str, bytes] = {}
+        self.replicas: Dict[str, List[str]] = {}
         self.worker_graph_map: Dict = {}
         self.commitable_graph: bool = False
         self.node_pub_table = NodePubTable()
+        self.worker_node_pub_tables: Dict[str, NodePubTable] = {}
         self.collected_workers: Dict[str, bool] = {}
+        self.collected_changes = ChangeNotifier()
         self.http_client = aiohttp.ClientSession()
 
         # Also create a tempfolder to store any miscellaneous files and folders
@@ -164,6 +168,7 @@ class WorkerHandlerService(Service):
 
     async def update_send_archive(self, worker_id: str, success: bool):
         self.collected_workers[worker_id] = success
+        self.collected_changes.notify()
 
     def _register_graph(self, graph: Graph):
         """Verifying that a Graph is valid, that is a DAG.
@@ -181,8 +186,8 @@ class WorkerHandlerService(Service):
             logger.error("Invalid Graph - rejected!")
             raise CommitGraphError("Invalid Graph, not DAG - rejected!")
 
-        # Else, let's save it
-        self.graph = graph
+        # Else, let's save it, with the replicated nodes' replicas instead
+        self.graph, self.replicas = graph.expand_replicas()
 
         # Iterate through the graph and dill.dumps the node objects
         for node_id in self.graph.G.nodes:
@@ -193,12 +198,14 @@ class WorkerHandlerService(Service):
     def _deregister_graph(self):
         self.graph: Graph = Graph()
         self.graph_dumps: Dict[str, bytes] = {}
+        self.replicas = {}
 
     def _map_graph(self, worker_graph_map: Dict[str, List[str]]):
         """Mapping ``Node`` from graph to ``Worker`` from cluster.
 
         The mapping, a dictionary, informs ChimeraPy-Engine which ``Worker`` is
-        going to execute which ``Node``s.
+        going to execute which ``Node``s. The replicas of a replicated \
+        ``Node`` are spread over the ``Worker``s it's mapped to.
 
         Args:
             worker_graph_map (Dict[str, List[str]]): The keys are the \
@@ -223,7 +230,7 @@ class WorkerHandlerService(Service):
 
             # Then check if the node exists in the graph
             for node_id in worker_graph_map[worker_id]:
-                if not self.graph.has_node_by_id(node_id):
+                if not (self.graph.has_node_by_id(node_id) or node_id in self.replicas):
                     logger.error(f"{node_id} is not in Manager's graph.")
                     checks.append(False)
                     break
@@ -233,8 +240,17 @@ class WorkerHandlerService(Service):
         if not all(checks):
             raise CommitGraphError("Mapping is invalid")
 
-        # Save the worker graph
-        self.worker_graph_map = worker_graph_map
+        # Save the worker graph, with the replicas round-robin
+        self.worker_graph_map = {
+            worker_id: [n for n in node_ids if n not in self.replicas]
+            for worker_id, node_ids in worker_graph_map.items()
+        }
+        for node_id, replica_ids in self.replicas.items():
+            worker_ids = [w for w, n in worker_graph_map.items() if node_id in n]
+            for i, replica_id in enumerate(replica_ids):
+                if worker_ids:
+                    worker_id = worker_ids[i % len(worker_ids)]
+                    self.worker_graph_map[worker_id].append(replica_id)
 
     def _node_to_worker_lookup(self, node_id: str) -> Optional[str]:
 
@@ -319,6 +335,76 @@ class WorkerHandlerService(Service):
     ## Async Networking
     ####################################################################
 
+    def _create_node_config(
+        self,
+        node_id: str,
+        context: Literal["multiprocessing", "threading"] = "multiprocessing",
+    ) -> NodeConfig:
+        """Create the configuration a Worker needs to create a Node.
+
+        Args:
+            node_id (str): The id of the node, that is in the graph
+            context (Literal["multiprocessing", "threading"]): The node's \
+                execution context
+
+        Returns:
+            NodeConfig: The node's configuration
+
+        """
+        # Extract the in_bound list and provide also the node's names
+        in_bound = list(self.graph.G.predecessors(node_id))
+        node_data = self.graph.G.nodes(data=True)
+        in_bound_by_name = [
+            node_data[x].get("replica_of_name", node_data[x]["object"].name)
+            for x in in_bound
+        ]
+        in_edges = {x: self.graph.G.edges[x, node_id] for x in in_bound}
+        in_bound_delivery = {
+            x: edge.get("delivery", "conflate") for x, edge in in_edges.items()
+        }
+        in_bound_hwm = {
+            x: edge["hwm"] for x, edge in in_edges.items() if edge.get("hwm")
+        }
+        in_bound_stream = {
+            x: edge["stream"] for x, edge in in_edges.items() if edge.get("stream")
+        }
+
+        # Extract the bytes
+        node_bytes = self.graph_dumps[node_id]
+
+        return NodeConfig(
+            node=(node_id, node_bytes),
+            in_bound=in_bound,
+            in_bound_by_name=in_bound_by_name,
+            out_bound=list(self.graph.G.successors(node_id)),
+            follow=self.graph.G.nodes[node_id]["follow"],
+            context=context,
+            publisher_policy=self.graph.G.nodes[node_id].get(
+                "publisher_policy", "drop-newest"
+            ),
+            publisher_queue_size=self.graph.G.nodes[node_id].get(
+                "publisher_queue_size", 1
+            ),
+            in_bound_delivery=in_bound_delivery,
+            in_bound_hwm=in_bound_hwm,
+            in_bound_stream=in_bound_stream,
+            streams=self.graph.G.nodes[node_id].get("streams", {}),
+            sync=self.graph.G.nodes[node_id].get("sync", "follow-latest"),
+            sync_slop=self.graph.G.nodes[node_id].get("sync_slop"),
+            sync_buffer_size=self.graph.G.nodes[node_id].get("sync_buffer_size"),
+            replica=self.graph.G.nodes[node_id].get("replica"),
+            in_bound_merge={
+                x: node_data[x]["replica_of"]
+                for x in in_bound
+                if "replica_of" in node_data[x]
+            },
+            batch_size=self.graph.G.nodes[node_id].get("batch_size", 1),
+            batch_timeout=self.graph.G.nodes[node_id].get("batch_timeout", 0.01),
+            rate=self.graph.G.nodes[node_id].get("rate"),
+            pipelined=self.graph.G.nodes[node_id].get("pipelined", False),
+            cpu_affinity=self.graph.G.nodes[node_id].get("cpu_affinity"),
+        )
+
     async def _request_node_creation(
         self,
         worker_id: str,
@@ -345,25 +431,8 @@ class WorkerHandlerService(Service):
 
         # logger.debug(f"{self}: Node requested to be created: {worker_id} - {node_id}")
 
-        # Extract the in_bound list and provide also the node's names
-        in_bound = list(self.graph.G.predecessors(node_id))
-        node_data = self.graph.G.nodes(data=True)
-        in_bound_by_name = [node_data[x]["object"].name for x in in_bound]
-
-        # Extract the bytes
-        node_bytes = self.graph_dumps[node_id]
-
         # Create the data to be send
-        data = pickle.dumps(
-            NodeConfig(
-                node=(node_id, node_bytes),
-                in_bound=in_bound,
-                in_bound_by_name=in_bound_by_name,
-                out_bound=list(self.graph.G.successors(node_id)),
-                follow=self.graph.G.nodes[node_id]["follow"],
-                context=context,
-            )
-        )
+        data = pickle.dumps(self._create_node_config(node_id, context))
 
         # Construct the url
         url = f"{self._get_worker_ip(worker_id)}/nodes/create"
@@ -379,6 +448,53 @@ class WorkerHandlerService(Service):
                 logger.error(f"{self}: Node creation ({worker_id}, {node_id}): FAILED")
                 return False
 
+    async def _request_nodes_creation(
+        self,
+        worker_id: str,
+        node_ids: List[str],
+        context: Literal["multiprocessing", "threading"] = "multiprocessing",
+    ) -> bool:
+        """Request creating a Worker's Nodes from the Graph at once.
+
+        The Worker creates the Nodes concurrently.
+
+        Args:
+            worker_id (str): The targetted Worker
+            node_ids (List[str]): The ids of the nodes to create, that are \
+            in the graph
+
+        Returns:
+            bool: Success in creating all the Nodes
+
+        """
+        # Send request to create nodes
+        if isinstance(self.worker_graph_map, nx.Graph):
+            logger.warning(f"Cannot create Nodes {node_ids} with Worker {worker_id}")
+            return False
+        elif any(node_id not in self.graph.G for node_id in node_ids):
+            return False
+
+        # Create the data to be send
+        data = pickle.dumps(
+            [self._create_node_config(node_id, context) for node_id in node_ids]
+        )
+
+        # Construct the url
+        url = f"{self._get_worker_ip(worker_id)}/nodes/create_batch"
+
+        # Send for the creation of the nodes
+        async with self.http_client.post(url=url, data=data) as resp:
+            if not resp.ok:
+                logger.error(f"{self}: Nodes creation ({worker_id}): FAILED")
+                return False
+            results: Dict[str, bool] = await resp.json()
+
+        for node_id in node_ids:
+            if not results.get(node_id):
+                logger.error(f"{self}: Node creation ({worker_id}, {node_id}): FAILED")
+
+        return all(results.get(node_id) for node_id in node_ids)
+
     async def _request_node_destruction(self, worker_id: str, node_id: str) -> bool:
         """Request destroying a Node from the Graph.
 
@@ -451,6 +567,67 @@ class WorkerHandlerService(Service):
 
         return False
 
+    async def _request_relay_creation(self, worker_id: str) -> bool:
+        """Request a Worker to relay the remote publishers its nodes share
+
+        A remote node's publisher with at least ``comms.relay.min-fanout`` \
+        subscribers on the Worker is subscribed to once by the Worker's \
+        relay (for the streams they use, ``lossless`` if any of their edges \
+        is), and its nodes are given the relay's entry instead. The \
+        Worker's previous relays are replaced.
+
+        Returns:
+            bool: Success in creating the relays
+
+        """
+        worker_ip = self.state.workers[worker_id].ip
+        worker_nodes = set(self.worker_graph_map[worker_id])
+
+        # Only publishers on other hosts cross the network
+        relayed = NodePubTable()
+        streams: Dict[str, Dict[str, DeliveryMode]] = {}
+        min_fanout = config.get("comms.relay.min-fanout")
+        for node_id, entry in self.node_pub_table.table.items():
+            dsts = worker_nodes.intersection(self.graph.G.successors(node_id))
+            if entry.ip != worker_ip and len(dsts) >= min_fanout:
+                relayed.table[node_id] = entry
+                streams[node_id] = {}
+                for dst in sorted(dsts):
+                    edge = self.graph.G.edges[node_id, dst]
+                    stream = edge.get("stream", "")
+                    if streams[node_id].get(stream) != "lossless":
+                        streams[node_id][stream] = edge.get("delivery", "conflate")
+
+        self.worker_node_pub_tables[worker_id] = self.node_pub_table
+        relays = await self._request_relays(worker_id, relayed, streams)
+        if relays is None:
+            return False
+
+        self.worker_node_pub_tables[worker_id] = NodePubTable(
+            table={**self.node_pub_table.table, **relays.table}
+        )
+        return True
+
+    async def _request_relays(
+        self,
+        worker_id: str,
+        relayed: NodePubTable,
+        streams: Dict[str, Dict[str, DeliveryMode]],
+    ) -> Optional[NodePubTable]:
+        async with self.http_client.post(
+            f"{self._get_worker_ip(worker_id)}/nodes/relays",
+            data=json.dumps({"node_pub_table": relayed.to_dict(), "streams": streams}),
+        ) as resp:
+            if not resp.ok:
+                logger.error(f"{self}: Requesting Worker's relays: FAILED")
+                return None
+
+            return NodePubTable.from_json(await resp.json())
+
+    async def _request_relay_teardown(self, worker_id: str) -> bool:
+        relays = await self._request_relays(worker_id, NodePubTable(), {})
+        return relays is not None
+
     async def _request_connection_creation(self, worker_id: str) -> bool:
         """Request establishing the connections between Nodes
 
@@ -460,6 +637,7 @@ class WorkerHandlerService(Service):
         Returns:
             bool: Returns if connection creation was successful
         """
+        node_pub_table = self.worker_node_pub_tables.get(worker_id, self.node_pub_table)
 
         # Send the message to each worker and wait
         for i in range(config.get("manager.allowed-failures")):
@@ -467,7 +645,7 @@ class WorkerHandlerService(Service):
             # Send the request to each worker
             async with self.http_client.post(
                 f"{self._get_worker_ip(worker_id)}/nodes/pub_table",
-                data=self.node_pub_table.to_json(),
+                data=node_pub_table.to_json(),
             ) as resp:
                 if resp.ok:
 
@@ -553,11 +731,12 @@ class WorkerHandlerService(Service):
         # Send the message to each worker
         coros: List[Coroutine] = []
         for worker_id in self.worker_graph_map:
-            for node_id in self.worker_graph_map[worker_id]:
 
-                # Request the creation
-                coro = self._request_node_creation(worker_id, node_id, context=context)
-                coros.append(coro)
+            # Request the creation of all the Worker's nodes at once
+            coro = self._request_nodes_creation(
+                worker_id, list(self.worker_graph_map[worker_id]), context=context
+            )
+            coros.append(coro)
 
         # Wait until all complete
         try:
@@ -590,6 +769,22 @@ class WorkerHandlerService(Service):
         if not all(results):
             return False
 
+        # Remote streams with several subscribers on a Worker cross the
+        # network once, through the Worker's relay
+        if config.get("comms.relay.enabled"):
+            relay_coros: List[Coroutine] = []
+            for worker_id in self.worker_graph_map:
+                relay_coros.append(self._request_relay_creation(worker_id))
+
+            try:
+                results = await asyncio.gather(*relay_coros)
+            except Exception:
+                logger.error(traceback.format_exc())
+                return False
+
+            if not all(results):
+                return False
+
         # Distribute the entire graph's information to all the Workers
         coros2: List[Coroutine] = []
         for worker_id in self.worker_graph_map:
@@ -621,7 +816,9 @@ class WorkerHandlerService(Service):
                 return False
 
         # Now we have to wait until worker says they finished transferring
-        await async_waiting_for(condition=lambda: worker_id in self.collected_workers)
+        await self.collected_changes.wait_for(
+            condition=lambda: worker_id in self.collected_workers
+        )
         success = self.collected_workers[worker_id]
         if not success:
             logger.error(
@@ -826,11 +1023,13 @@ class WorkerHandlerService(Service):
 
     async def reset(self, keep_workers: bool = True):
 
-        # Destroy Nodes safely
+        # Destroy Nodes safely, and the relays between them
         coros: List[Coroutine] = []
         for worker_id in self.state.workers:
             for node_id in self.state.workers[worker_id].nodes:
                 coros.append(self._request_node_destruction(worker_id, node_id))
+            if config.get("comms.relay.enabled"):
+                coros.append(self._request_relay_teardown(worker_id))
 
         # Wait until all complete
         try:
@@ -846,6 +1045,7 @@ class WorkerHandlerService(Service):
 
         # Update variable data
         self.node_pub_table = NodePubTable()
+        self.worker_node_pub_tables = {}
         self._deregister_graph()
 
         return all(results)
@@ -1,7 +1,9 @@
 # Class Imports
 from .client import Client
+from .codecs import Codec, available_codecs, get_codec, register_codec
 from .data_chunk import DataChunk
 from .publisher import Publisher
+from .relay import Relay
 from .server import Server
 from .subscriber import Subscriber
 
@@ -12,5 +14,10 @@ __all__ = [
     "Server",
     "DataChunk",
     "Publisher",
+    "Relay",
     "Subscriber",
+    "Codec",
+    "register_codec",
+    "get_codec",
+    "available_codecs",
 ]
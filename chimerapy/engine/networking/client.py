@@ -22,7 +22,7 @@ import asyncio_atexit
 # Logging
 from chimerapy.engine import _logger, config
 
-from ..utils import async_waiting_for, create_payload
+from ..utils import ChangeNotifier, create_payload
 from .async_loop_thread import AsyncLoopThread
 from .enums import GENERAL_MESSAGE
 
@@ -62,6 +62,7 @@ class Client:
         self.running.clear()
         self.msg_processed_counter = 0
         self.uuid_records: collections.deque[str] = collections.deque(maxlen=100)
+        self.uuid_changes = ChangeNotifier()
         self.tasks: List[asyncio.Task] = []
 
         # Adding default client handlers
@@ -107,6 +108,7 @@ class Client:
     async def _ok(self, msg: Dict):
         # self.logger.debug(f"{self}: received OK")
         self.uuid_records.append(msg["data"]["uuid"])
+        self.uuid_changes.notify()
 
     ####################################################################
     # IO Main Methods
@@ -169,7 +171,7 @@ class Client:
         # If ok, wait until ok
         if ok:
 
-            await async_waiting_for(
+            await self.uuid_changes.wait_for(
                 lambda: msg_uuid in self.uuid_records,
                 timeout=config.get("comms.timeout.ok"),
             )
@@ -273,7 +275,7 @@ class Client:
 
         if ok:
 
-            success = await async_waiting_for(
+            success = await self.uuid_changes.wait_for(
                 lambda: msg_uuid in self.uuid_records,
                 timeout=config.get("comms.timeout.ok"),
             )
@@ -0,0 +1,698 @@
+import abc
+import os
+import pickle
+import struct
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Literal, Optional, Sequence, Tuple, Union
+
+# Third-party Imports
+import blosc
+import cv2
+import numpy as np
+import simplejpeg
+
+# Internal Imports
+from chimerapy.engine import config
+from chimerapy.engine._logger import getLogger
+
+logger = getLogger("chimerapy-engine")
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+# Shared by all codecs, created when first needed
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get the thread pool shared by the codecs to work in parallel.
+
+    The codecs' libraries (simplejpeg, OpenCV, Blosc) release the GIL, \
+    therefore the pool can use all the cores.
+
+    Returns:
+        ThreadPoolExecutor: The shared thread pool.
+
+    """
+    global _executor
+    if _executor is None:
+        num_of_threads = config.get("codecs.num-of-threads") or os.cpu_count()
+        _executor = ThreadPoolExecutor(
+            max_workers=num_of_threads, thread_name_prefix="codecs"
+        )
+    return _executor
+
+
+def parallel_map(func: Callable[[Any], Any], items: Sequence[Any]) -> List[Any]:
+    """Apply a function to each item with the shared pool, keeping the order.
+
+    Args:
+        func (Callable[[Any], Any]): The function applied to each item, \
+            it shouldn't use the shared pool itself.
+        items (Sequence[Any]): The items.
+
+    Returns:
+        List[Any]: The results, in the same order as the items.
+
+    """
+    if len(items) <= 1:
+        return [func(item) for item in items]
+    return list(get_executor().map(func, items))
+
+
+class Codec(abc.ABC):
+    """Per-record serialization strategy used by ``DataChunk``.
+
+    A codec converts a record's value into a transmittable representation
+    (``encode``) and back (``decode``). Encoded ``bytes`` and numpy arrays
+    are sent as their own frame when the ``DataChunk`` is sent as a
+    multipart message, therefore ``decode`` should accept any bytes-like
+    object (``bytes`` or ``memoryview``).
+
+    Codecs whose decoding depends on previous messages are ``stateful``,
+    these are always decoded on reception, even for lazy ``DataChunk``.
+    Their ``encode`` also takes the ``key`` of the encoded stream (the
+    publishing node and the record's name), to keep a state per stream,
+    and they tell which of their messages are keyframes, that the next
+    ones depend on.
+
+    """
+
+    stateful: bool = False
+
+    def check(self, value: Any):
+        """Validate the value when it's added to the ``DataChunk``.
+
+        By default, all values are accepted.
+
+        """
+        return None
+
+    @abc.abstractmethod
+    def encode(self, value: Any) -> Any:
+        ...
+
+    @abc.abstractmethod
+    def decode(self, data: Any) -> Any:
+        ...
+
+    def is_keyframe(self, data: Any) -> bool:
+        return False
+
+    def request_keyframe(self, key: Optional[str] = None):
+        """Make the stream (all of them if ``None``) send a keyframe next."""
+        return None
+
+
+####################################################################
+# Generic Codecs
+####################################################################
+
+
+class RawCodec(Codec):
+    """Send numpy arrays as their raw contiguous buffer."""
+
+    def check(self, value: Any):
+        assert isinstance(
+            value, np.ndarray
+        ), f"Value needs to be an numpy array, currently {type(value)}"
+        assert not value.dtype.hasobject, "Numpy object arrays cannot be sent raw"
+
+    def encode(self, value: np.ndarray) -> np.ndarray:
+        return np.ascontiguousarray(value)
+
+    def decode(self, data: np.ndarray) -> np.ndarray:
+        return data
+
+
+class NDArrayCodec(Codec):
+    def __init__(self, cname: Optional[str] = None, clevel: int = 5):
+        """Send numeric numpy arrays without pickle.
+
+        Without compression, the array's buffer is sent as is (C or \
+        Fortran ordered) and the ``DataChunk`` header only keeps its \
+        dtype, shape and order. With compression, the buffer is \
+        compressed with Blosc, using the dtype's itemsize as typesize \
+        and bit-shuffle for floating point data, behind a compact \
+        header. Both forms can be decoded by any ``NDArrayCodec``.
+
+        Args:
+            cname (Optional[str]): The Blosc compressor (e.g. ``lz4``, \
+                ``zstd``) or ``None`` to not compress.
+            clevel (int): Compression level from 0 to 9.
+
+        """
+        self.cname = cname
+        self.clevel = clevel
+
+    def check(self, value: Any):
+        assert isinstance(
+            value, np.ndarray
+        ), f"Value needs to be an numpy array, currently {type(value)}"
+        assert (
+            not value.dtype.hasobject and value.dtype.fields is None
+        ), f"Only numeric numpy arrays are supported, currently {value.dtype}"
+
+    def encode(self, value: np.ndarray) -> Union[np.ndarray, bytes]:
+        if value.flags.f_contiguous and not value.flags.c_contiguous:
+            order = "F"
+        else:
+            value = np.ascontiguousarray(value)
+            order = "C"
+
+        if self.cname is None:
+            return value
+
+        # Header: length, then "<dtype>;<order>;<shape>"
+        header = f"{value.dtype.str};{order};{','.join(map(str, value.shape))}".encode()
+        shuffle = blosc.BITSHUFFLE if value.dtype.kind == "f" else blosc.SHUFFLE
+        buffer = value.T if order == "F" else value
+        data = blosc.compress(
+            buffer.reshape(-1).view(np.uint8).data,
+            typesize=value.dtype.itemsize,
+            clevel=self.clevel,
+            shuffle=shuffle,
+            cname=self.cname,
+        )
+        return struct.pack("<H", len(header)) + header + data
+
+    def decode(self, data: Union[np.ndarray, BytesLike]) -> np.ndarray:
+        if isinstance(data, np.ndarray):
+            return data
+
+        data = memoryview(data)
+        (header_size,) = struct.unpack_from("<H", data)
+        dtype, order, shape = bytes(data[2 : 2 + header_size]).decode().split(";")
+        array = np.frombuffer(
+            blosc.decompress(data[2 + header_size :]), dtype=np.dtype(dtype)
+        )
+        array_shape = tuple(int(i) for i in shape.split(",") if i)
+        if order == "F":
+            return array.reshape(array_shape[::-1]).T
+        return array.reshape(array_shape)
+
+
+class CompressionCodec(Codec):
+    """Base codec for general-purpose compressors.
+
+    Numpy arrays are compressed from their raw buffer (keeping their
+    dtype and shape), ``bytes`` are compressed as is and anything else
+    is pickled first.
+
+    """
+
+    @abc.abstractmethod
+    def compress(self, data: BytesLike, typesize: int = 1) -> bytes:
+        ...
+
+    @abc.abstractmethod
+    def decompress(self, data: BytesLike) -> bytes:
+        ...
+
+    def encode(self, value: Any) -> Dict[str, Any]:
+        if isinstance(value, np.ndarray) and not value.dtype.hasobject:
+            array = np.ascontiguousarray(value)
+            return {
+                "kind": "ndarray",
+                "dtype": array.dtype.str,
+                "shape": array.shape,
+                "data": self.compress(
+                    array.reshape(-1).view(np.uint8).data, array.dtype.itemsize
+                ),
+            }
+        elif isinstance(value, (bytes, bytearray)):
+            return {"kind": "bytes", "data": self.compress(value)}
+
+        return {
+            "kind": "pickle",
+            "data": self.compress(
+                pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            ),
+        }
+
+    def decode(self, data: Dict[str, Any]) -> Any:
+        raw = self.decompress(data["data"])
+        if data["kind"] == "ndarray":
+            return np.frombuffer(raw, dtype=np.dtype(data["dtype"])).reshape(
+                data["shape"]
+            )
+        elif data["kind"] == "bytes":
+            return raw
+
+        return pickle.loads(raw)
+
+
+class BloscCodec(CompressionCodec):
+    def __init__(
+        self,
+        cname: str = "lz4",
+        clevel: int = 5,
+        shuffle: Literal["auto", "byte", "bit", "none"] = "auto",
+    ):
+        """Compress with Blosc, using the dtype's itemsize as the typesize.
+
+        Args:
+            cname (str): The Blosc internal compressor (e.g. ``lz4``, \
+                ``zstd``, ``blosclz``).
+            clevel (int): Compression level from 0 to 9.
+            shuffle (Literal["auto", "byte", "bit", "none"]): The shuffle \
+                filter. ``auto`` uses bit-shuffle for single-byte \
+                dtypes, where byte-shuffle has no effect, and \
+                byte-shuffle otherwise.
+
+        """
+        self.cname = cname
+        self.clevel = clevel
+        self.shuffle = shuffle
+
+    def _get_shuffle(self, typesize: int) -> int:
+        if self.shuffle == "byte":
+            return blosc.SHUFFLE
+        elif self.shuffle == "bit":
+            return blosc.BITSHUFFLE
+        elif self.shuffle == "none":
+            return blosc.NOSHUFFLE
+
+        return blosc.BITSHUFFLE if typesize == 1 else blosc.SHUFFLE
+
+    def compress(self, data: BytesLike, typesize: int = 1) -> bytes:
+        return blosc.compress(
+            data,
+            typesize=typesize,
+            clevel=self.clevel,
+            shuffle=self._get_shuffle(typesize),
+            cname=self.cname,
+        )
+
+    def decompress(self, data: BytesLike) -> bytes:
+        return blosc.decompress(data)
+
+
+class LZ4Codec(CompressionCodec):
+    def __init__(self, compression_level: int = 0):
+        """Compress with LZ4 frames, requires the ``lz4`` package.
+
+        Args:
+            compression_level (int): 0 for the fast mode, 3 to 16 for the \
+                high-compression mode.
+
+        """
+        # Only loaded when needed
+        import lz4.frame
+
+        self._lz4 = lz4.frame
+        self.compression_level = compression_level
+
+    def compress(self, data: BytesLike, typesize: int = 1) -> bytes:
+        return self._lz4.compress(data, compression_level=self.compression_level)
+
+    def decompress(self, data: BytesLike) -> bytes:
+        return self._lz4.decompress(data)
+
+
+class ZstdCodec(CompressionCodec):
+    def __init__(self, level: int = 3):
+        """Compress with Zstandard, requires the ``zstandard`` package.
+
+        Args:
+            level (int): Compression level from 1 to 22.
+
+        """
+        # Only loaded when needed
+        import zstandard
+
+        self.level = level
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: BytesLike, typesize: int = 1) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: BytesLike) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+####################################################################
+# Image Codecs
+####################################################################
+
+
+class ImageCodec(Codec):
+    """Base codec for ``np.uint8`` images.
+
+    Large images (twice the ``codecs.image-tile-height`` configuration) \
+    are split into horizontal tiles that are encoded and decoded in \
+    parallel, in which case the encoded value is the list of tiles.
+
+    """
+
+    def check(self, value: Any):
+        assert isinstance(
+            value, np.ndarray
+        ), f"Image needs to be an numpy array, currently {type(value)}"
+        assert (
+            value.dtype == np.uint8
+        ), f"Numpy image needs to be np.uint8, currently {value.dtype}"
+
+    @abc.abstractmethod
+    def encode_image(self, value: np.ndarray) -> bytes:
+        ...
+
+    @abc.abstractmethod
+    def decode_image(self, data: BytesLike) -> np.ndarray:
+        ...
+
+    def _get_tile_height(self, height: int) -> Optional[int]:
+        tile_height = config.get("codecs.image-tile-height")
+        if not tile_height or height < 2 * tile_height:
+            return None
+
+        # Align to JPEG's largest block size (16), to not add seams
+        return max(16, tile_height // 16 * 16)
+
+    def encode(self, value: np.ndarray) -> Union[bytes, List[bytes]]:
+        tile_height = self._get_tile_height(value.shape[0])
+        if tile_height is None:
+            return self.encode_image(value)
+
+        tiles = [
+            value[i : i + tile_height] for i in range(0, value.shape[0], tile_height)
+        ]
+        return parallel_map(self.encode_image, tiles)
+
+    def decode(self, data: Union[BytesLike, List[BytesLike]]) -> np.ndarray:
+        if isinstance(data, list):
+            return np.concatenate(parallel_map(self.decode_image, data), axis=0)
+        return self.decode_image(data)
+
+
+class JPEGCodec(ImageCodec):
+    def __init__(self, quality: int = 85):
+        """Lossy JPEG compression of images through simplejpeg.
+
+        Args:
+            quality (int): JPEG quality from 0 to 100.
+
+        """
+        self.quality = quality
+
+    def encode_image(self, value: np.ndarray) -> bytes:
+        if len(value.shape) == 2:
+            return simplejpeg.encode_jpeg(
+                np.ascontiguousarray(np.expand_dims(value, axis=-1)),
+                quality=self.quality,
+                colorspace="GRAY",
+            )
+        return simplejpeg.encode_jpeg(np.ascontiguousarray(value), quality=self.quality)
+
+    def decode_image(self, data: BytesLike) -> np.ndarray:
+        # Obtain header first
+        header = simplejpeg.decode_jpeg_header(data)
+        if header[2] == "Gray":
+            return simplejpeg.decode_jpeg(data, colorspace="GRAY")[..., 0]
+        return simplejpeg.decode_jpeg(data)
+
+
+class PNGCodec(ImageCodec):
+    def __init__(self, compression: int = 1):
+        """Lossless PNG compression of images through OpenCV.
+
+        Args:
+            compression (int): PNG compression level from 0 to 9.
+
+        """
+        self.compression = compression
+
+    def encode_image(self, value: np.ndarray) -> bytes:
+        success, buffer = cv2.imencode(
+            ".png", value, [cv2.IMWRITE_PNG_COMPRESSION, self.compression]
+        )
+        assert success, "PNG encoding failed"
+        return buffer.tobytes()
+
+    def decode_image(self, data: BytesLike) -> np.ndarray:
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+        assert image is not None, "PNG decoding failed"
+        return image
+
+
+class ImageListCodec(Codec):
+    def __init__(self, image_codec: ImageCodec):
+        """Apply an image codec to each element of a list of images.
+
+        The images are encoded and decoded in parallel (but not tiled) \
+        with the shared thread pool.
+
+        Args:
+            image_codec (ImageCodec): The codec used per image.
+
+        """
+        self.image_codec = image_codec
+
+    def check(self, value: Any):
+        assert isinstance(value, list)
+
+    def encode(self, value: List[np.ndarray]) -> List[bytes]:
+        return parallel_map(self.image_codec.encode_image, value)
+
+    def decode(self, data: List[BytesLike]) -> List[np.ndarray]:
+        return parallel_map(self.image_codec.decode_image, data)
+
+
+@dataclass
+class _DeltaState:
+    stream: str = field(default_factory=lambda: str(uuid.uuid4()))
+    keyframe: Optional[np.ndarray] = None
+    keyframe_id: int = 0
+    since_keyframe: int = 0
+    force_keyframe: bool = False
+
+
+class DeltaImageCodec(Codec):
+
+    stateful = True
+
+    def __init__(
+        self,
+        image_codec: Optional[ImageCodec] = None,
+        block_size: int = 32,
+        threshold: int = 8,
+        keyframe_interval: int = 60,
+        max_dirty: float = 0.5,
+    ):
+        """Send an image stream as keyframes and dirty-rectangle patches.
+
+        Between keyframes, the image is compared to the last keyframe \
+        by blocks and only the changed blocks (merged into horizontal \
+        runs) are encoded. As patches are relative to the keyframe, \
+        not the previous image, conflated (skipped) messages do not \
+        matter. A keyframe is sent periodically, when too much of the \
+        image changed and after ``request_keyframe`` (e.g. when a new \
+        subscriber connects, or a keyframe was dropped). Until a receiver \
+        gets a keyframe, decoding returns ``None``, as there is no \
+        feedback from the receivers: a receiver that missed a keyframe \
+        (e.g. lost on the network) waits for the next periodic one.
+
+        The encoder keeps a state per ``key``, that is per publishing \
+        node and record.
+
+        Args:
+            image_codec (Optional[ImageCodec]): Codec for keyframes and \
+                patches, JPEG by default.
+            block_size (int): Size (pixels) of the compared blocks.
+            threshold (int): Pixel difference for a block to be changed.
+            keyframe_interval (int): Maximum number of images between \
+                keyframes.
+            max_dirty (float): Fraction of changed blocks above which a \
+                keyframe is sent instead.
+
+        """
+        self.image_codec = image_codec if image_codec else JPEGCodec()
+        self.block_size = block_size
+        self.threshold = threshold
+        self.keyframe_interval = keyframe_interval
+        self.max_dirty = max_dirty
+
+        # Encoder state per key
+        self._lock = threading.Lock()
+        self._states: Dict[str, _DeltaState] = {}
+
+        # Decoder state: latest (keyframe id, image) per received stream
+        self._keyframes: Dict[str, Tuple[int, np.ndarray]] = {}
+        self._max_streams = 32
+
+    def check(self, value: Any):
+        self.image_codec.check(value)
+
+    def is_keyframe(self, data: Dict[str, Any]) -> bool:
+        return "data" in data
+
+    def request_keyframe(self, key: Optional[str] = None):
+        with self._lock:
+            for state_key, state in self._states.items():
+                if key is None or state_key == key:
+                    state.force_keyframe = True
+
+    def _get_dirty_blocks(self, image: np.ndarray, keyframe: np.ndarray) -> np.ndarray:
+        diff = cv2.absdiff(image, keyframe)
+        if diff.ndim == 3:
+            diff = diff.max(axis=2)
+
+        # Pad to full blocks, then maximum per block
+        bs = self.block_size
+        rows, cols = -(-diff.shape[0] // bs), -(-diff.shape[1] // bs)
+        diff = np.pad(
+            diff, ((0, rows * bs - diff.shape[0]), (0, cols * bs - diff.shape[1]))
+        )
+        return diff.reshape(rows, bs, cols, bs).max(axis=(1, 3)) > self.threshold
+
+    def encode(self, value: np.ndarray, key: str = "") -> Dict[str, Any]:
+        image = np.ascontiguousarray(value)
+
+        with self._lock:
+            state = self._states.setdefault(key, _DeltaState())
+            dirty = None
+            if (
+                state.keyframe is not None
+                and state.keyframe.shape == image.shape
+                and not state.force_keyframe
+                and state.since_keyframe < self.keyframe_interval
+            ):
+                dirty = self._get_dirty_blocks(image, state.keyframe)
+                if dirty.mean() > self.max_dirty:
+                    dirty = None
+
+            if dirty is None:
+                state.keyframe = image.copy()
+                state.keyframe_id += 1
+                state.since_keyframe = 0
+                state.force_keyframe = False
+                return {
+                    "stream": state.stream,
+                    "keyframe": state.keyframe_id,
+                    "data": self.image_codec.encode(image),
+                }
+
+            state.since_keyframe += 1
+            stream, keyframe_id = state.stream, state.keyframe_id
+
+        # Merge the changed blocks of each row into rectangles
+        bs = self.block_size
+        rects: List[Tuple[int, int]] = []
+        patches: List[np.ndarray] = []
+        for row in range(dirty.shape[0]):
+            col = 0
+            while col < dirty.shape[1]:
+                if not dirty[row, col]:
+                    col += 1
+                    continue
+                start = col
+                while col < dirty.shape[1] and dirty[row, col]:
+                    col += 1
+                rects.append((row * bs, start * bs))
+                patches.append(image[row * bs : (row + 1) * bs, start * bs : col * bs])
+
+        return {
+            "stream": stream,
+            "keyframe": keyframe_id,
+            "rects": rects,
+            "patches": parallel_map(self.image_codec.encode_image, patches),
+        }
+
+    def decode(self, data: Dict[str, Any]) -> Optional[np.ndarray]:
+        stream = data["stream"]
+
+        if "data" in data:
+            image = self.image_codec.decode(data["data"])
+
+            # The keyframe is kept as the reference of the next patches
+            image.flags.writeable = False
+            self._keyframes.pop(stream, None)
+            self._keyframes[stream] = (data["keyframe"], image)
+            if len(self._keyframes) > self._max_streams:
+                self._keyframes.pop(next(iter(self._keyframes)))
+            return image
+
+        if stream not in self._keyframes or (
+            self._keyframes[stream][0] != data["keyframe"]
+        ):
+            logger.debug(f"Missing keyframe {data['keyframe']} of stream {stream}")
+            return None
+
+        image = self._keyframes[stream][1].copy()
+        patches = parallel_map(self.image_codec.decode_image, data["patches"])
+        for i, patch in enumerate(patches):
+            y, x = data["rects"][i]
+            image[y : y + patch.shape[0], x : x + patch.shape[1]] = patch
+        return image
+
+
+####################################################################
+# Registry
+####################################################################
+
+_codecs: Dict[str, Codec] = {}
+
+
+def register_codec(content_type: str, codec: Codec, overwrite: bool = False):
+    """Register a codec to be used with ``DataChunk.add(content_type=...)``.
+
+    The same codec needs to be registered in the sender and the receiver
+    (e.g. in the ``setup`` of both Nodes), as only the content type name
+    is transmitted.
+
+    Args:
+        content_type (str): The name of the content type.
+        codec (Codec): The codec instance.
+        overwrite (bool): Allow replacing an already registered codec.
+
+    """
+    if content_type in ["other", "meta"]:
+        raise ValueError(f"Content type '{content_type}' is reserved")
+    if content_type in _codecs and not overwrite:
+        raise ValueError(f"Codec for content type '{content_type}' already exists")
+
+    _codecs[content_type] = codec
+
+
+def get_codec(content_type: str) -> Codec:
+    """Get the codec of a registered content type.
+
+    Args:
+        content_type (str): The name of the content type.
+
+    Returns:
+        Codec: The registered codec.
+
+    """
+    if content_type not in _codecs:
+        raise KeyError(
+            f"No codec registered for content type '{content_type}', available: "
+            f"{list(_codecs.keys())}"
+        )
+
+    return _codecs[content_type]
+
+
+def available_codecs() -> List[str]:
+    return list(_codecs.keys())
+
+
+# Default codecs
+register_codec("image", JPEGCodec())
+register_codec("images", ImageListCodec(JPEGCodec()))
+register_codec("jpeg", JPEGCodec())
+register_codec("png", PNGCodec())
+register_codec("raw", RawCodec())
+register_codec("ndarray", NDArrayCodec())
+register_codec("image-stream", DeltaImageCodec())
+register_codec("blosc", BloscCodec())
+
+# Codecs with optional dependencies are only available if installed
+for _content_type, _codec_cls in [("lz4", LZ4Codec), ("zstd", ZstdCodec)]:
+    try:
+        register_codec(_content_type, _codec_cls())
+    except ImportError:
+        logger.debug(f"Codec '{_content_type}' not available, missing dependency")
@@ -1,50 +1,75 @@
-import collections
-import datetime
 import pickle
+import threading
+import time
 import uuid
-from typing import Any, Dict, List, Literal
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
 
 import blosc
 
 # Third-party Imports
 import numpy as np
-import simplejpeg
+import zmq
 
 # Internal Imports
 from chimerapy.engine._logger import getLogger
 
+from .codecs import get_codec
+
 logger = getLogger("chimerapy-engine")
 
 
 class DataChunk:
+
+    # Nodes can create thousands of DataChunks per second, keep them small
+    __slots__ = (
+        "_uuid",
+        "_source",
+        "_container",
+        "_encoded",
+        "_pending",
+        "_frames_cache",
+        "_bytes_cache",
+        "_sizes",
+        "_lock",
+    )
+
     def __init__(self):
 
-        # Adding UUID
-        self._uuid = str(uuid.uuid4())
+        # The UUID is only generated when requested
+        self._uuid: Optional[str] = None
+
+        # The publishing node, keying the stateful codecs' streams
+        self._source = ""
 
         # Storage
-        self._container = collections.defaultdict(dict)
+        self._container: Dict[str, Dict[str, Any]] = {}
 
-        # Creating mapping from content_type and compression method
-        self._content_type_2_serial_mapping = {
-            "image": (self._serialize_image, self._deserialize_image),
-            "images": (self._serialize_images, self._deserialize_images),
-        }
+        # Encoded values of the records (by their codec), reused until the
+        # record is changed. Received records not yet decoded are pending
+        self._encoded: Dict[str, Any] = {}
+        self._pending: Set[str] = set()
 
-        # Creating mapping for checking content_type
-        self._content_type_2_checks_mapping = {
-            "image": self._check_image,
-            "images": self._check_images,
-        }
+        # Serialized forms and per-record sizes, reset on any change
+        self._frames_cache: Optional[List[Union[bytes, memoryview, np.ndarray]]] = None
+        self._bytes_cache: Optional[bytes] = None
+        self._sizes: Dict[str, int] = {}
 
-        # Adding default key-value pair
+        # Pipelined nodes encode in another thread while the loop may read
+        # the same DataChunk (e.g. ``to_json`` when gathering), the caches
+        # are only filled and reset under this lock
+        self._lock = threading.RLock()
+
+        # Adding default key-value pair, timestamps are wall clock
+        # ``time.time_ns``, comparable across synchronized machines
         self._container["meta"] = {
             "value": {
                 "ownership": [],
-                "created": datetime.datetime.now(),
+                "created": time.time_ns(),
                 "delta": 0,  # ms
                 "transmitted": None,
                 "received": None,
+                "sequence": None,  # in the publisher's stream, once received
+                "order": None,  # sequence of a replica's input, to merge them
             },
             "content-type": "meta",
         }
@@ -59,9 +84,10 @@ class DataChunk:
             return NotImplemented
 
         # Check that their records have the same content
-        for record_name, record in self._container.items():
+        for record_name in self._container:
             if record_name in other._container:
-                other_record = other._container[record_name]
+                record = self.get(record_name)
+                other_record = other.get(record_name)
                 if record == other_record:
                     return True
                 else:
@@ -71,145 +97,280 @@ class DataChunk:
 
         return True
 
-    def __del__(self):
-        del self._container
-
     @property
-    def uuid(self):
+    def uuid(self) -> str:
+        if self._uuid is None:
+            self._uuid = str(uuid.uuid4())
         return self._uuid
 
     ####################################################################
-    # Content Type - Image
+    # (De)Serialization
     ####################################################################
 
-    def _check_image(self, image: np.ndarray):
-        assert isinstance(
-            image, np.ndarray
-        ), f"Image needs to be an numpy array, currently {type(image)}"
-        assert (
-            image.dtype == np.uint8
-        ), f"Numpy image needs to be np.uint8, currently {image.dtype}"
-
-    def _check_images(self, images: List[np.ndarray]):
-        assert isinstance(images, list)
-
-    def _serialize_image(self, image: np.ndarray):
-        if len(image.shape) == 2:
-            return simplejpeg.encode_jpeg(
-                np.ascontiguousarray(np.expand_dims(image, axis=-1)), colorspace="GRAY"
-            )
-        return simplejpeg.encode_jpeg(np.ascontiguousarray(image))
-
-    def _deserialize_image(self, image_bytes: bytes):
-        # Obtain header first
-        header = simplejpeg.decode_jpeg_header(image_bytes)
-        if header[2] == "Gray":
-            return np.squeeze(simplejpeg.decode_jpeg(image_bytes, colorspace="GRAY"))
-        return simplejpeg.decode_jpeg(image_bytes)
-
-    def _serialize_images(self, images: List[np.ndarray]):
-        return [self._serialize_image(image) for image in images]
-
-    def _deserialize_images(self, images_bytes: List[bytes]):
-        return [self._deserialize_image(image_bytes) for image_bytes in images_bytes]
+    def _is_raw_array(self, value: Any) -> bool:
+        # Only plain numpy arrays can be rebuilt from a raw buffer, object
+        # and structured dtypes still need pickle
+        return (
+            isinstance(value, np.ndarray)
+            and not value.dtype.hasobject
+            and value.dtype.fields is None
+        )
 
-    ####################################################################
-    # (De)Serialization
-    ####################################################################
+    def _invalidate(self, name: str):
+        with self._lock:
+            self._encoded.pop(name, None)
+            self._pending.discard(name)
+            self._frames_cache = None
+            self._bytes_cache = None
+
+    def _encode(self, name: str) -> Any:
+        with self._lock:
+            if name not in self._encoded:
+                record = self._container[name]
+                codec = get_codec(record["content-type"])
+                if codec.stateful:
+                    key = f"{self._source}/{name}"
+                    value = codec.encode(
+                        record["value"], key=key  # type: ignore[call-arg]
+                    )
+                else:
+                    value = codec.encode(record["value"])
+                self._encoded[name] = value
+            return self._encoded[name]
 
-    def _serialize(self) -> bytes:
+    def _serialize(
+        self,
+        buffers: Optional[List[Union[bytes, memoryview, np.ndarray]]] = None,
+        sizes: Optional[Dict[str, int]] = None,
+    ) -> bytes:
 
         # Create serialized container
-        s_container: Dict[str, Any] = collections.defaultdict(dict)
+        s_container: Dict[str, Any] = {}
 
         # For each entry, serialize and compress based on their content type
         for record_name, record in self._container.items():
 
-            # For certain content-type, additional compression methods
-            # are needed
-            if record["content-type"] not in ["other", "meta"]:
-                s_func = self._content_type_2_serial_mapping[record["content-type"]][0]
-                value = s_func(record["value"])
+            # For certain content-type, the record's codec is needed (only
+            # once, as the encoded value is kept until the record changes)
+            is_encoded = record["content-type"] not in ["other", "meta"]
+            if is_encoded:
+                value = self._encode(record_name)
             else:
                 value = record["value"]
 
+            if sizes is None:
+                sizes = {}
+
+            # Raw numpy arrays are moved out of the pickled container and
+            # into their own frame, only referenced by their index
+            if buffers is not None and record["content-type"] != "meta":
+                if self._is_raw_array(value):
+                    buffer_info = {
+                        "index": len(buffers),
+                        "dtype": value.dtype.str,
+                        "shape": value.shape,
+                    }
+
+                    # Fortran ordered arrays are sent without a copy as
+                    # their (C ordered) transpose
+                    if value.flags.f_contiguous and not value.flags.c_contiguous:
+                        array = value.T
+                        buffer_info["order"] = "F"
+                    else:
+                        array = np.ascontiguousarray(value)
+
+                    s_container[record_name] = {
+                        "value": None,
+                        "content-type": record["content-type"],
+                        "buffer": buffer_info,
+                    }
+                    buffers.append(array)
+                    sizes[record_name] = array.nbytes
+                    continue
+
+                # Same for the bytes generated by codecs (e.g. JPEG)
+                elif is_encoded and isinstance(value, (bytes, memoryview)):
+                    s_container[record_name] = {
+                        "value": None,
+                        "content-type": record["content-type"],
+                        "buffer": {"index": len(buffers)},
+                    }
+                    buffers.append(value)
+                    sizes[record_name] = memoryview(value).nbytes
+                    continue
+
+            # Received frames cannot be pickled
+            if isinstance(value, memoryview):
+                value = value.tobytes()
+
+            # Each remaining record is pickled on its own to obtain its size
+            pickled_value = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
             s_container[record_name] = {
-                "value": value,
+                "value": pickled_value,
                 "content-type": record["content-type"],
             }
+            sizes[record_name] = len(pickled_value)
 
         # Finished serializing the result
         return blosc.compress(
             pickle.dumps(s_container, protocol=pickle.HIGHEST_PROTOCOL)
         )
 
-    def _deserialize(self, data_bytes: bytes):
+    def _deserialize(
+        self,
+        data_bytes: Union[bytes, bytearray, memoryview],
+        frames: Sequence[memoryview] = (),
+        lazy: bool = False,
+    ):
 
         data = pickle.loads(blosc.decompress(data_bytes))
 
         for record_name, record in data.items():
-            # For certain content-type, additional compression methods
-            # are needed
-            if record["content-type"] not in ["other", "meta"]:
-                ds_func = self._content_type_2_serial_mapping[record["content-type"]][1]
-                value = ds_func(record["value"])
+
+            # Rebuild raw numpy arrays directly on top of their frame
+            if "buffer" in record:
+                buffer_info = record["buffer"]
+                value = frames[buffer_info["index"]]
+                if "dtype" in buffer_info:
+                    value = np.frombuffer(value, dtype=np.dtype(buffer_info["dtype"]))
+                    if buffer_info.get("order") == "F":
+                        value = value.reshape(buffer_info["shape"][::-1]).T
+                    else:
+                        value = value.reshape(buffer_info["shape"])
             else:
-                value = record["value"]
+                value = pickle.loads(record["value"])
+
+            # For certain content-type, the record's codec is needed. If
+            # lazy, it's only decoded when requested (see ``get``)
+            if record["content-type"] not in ["other", "meta"]:
+                self._encoded[record_name] = value
+                codec = get_codec(record["content-type"])
+                if lazy and not codec.stateful:
+                    self._pending.add(record_name)
+                    value = None
+                else:
+                    value = codec.decode(value)
 
             self._container[record_name] = {
                 "value": value,
                 "content-type": record["content-type"],
             }
 
+    def encode(self, names: Optional[Sequence[str]] = None):
+        """Encode records in advance, with their codec.
+
+        The DataChunks later ``select``-ed from this one share the encoded \
+        values, instead of encoding them again.
+
+        Args:
+            names (Optional[Sequence[str]]): The names of the records to \
+                encode, all of them by default.
+        """
+        with self._lock:
+            for name in list(self._container) if names is None else names:
+                record = self._container.get(name)
+                if record and record["content-type"] not in ["other", "meta"]:
+                    self._encode(name)
+
     def to_bytes(self) -> bytes:
-        return self._serialize()
+        with self._lock:
+            if self._bytes_cache is None:
+                self._bytes_cache = self._serialize()
+            return self._bytes_cache
+
+    def to_frames(self) -> List[Union[bytes, memoryview, np.ndarray]]:
+        """Serialize into a multipart message for zero-copy sending.
+
+        The first frame is the compressed header (equivalent to
+        ``to_bytes`` but without the payloads). Each numpy array stored
+        with the ``other`` content type, and each array or ``bytes``
+        produced by a codec, follows as its own raw frame, which can be
+        sent with ``send_multipart(copy=False)``.
+
+        The frames are cached until a record is added or updated, so
+        publishing and profiling the same DataChunk only serializes it
+        once. Modifying a value in place (without ``update``) is not
+        detected.
+
+        Returns:
+            List[Union[bytes, memoryview, np.ndarray]]: The header and buffer frames.
+        """
+        with self._lock:
+            if self._frames_cache is None:
+                buffers: List[Union[bytes, memoryview, np.ndarray]] = []
+                sizes: Dict[str, int] = {}
+                header = self._serialize(buffers, sizes)
+                self._frames_cache = [header, *buffers]
+                self._sizes = sizes
+            return list(self._frames_cache)
 
     def to_json(self) -> List[int]:
-        return list(self._serialize())
+        return list(self.to_bytes())
 
     @classmethod
     def from_json(cls, data: List[int]):
         return cls.from_bytes(bytes(data))
 
     @classmethod
-    def from_bytes(cls, data_bytes: bytes):
+    def from_bytes(cls, data_bytes: Union[bytes, List[Any]], lazy: bool = False):
+        """Reconstruct a DataChunk from ``to_bytes`` or ``to_frames`` output.
+
+        When given the received frames (``bytes`` or ``zmq.Frame``),
+        numpy arrays are rebuilt with ``np.frombuffer`` over the frames
+        without copying, which makes them read-only.
+
+        Args:
+            data_bytes (Union[bytes, List[Any]]): A single serialized \
+                message or the list of frames of a multipart message.
+            lazy (bool): Only parse the header and postpone the decoding \
+                of each codec record (e.g. JPEG) until it's first \
+                requested with ``get``.
+
+        """
         instance = cls()
-        instance._deserialize(data_bytes)
+        if isinstance(data_bytes, (bytes, bytearray, memoryview)):
+            instance._deserialize(data_bytes, lazy=lazy)
+        else:
+            frames = [
+                f.buffer if isinstance(f, zmq.Frame) else memoryview(f)
+                for f in data_bytes
+            ]
+            instance._deserialize(frames[0], frames[1:], lazy=lazy)
         return instance
 
     ####################################################################
     # Front-facing API
     ####################################################################
 
-    def add(
-        self, name: str, value: Any, content_type: Literal["image", "other"] = "other"
-    ):
+    def add(self, name: str, value: Any, content_type: str = "other"):
         """Add a new record to the DataChunk instance.
 
         The important parameter here is the content_type, as this will \
         affect the execution speed and real-time ability of a pipeline. \
-        As of now, we only have two options: ``image`` and ``other``, as\
-        these are the provided serialization methods.
+        Each content type, except ``other``, selects a codec from the \
+        codec registry (see ``chimerapy.engine.networking.codecs``), \
+        such as ``image`` (JPEG), ``images``, ``png``, ``ndarray``, ``raw``, \
+        ``blosc``, ``lz4`` and ``zstd``. Custom codecs can be added \
+        with ``register_codec``.
 
         When sending an image (a numpy array), use the ``image`` option.\
-        As for anything else, use the ``other`` option until further \
-        notice.
+        As for anything else, use the ``other`` option (pickle).
 
         Args:
             name (str): The name to the record.
             value (Any): The contents to be stored with the name key.
-            content_type (Literal["image", "other"]): Specifying the \
-                content type to help serialization and compression \
-                efficiency.
+            content_type (str): Specifying the content type to help \
+                serialization and compression efficiency.
 
         """
-        # Get the check function (only on specify types of content
-        if content_type in ["image"]:
-            check_func = self._content_type_2_checks_mapping[content_type]
-            check_func(value)
+        # Validate the value with the content type's codec
+        if content_type != "other":
+            get_codec(content_type).check(value)
 
         # Add an entry
-        self._container[name] = {"value": value, "content-type": content_type}
+        with self._lock:
+            self._invalidate(name)
+            self._container[name] = {"value": value, "content-type": content_type}
 
     def get(self, name: str) -> Dict[str, Any]:
         """Extract the record given a name.
@@ -223,7 +384,16 @@ class DataChunk:
                 and ``ownership``. Mostly you will only need to use \
                 ``value``.
         """
-        return self._container[name]
+        # Decode lazily received records on first access
+        with self._lock:
+            if name in self._pending:
+                self._pending.remove(name)
+                record = self._container[name]
+                record["value"] = get_codec(record["content-type"]).decode(
+                    self._encoded[name]
+                )
+
+            return self._container.setdefault(name, {})
 
     def update(self, name: str, record: Dict[str, Any]):
         """Overwrite record with a new one, deletes previous meta data.
@@ -233,7 +403,75 @@ class DataChunk:
             record (Dict[str, Any]): The new record to overwrite the \
                 pre-existing one.
         """
-        self._container[name] = record
+        with self._lock:
+            self._invalidate(name)
+            self._container[name] = record
+
+    def select(self, names: Sequence[str]) -> "DataChunk":
+        """Create a DataChunk with only some of the records, and ``meta``.
+
+        The records' encoded values are shared, so that each record is \
+        only encoded once, even if published in several DataChunks.
+
+        Args:
+            names (Sequence[str]): The names of the records to keep.
+
+        Returns:
+            DataChunk: The new DataChunk.
+        """
+        data_chunk = DataChunk()
+        data_chunk._source = self._source
+        with self._lock:
+            for name in ["meta", *names]:
+                if name in self._container:
+                    data_chunk._container[name] = dict(self._container[name])
+                    if name in self._encoded:
+                        data_chunk._encoded[name] = self._encoded[name]
+                    if name in self._pending:
+                        data_chunk._pending.add(name)
+
+        return data_chunk
+
+    def set_source(self, source: str):
+        """Set the publishing node, before the records are encoded.
+
+        Stateful codecs (e.g. ``image-stream``) keep a state per node and \
+        record, so that the nodes of a process don't share a stream.
+
+        Args:
+            source (str): The node's id.
+        """
+        self._source = source
+
+    def get_codec_states(self) -> List[Tuple[str, str, bool]]:
+        """Get the states of stateful codecs used by the encoded records.
+
+        Returns:
+            List[Tuple[str, str, bool]]: The content type, key of the \
+                state and if the record is a keyframe, that the next \
+                records of the state depend on.
+        """
+        states = []
+        with self._lock:
+            encoded = list(self._encoded.items())
+        for name, value in encoded:
+            content_type = self._container[name]["content-type"]
+            codec = get_codec(content_type)
+            if codec.stateful:
+                key = f"{self._source}/{name}"
+                states.append((content_type, key, codec.is_keyframe(value)))
+        return states
+
+    def get_sizes(self) -> Dict[str, int]:
+        """Get the size of each record once serialized with ``to_frames``.
+
+        Returns:
+            Dict[str, int]: The number of bytes per record name, \
+                including ``meta``, before the header's compression.
+        """
+        with self._lock:
+            self.to_frames()
+            return dict(self._sizes)
 
     def contains(self) -> List[str]:
         keys = []
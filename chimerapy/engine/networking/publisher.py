@@ -1,38 +1,133 @@
 # Built-in Imports
 import asyncio
-from typing import Optional
+import collections
+import os
+import struct
+import tempfile
+import uuid
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 # Third-party Imports
 import zmq
 import zmq.asyncio
 
 # Logging
-from chimerapy.engine import _logger
+from chimerapy.engine import _logger, config
 
 # Internal Imports
+from ..data_protocols import PublisherStats
 from ..utils import get_ip_address
+from .shared_memory import SharedMemoryRing
 
 logger = _logger.getLogger("chimerapy-engine-networking")
 
+# Each message is sent with the transport (over the socket or with its
+# buffers in shared memory) and the name of its stream as topic. The name
+# is terminated so that subscribing to a stream doesn't match longer names
+NET_TOPIC = b"net/"
+SHM_TOPIC = b"shm/"
+STREAM_END = b"\x00"
+
+# Followed by the message's sequence number in its stream, for subscribers
+# to detect gaps
+SEQUENCE = struct.Struct("<Q")
+
+# Stream name, packed sequence number and frames
+Message = Tuple[str, bytes, Sequence[Any]]
+
+BackpressurePolicy = Literal["drop-newest", "drop-oldest", "block", "adaptive"]
+
+# Maximum downsampling factor of the adaptive policy
+MAX_DOWNSAMPLE = 64
+
 # Resources:
 # https://learning-0mq-with-pyzmq.readthedocs.io/en/latest/pyzmq/patterns/pushpull.html
 
 
+def get_topic(transport: bytes, stream: Optional[str] = "") -> bytes:
+    """Get the topic of a stream, or of all of them if ``None``."""
+    if stream is None:
+        return transport
+    return transport + stream.encode("utf-8") + STREAM_END
+
+
+def get_stream(topic: bytes) -> str:
+    return topic[len(NET_TOPIC) : -len(STREAM_END)].decode("utf-8")
+
+
 class Publisher:
-    def __init__(self, ctx: Optional[zmq.asyncio.Context] = None):
+    def __init__(
+        self,
+        ctx: Optional[zmq.asyncio.Context] = None,
+        policy: BackpressurePolicy = "drop-newest",
+        queue_size: int = 1,
+    ):
+        """Publish messages to ``Subscriber``, through a bounded send queue.
+
+        When the queue is full (the messages are published faster than \
+        they can be sent), the backpressure ``policy`` decides what \
+        happens:
+
+        * ``drop-newest``: the new message is dropped.
+        * ``drop-oldest``: the oldest queued message is dropped.
+        * ``block``: ``publish`` waits until there's space, and the \
+            socket waits for the slowest subscriber instead of dropping \
+            messages at its high-water mark.
+        * ``adaptive``: only every n-th message is published, with n \
+            doubled every time the queue is full and decreased when empty.
+
+        Args:
+            ctx (Optional[zmq.asyncio.Context]): ZeroMQ context.
+            policy (BackpressurePolicy): The backpressure policy.
+            queue_size (int): Number of messages waiting to be sent, \
+                besides the one being sent.
 
-        # Parameters
+        """
+
+        # Parameters, the process-wide context is needed for inproc
         if ctx:
             self._zmq_context = ctx
         else:
-            self._zmq_context = zmq.asyncio.Context()
+            self._zmq_context = zmq.asyncio.Context.instance()
 
         # Storing state variables
         self.port: int = 0
         self.host: str = get_ip_address()
-        self._data: Optional[bytes] = None
+        self.endpoints: Dict[str, str] = {}
         self._running: bool = False
 
+        # Send queue and backpressure
+        self.policy = policy
+        self.queue_size = max(1, queue_size)
+        self.stats = PublisherStats()
+        self._queue: Deque[Tuple[List[Message], Any]] = collections.deque()
+        self._queue_changed: Optional[asyncio.Condition] = None
+        self._sender_task: Optional[asyncio.Task] = None
+        self._downsample: int = 1
+        self._count: int = 0
+        self._sequences: Dict[str, int] = {}
+
+        # Called with the tag of each dropped message
+        self.on_drop: Optional[Callable[[Any], None]] = None
+
+        # Subscribed topics and the shared memory for local subscribers
+        self._topics: Set[bytes] = set()
+        self._new_subscribers: bool = False
+        self._ring: Optional[SharedMemoryRing] = None
+        self._shm_failed: bool = False
+
     @property
     def running(self):
         return self._running
@@ -40,27 +135,263 @@ class Publisher:
     def __str__(self):
         return f"<Publisher@{self.host}:{self.port}>"
 
-    async def publish(self, data: bytes):
-        self._data = data
-        if not self._sending.is_set():
-            self._sending.set()
-            await self._zmq_socket.send(self._data)
-            self._sending.clear()
+    @property
+    def queue_length(self) -> int:
+        return len(self._queue)
+
+    async def publish(
+        self,
+        data: Union[bytes, Sequence[Any]],
+        sequence: Optional[int] = None,
+        stream: str = "",
+        tag: Any = None,
+    ) -> bool:
+        """Queue a message, either a single buffer or a list of frames.
+
+        Frames are sent without copying (``copy=False``), so they must not
+        be modified until the message has been sent. For subscribers on the
+        same host that requested it, large buffers are instead written
+        once in a shared memory ring (up to ``comms.shm.max-size``) and
+        only their location is sent.
+
+        Every message gets the next sequence number of its stream, even if
+        dropped, so that subscribers can count the messages they missed.
+
+        Args:
+            data (Union[bytes, Sequence[Any]]): A single serialized message \
+                or the frames of a multipart message (e.g. from \
+                ``DataChunk.to_frames``).
+            sequence (Optional[int]): Sequence number of the message, to \
+                forward the messages of another publisher with theirs.
+            stream (str): Name of the stream, subscribers only receive the \
+                streams they subscribed to.
+            tag (Any): Passed to ``on_drop`` if the message is dropped.
+
+        Returns:
+            bool: ``False`` if the backpressure policy dropped a message \
+                (the new one or, for ``drop-oldest``, a queued one).
+
+        """
+        return await self._enqueue([self._to_message(data, stream, sequence)], tag)
+
+    async def publish_streams(
+        self, streams: Dict[str, Union[bytes, Sequence[Any]]], tag: Any = None
+    ) -> bool:
+        """Queue a message per stream, sent or dropped together.
+
+        Args:
+            streams (Dict[str, Union[bytes, Sequence[Any]]]): The message \
+                of each stream, as for ``publish``.
+            tag (Any): Passed to ``on_drop`` if the messages are dropped.
+
+        Returns:
+            bool: ``False`` if the backpressure policy dropped messages.
+
+        """
+        return await self._enqueue(
+            [self._to_message(data, stream) for stream, data in streams.items()], tag
+        )
+
+    def _to_message(
+        self,
+        data: Union[bytes, Sequence[Any]],
+        stream: str,
+        sequence: Optional[int] = None,
+    ) -> Message:
+        frames = [data] if isinstance(data, (bytes, bytearray, memoryview)) else data
+        if sequence is None:
+            sequence = self._sequences.get(stream, 0)
+        self._sequences[stream] = sequence + 1
+        return stream, SEQUENCE.pack(sequence), list(frames)
+
+    def _drop(self, tag: Any):
+        self.stats.dropped += 1
+        if self.on_drop:
+            self.on_drop(tag)
+
+    async def _enqueue(self, messages: List[Message], tag: Any = None) -> bool:
+
+        # The sender needs the running loop
+        if self._sender_task is None:
+            self._queue_changed = asyncio.Condition()
+            self._sender_task = asyncio.create_task(self._send_queued())
+        assert self._queue_changed
+
+        async with self._queue_changed:
+            is_full = len(self._queue) >= self.queue_size
+
+            if self.policy == "adaptive":
+                if is_full:
+                    self._downsample = min(2 * self._downsample, MAX_DOWNSAMPLE)
+                elif not self._queue:
+                    self._downsample = max(1, self._downsample - 1)
+                self._count += 1
+                if is_full or self._count % self._downsample:
+                    self._drop(tag)
+                    return False
+
+            elif is_full and self.policy == "drop-newest":
+                self._drop(tag)
+                return False
+
+            elif is_full and self.policy == "drop-oldest":
+                _, dropped_tag = self._queue.popleft()
+                self._drop(dropped_tag)
+
+            elif is_full and self.policy == "block":
+                await self._queue_changed.wait_for(
+                    lambda: len(self._queue) < self.queue_size
+                )
+
+            self._queue.append((messages, tag))
+            self.stats.queued += 1
+            self._queue_changed.notify_all()
+
+        return not (is_full and self.policy == "drop-oldest")
+
+    async def _send_queued(self):
+        assert self._queue_changed
+        while True:
+            async with self._queue_changed:
+                await self._queue_changed.wait_for(lambda: len(self._queue) > 0)
+                messages, _ = self._queue.popleft()
+                self._queue_changed.notify_all()
+
+            self._update_topics()
+            for stream, sequence, frames in messages:
+                shm_topic = get_topic(SHM_TOPIC, stream)
+                if self._is_subscribed(shm_topic):
+                    await self._zmq_socket.send_multipart(
+                        [shm_topic, sequence, *self._to_shm_frames(frames)],
+                        copy=False,
+                    )
+                net_topic = get_topic(NET_TOPIC, stream)
+                if self._is_subscribed(net_topic):
+                    await self._zmq_socket.send_multipart(
+                        [net_topic, sequence, *frames], copy=False
+                    )
+            self.stats.sent += 1
+
+    def _update_topics(self):
+        # The XPUB socket receives the (un)subscriptions, read them without
+        # awaiting through a synchronous view of the socket
+        socket = zmq.Socket.shadow(self._zmq_socket.underlying)
+        while socket.getsockopt(zmq.EVENTS) & zmq.POLLIN:
+            msg = socket.recv(zmq.NOBLOCK)
+            if msg[:1] == b"\x01":
+                self._topics.add(msg[1:])
+                self._new_subscribers = True
+            elif msg[:1] == b"\x00":
+                self._topics.discard(msg[1:])
+
+    def _is_subscribed(self, topic: bytes) -> bool:
+        return any(topic.startswith(sub_topic) for sub_topic in self._topics)
+
+    def is_subscribed(self, stream: str = "") -> bool:
+        """Check if a stream has subscribers, to only produce it if needed.
+
+        Args:
+            stream (str): The name of the stream.
+
+        Returns:
+            bool: If at least one subscriber receives the stream.
+
+        """
+        if not self._running:
+            return False
+
+        self._update_topics()
+        return any(
+            self._is_subscribed(get_topic(transport, stream))
+            for transport in [NET_TOPIC, SHM_TOPIC]
+        )
+
+    def _to_shm_frames(self, frames: Sequence[Any]) -> List[Any]:
+        # Frames: descriptor (empty if not in shared memory), header, buffers
+        header, buffers = frames[0], frames[1:]
+        size = sum(memoryview(b).nbytes for b in buffers)
+        if (
+            not buffers
+            or size < config.get("comms.shm.min-size")
+            or not self._prepare_ring(buffers)
+        ):
+            return [b"", header, *buffers]
+
+        assert self._ring
+        return [self._ring.write(buffers), header]
+
+    def _prepare_ring(self, buffers: Sequence[Any]) -> bool:
+        if self._ring and self._ring.fits(buffers):
+            return True
+        if self._shm_failed:
+            return False
+
+        # Replace the ring when the messages outgrow it, with fewer slots
+        # rather than exceeding the size limit
+        slot_size = 1 << (SharedMemoryRing.required_size(buffers) - 1).bit_length()
+        slots = min(
+            config.get("comms.shm.slots"), config.get("comms.shm.max-size") // slot_size
+        )
+        if slots < 2:
+            return False
+
+        if self._ring:
+            self._ring.close()
+            self._ring = None
+        try:
+            self._ring = SharedMemoryRing(slots=slots, slot_size=slot_size)
+        except OSError as e:
+            logger.warning(f"{self}: shared memory unavailable, using sockets: {e}")
+            self._shm_failed = True
+            return False
+        return True
+
+    def has_new_subscribers(self) -> bool:
+        """Check if subscribers connected since the last call.
+
+        Returns:
+            bool: If at least one new connection was accepted.
+
+        """
+        if not self._running:
+            return False
+
+        self._update_topics()
+        new_subscribers = self._new_subscribers
+        self._new_subscribers = False
+        return new_subscribers
 
     def start(self):
 
-        # Create the socket
-        self._zmq_socket = self._zmq_context.socket(zmq.PUB)
+        # Create the socket, XPUB to know which transports are subscribed
+        # (verbose, to also know when a new subscriber joins)
+        self._zmq_socket = self._zmq_context.socket(zmq.XPUB)
+        self._zmq_socket.setsockopt(zmq.XPUB_VERBOSE, 1)
+        if self.policy == "block":
+            self._zmq_socket.setsockopt(zmq.XPUB_NODROP, 1)
         self.port = self._zmq_socket.bind_to_random_port(f"tcp://{self.host}")
-        self._running = True
 
-        self._sending = asyncio.Event()
-        self._sending.clear()
+        # Cheaper endpoints for subscribers in the same process or host
+        name = f"chimerapy-{uuid.uuid4()}"
+        self.endpoints = {"tcp": f"tcp://{self.host}:{self.port}"}
+        self.endpoints["inproc"] = f"inproc://{name}"
+        if zmq.has("ipc"):
+            self.endpoints["ipc"] = f"ipc://{os.path.join(tempfile.gettempdir(), name)}"
+        for transport in ["inproc", "ipc"]:
+            if transport in self.endpoints:
+                self._zmq_socket.bind(self.endpoints[transport])
+
+        self._running = True
 
     def shutdown(self):
 
         # Closing the socket
         if self._running:
+            if self._sender_task:
+                self._sender_task.cancel()
+                self._sender_task = None
             self._zmq_socket.close()
-            self._zmq_context.term()
+            if self._ring:
+                self._ring.close()
+                self._ring = None
             self._running = False
@@ -0,0 +1,104 @@
+# Built-in Imports
+from typing import Any, Dict, List, Optional, Tuple
+
+# Third-party Imports
+import zmq.asyncio
+
+# Logging
+from chimerapy.engine import _logger, config
+
+# Internal Imports
+from .publisher import Publisher
+from .subscriber import DeliveryMode, Subscriber
+
+logger = _logger.getLogger("chimerapy-engine-networking")
+
+
+class Relay:
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        streams: Optional[Dict[str, DeliveryMode]] = None,
+        delivery: DeliveryMode = "lossless",
+        ctx: Optional[zmq.asyncio.Context] = None,
+    ):
+        """Re-publish the messages of a remote ``Publisher`` locally.
+
+        Subscribers on this host connect to the relay instead of the \
+        remote publisher, so its messages cross the network once, however \
+        many local subscribers there are. Messages are forwarded with \
+        their original sequence numbers, so that subscribers still detect \
+        the messages dropped upstream or by the relay.
+
+        Each stream is received with the delivery of its local edges: \
+        ``conflate`` streams only keep their latest message, ``lossless`` \
+        ones are queued. The relay never waits for its subscribers: the \
+        oldest queued messages are dropped if it falls \
+        ``comms.lossless-hwm`` messages behind.
+
+        Args:
+            host (str): The remote publisher's host.
+            port (int): The remote publisher's port.
+            streams (Optional[Dict[str, DeliveryMode]]): The streams to \
+                relay with their delivery, all of them by default.
+            delivery (DeliveryMode): The delivery of all the streams, if \
+                ``streams`` is not given. ``lossless`` by default, for \
+                the local subscribers to conflate each stream themselves.
+            ctx (Optional[zmq.asyncio.Context]): ZeroMQ context.
+
+        """
+        self.upstream_host = host
+        self.upstream_port = port
+        self.streams = streams
+        self.delivery = delivery
+
+        self.subscriber = Subscriber(ctx)
+        self.publisher = Publisher(
+            ctx, policy="drop-oldest", queue_size=config.get("comms.lossless-hwm")
+        )
+
+    def __str__(self):
+        return (
+            f"<Relay {self.upstream_host}:{self.upstream_port} -> "
+            f"{self.publisher.host}:{self.publisher.port}>"
+        )
+
+    @property
+    def host(self) -> str:
+        return self.publisher.host
+
+    @property
+    def port(self) -> int:
+        return self.publisher.port
+
+    @property
+    def endpoints(self) -> Dict[str, str]:
+        return self.publisher.endpoints
+
+    async def start(self):
+        self.publisher.start()
+
+        # Subscribing to all the streams at once, or to each of them
+        topics: List[Tuple[Optional[str], DeliveryMode]] = [(None, self.delivery)]
+        if self.streams is not None:
+            topics = list(self.streams.items())
+        for topic, delivery in topics:
+            self.subscriber.subscribe(
+                host=self.upstream_host,
+                port=self.upstream_port,
+                topic=topic,
+                id=str(topic),
+                delivery=delivery,
+            )
+        self.subscriber.on_receive(self._forward, with_streams=True)
+        await self.subscriber.start()
+
+    async def _forward(self, datas: Dict[str, List[Tuple[str, int, List[Any]]]]):
+        for messages in datas.values():
+            for stream, sequence, frames in messages:
+                await self.publisher.publish(frames, sequence=sequence, stream=stream)
+
+    async def shutdown(self):
+        await self.subscriber.shutdown()
+        self.publisher.shutdown()
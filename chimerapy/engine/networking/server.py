@@ -23,11 +23,7 @@ from tqdm import tqdm
 # Internal Imports
 # Logging
 from chimerapy.engine import _logger, config
-from chimerapy.engine.utils import (
-    async_waiting_for,
-    create_payload,
-    get_ip_address,
-)
+from chimerapy.engine.utils import ChangeNotifier, create_payload, get_ip_address
 
 from .async_loop_thread import AsyncLoopThread
 from .enums import GENERAL_MESSAGE
@@ -249,6 +245,7 @@ class Server:
 
     async def _ok(self, msg: Dict, ws: web.WebSocketResponse):
         self.uuid_records.append(msg["data"]["uuid"])
+        self.uuid_changes.notify()
 
     async def _register_ws_client(self, msg: Dict, ws: web.WebSocketResponse):
         # self.logger.debug(f"{self}: reigstered client: {msg['data']['client_id']}")
@@ -356,7 +353,7 @@ class Server:
 
         # If ok, wait until ok
         if ok:
-            await async_waiting_for(
+            await self.uuid_changes.wait_for(
                 lambda: msg_uuid in self.uuid_records,
                 timeout=config.get("comms.timeout.ok"),
             )
@@ -371,6 +368,7 @@ class Server:
 
         # Create record of message uuids
         self.uuid_records: collections.deque[str] = collections.deque(maxlen=100)
+        self.uuid_changes = ChangeNotifier()
 
         # Use an application runner to run the web server
         self._runner = web.AppRunner(self._app)
@@ -0,0 +1,181 @@
+# Built-in Imports
+import pickle
+import struct
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, List, Optional, Sequence, Set, Tuple
+
+# Logging
+from chimerapy.engine import _logger
+
+logger = _logger.getLogger("chimerapy-engine-networking")
+
+# Shared memory segments created by this process
+_created: Set[str] = set()
+
+# Slot generations are stored at the start of the segment
+GENERATION = struct.Struct("<Q")
+ALIGNMENT = 64
+
+
+def _align(size: int) -> int:
+    return -(-size // ALIGNMENT) * ALIGNMENT
+
+
+class SharedMemoryRing:
+    def __init__(self, name: Optional[str] = None, slots: int = 16, slot_size: int = 0):
+        """Ring buffer of fixed size slots in shared memory.
+
+        The writer (``name=None``) creates the segment and writes each \
+        message in the next slot, overwriting the oldest one. Readers \
+        attach to the segment by name and copy the message's buffers out \
+        of the shared memory, as long as the slot wasn't overwritten \
+        (checked with the slot's generation, odd while being written, \
+        before and after copying). This replaces the socket's copies of \
+        large messages with a single one, and the copied buffers remain \
+        valid once the writer wraps around the ring.
+
+        Args:
+            name (Optional[str]): Name of the segment to attach to, or \
+                ``None`` to create a new one.
+            slots (int): Number of slots (only when creating).
+            slot_size (int): Size of each slot (only when creating).
+
+        """
+        if name is None:
+            self.slots = slots
+            self.slot_size = _align(slot_size)
+            self._header_size = _align(self.slots * GENERATION.size)
+            self.shm = shared_memory.SharedMemory(
+                create=True, size=self._header_size + self.slots * self.slot_size
+            )
+            _created.add(self.shm.name)
+            self._owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+            # Otherwise, the resource tracker unlinks the segment when the
+            # reader exits
+            if name not in _created:
+                resource_tracker.unregister(
+                    self.shm._name, "shared_memory"  # type: ignore[attr-defined]
+                )
+            self._owner = False
+
+        self.name = self.shm.name
+        self._next_slot = 0
+
+    def __str__(self):
+        return f"<SharedMemoryRing {self.name}>"
+
+    @property
+    def buf(self) -> memoryview:
+        assert self.shm.buf is not None, f"{self}: already closed"
+        return self.shm.buf
+
+    def _get_generation(self, slot: int) -> int:
+        return GENERATION.unpack_from(self.buf, slot * GENERATION.size)[0]
+
+    def _set_generation(self, slot: int, generation: int):
+        GENERATION.pack_into(self.buf, slot * GENERATION.size, generation)
+
+    @staticmethod
+    def required_size(buffers: Sequence[Any]) -> int:
+        return sum(_align(memoryview(b).nbytes) for b in buffers)
+
+    def fits(self, buffers: Sequence[Any]) -> bool:
+        return self.required_size(buffers) <= self.slot_size
+
+    def write(self, buffers: Sequence[Any]) -> bytes:
+        """Copy the buffers into the next slot.
+
+        Args:
+            buffers (Sequence[Any]): Bytes-like objects that ``fits``.
+
+        Returns:
+            bytes: The descriptor needed by readers to ``read`` them.
+
+        """
+        slot = self._next_slot
+        self._next_slot = (slot + 1) % self.slots
+
+        # Odd generation while writing
+        generation = self._get_generation(slot) + 1
+        self._set_generation(slot, generation)
+
+        offset = self._header_size + slot * self.slot_size
+        locations: List[Tuple[int, int]] = []
+        for buffer in buffers:
+            data = memoryview(buffer).cast("B")
+            self.buf[offset : offset + data.nbytes] = data
+            locations.append((offset, data.nbytes))
+            offset += _align(data.nbytes)
+
+        generation += 1
+        self._set_generation(slot, generation)
+        return pickle.dumps((self.name, slot, generation, locations))
+
+    def read(self, slot: int, generation: int, locations: List[Tuple[int, int]]):
+        """Copy the buffers of a slot, if it still holds the same message.
+
+        Args:
+            slot (int): The slot index.
+            generation (int): The slot's generation when written.
+            locations (List[Tuple[int, int]]): Offset and size per buffer.
+
+        Returns:
+            Optional[List[memoryview]]: The buffers, ``None`` if the slot \
+                was overwritten, before or while copying.
+
+        """
+        if self._get_generation(slot) != generation:
+            return None
+        if not locations:
+            return []
+
+        # Copy the slot's used span at once, then split it into the buffers
+        start = locations[0][0]
+        end = locations[-1][0] + locations[-1][1]
+        with self.buf[start:end] as view:
+            data = memoryview(bytearray(view))
+
+        if self._get_generation(slot) != generation:
+            return None
+        return [
+            data[offset - start : offset - start + size] for offset, size in locations
+        ]
+
+    def close(self):
+        # The buffers read are copies, nothing else uses the memory
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+            _created.discard(self.name)
+
+
+class SharedMemoryReader:
+    """Resolve the descriptors of a writer's ``SharedMemoryRing``.
+
+    The ring is attached on the first descriptor and replaced when the \
+    writer moves to a new (larger) one.
+
+    """
+
+    def __init__(self):
+        self.ring: Optional[SharedMemoryRing] = None
+
+    def read(self, descriptor: bytes) -> Optional[List[memoryview]]:
+        name, slot, generation, locations = pickle.loads(descriptor)
+        if self.ring is None or self.ring.name != name:
+            self.close()
+            try:
+                self.ring = SharedMemoryRing(name=name)
+            except FileNotFoundError:
+                logger.warning(f"Shared memory {name} not found")
+                return None
+
+        return self.ring.read(slot, generation, locations)
+
+    def close(self):
+        if self.ring:
+            self.ring.close()
+            self.ring = None
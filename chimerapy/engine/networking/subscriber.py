@@ -1,8 +1,9 @@
 # Built-in
 import asyncio
+import os
 import uuid
-from dataclasses import dataclass
-from typing import Callable, Coroutine, Dict, Optional, Union
+from dataclasses import dataclass, field
+from typing import Any, Callable, Coroutine, Dict, List, Literal, Optional, Tuple, Union
 
 # Third-party Imports
 import zmq
@@ -10,50 +11,123 @@ import zmq.asyncio
 
 # Internal Imports
 # Logging
-from chimerapy.engine import _logger
+from chimerapy.engine import _logger, config
+
+from ..data_protocols import SubscriberStats
+from ..utils import get_ip_address
+from .publisher import NET_TOPIC, SEQUENCE, SHM_TOPIC, get_stream, get_topic
+from .shared_memory import SharedMemoryReader
 
 logger = _logger.getLogger("chimerapy-engine-networking")
 
 # Reference:
 # https://pyzmq.readthedocs.io/en/latest/api/zmq.html?highlight=socket#polling
 
+DeliveryMode = Literal["conflate", "lossless"]
+
 
 @dataclass
 class Subscription:
     id: str
     host: str
     port: int
-    topic: str
+    topic: Optional[str]
     socket: zmq.Socket
+    shm_reader: Optional[SharedMemoryReader] = None
+    delivery: DeliveryMode = "conflate"
+    hwm: int = 1
+    # Sequence number of the last received message per stream
+    sequences: Dict[str, int] = field(default_factory=dict)
+    stats: SubscriberStats = field(default_factory=SubscriberStats)
 
 
 class Subscriber:
     def __init__(self, ctx: Optional[zmq.asyncio.Context] = None):
 
-        # Parameters
+        # Parameters, the process-wide context is needed for inproc
         if ctx:
             self._zmq_context = ctx
         else:
-            self._zmq_context = zmq.asyncio.Context()
+            self._zmq_context = zmq.asyncio.Context.instance()
 
         # State variables
         self._on_receive: Optional[Union[Callable, Coroutine]] = None
+        self._with_streams: bool = False
         self._running: bool = False
+        self._poll_future: Optional[asyncio.Future] = None
         self.subscriptions: Dict[str, Subscription] = {}
         self.socket_to_sub_name_mapping: Dict[zmq.Socket, str] = {}
 
     def subscribe(
-        self, host: str, port: int, topic: str = "", id: Optional[str] = None
+        self,
+        host: str,
+        port: int,
+        topic: Optional[str] = "",
+        id: Optional[str] = None,
+        shm: bool = False,
+        endpoints: Optional[Dict[str, str]] = None,
+        pid: Optional[int] = None,
+        delivery: DeliveryMode = "conflate",
+        hwm: Optional[int] = None,
     ):
+        """Subscribe to a ``Publisher``.
+
+        Among the publisher's ``endpoints``, the cheapest reachable one is \
+        used: ``inproc`` if in the same process (``pid``), ``ipc`` if on \
+        the same host, otherwise ``tcp``.
+
+        With the ``conflate`` delivery, only the latest message (of each \
+        stream) is kept and the stale ones are dropped. With ``lossless``, up to ``hwm`` \
+        messages are queued and all of them delivered in order; for the \
+        stream to be complete, the publisher must also not drop any \
+        (``block`` backpressure policy). In both cases, the messages \
+        missing from the publisher's sequence are counted in the \
+        subscription's ``stats``.
+
+        Args:
+            host (str): The publisher's host.
+            port (int): The publisher's port.
+            topic (Optional[str]): Name of the publisher's stream to \
+                receive, ``None`` for all of them. The other streams are \
+                not sent to this subscriber.
+            id (Optional[str]): Name of the subscription, used as key of \
+                the received data.
+            shm (bool): Receive the large buffers through shared memory, \
+                only possible if the publisher is on the same host. Not \
+                used with ``inproc``, as it is already zero-copy.
+            endpoints (Optional[Dict[str, str]]): The publisher's \
+                endpoints per transport.
+            pid (Optional[int]): The publisher's process id.
+            delivery (DeliveryMode): ``conflate`` or ``lossless``.
+            hwm (Optional[int]): Maximum number of queued messages with \
+                ``lossless``, ``comms.lossless-hwm`` by default.
+
+        """
 
         if id is None:
             id = str(uuid.uuid4())
 
         # Create socket
+        # ZMQ_CONFLATE does not support multipart messages, instead keep
+        # the queue short and only deliver the latest message (see
+        # ``_drain``). With all the streams, a single queued message would
+        # starve the other streams, the queue holds a pass of messages
         _zmq_socket = self._zmq_context.socket(zmq.SUB)
-        _zmq_socket.setsockopt(zmq.CONFLATE, 1)
-        _zmq_socket.connect(f"tcp://{host}:{port}")
-        _zmq_socket.subscribe(topic.encode("utf-8"))
+        if delivery == "lossless":
+            hwm = hwm or config.get("comms.lossless-hwm")
+        elif topic is None:
+            hwm = config.get("comms.drain-max")
+        else:
+            hwm = 1
+        _zmq_socket.setsockopt(zmq.RCVHWM, hwm)
+        endpoint = self._select_endpoint(host, port, endpoints, pid)
+        _zmq_socket.connect(endpoint)
+
+        # The shared memory ring overwrites messages that are not read in
+        # time, which a lossless subscription cannot afford
+        shm = shm and not endpoint.startswith("inproc://") and delivery != "lossless"
+        transport = SHM_TOPIC if shm else NET_TOPIC
+        _zmq_socket.subscribe(get_topic(transport, topic))
 
         # Create subscription
         sub = Subscription(
@@ -62,15 +136,35 @@ class Subscriber:
             port=port,
             topic=topic,
             socket=_zmq_socket,
+            shm_reader=SharedMemoryReader() if shm else None,
+            delivery=delivery,
+            hwm=hwm,
         )
         self.subscriptions[id] = sub
         self.socket_to_sub_name_mapping[_zmq_socket] = id
 
+    def _select_endpoint(
+        self,
+        host: str,
+        port: int,
+        endpoints: Optional[Dict[str, str]],
+        pid: Optional[int],
+    ) -> str:
+        if endpoints:
+            if "inproc" in endpoints and pid == os.getpid():
+                return endpoints["inproc"]
+            if "ipc" in endpoints and host == get_ip_address() and zmq.has("ipc"):
+                return endpoints["ipc"]
+
+        return f"tcp://{host}:{port}"
+
     def unsubscribe(self, id: str):
 
         # Close the socket
         sub = self.subscriptions[id]
         sub.socket.close()
+        if sub.shm_reader:
+            sub.shm_reader.close()
 
         # Remove from the list
         del self.subscriptions[id]
@@ -87,25 +181,105 @@ class Subscriber:
 
         while self._running:
 
-            # Wait until we get data from any of the subscribers
-            event_list = await self.poller.poll(timeout=10)
-            events = dict(event_list)
-
-            # Empty if no events
-            if len(events) == 0:
-                continue
-
-            datas: Dict[str, bytes] = {}
+            # Wait until any of the sockets has messages, the wait is
+            # cancelled on shutdown
+            self._poll_future = self.poller.poll()
+            try:
+                events = dict(await self._poll_future)
+            except asyncio.CancelledError:
+                if self._running:
+                    raise
+                break
+
+            # Receive everything that is queued in one pass
+            datas: Dict[str, List[Any]] = {}
             for s in events:
-                data = await s.recv()
-                datas[self.socket_to_sub_name_mapping[s]] = data
-
-            if self._on_receive:
+                sub = self.subscriptions[self.socket_to_sub_name_mapping[s]]
+                messages = self._drain(sub)
+                if messages:
+                    datas[sub.id] = (
+                        messages
+                        if self._with_streams
+                        else [frames for _, _, frames in messages]
+                    )
+
+            if datas and self._on_receive:
                 if asyncio.iscoroutinefunction(self._on_receive):
                     await self._on_receive(datas)
                 else:
                     self._on_receive(datas)
 
+            # Let the other tasks run between passes, even if the sockets
+            # are always ready
+            await asyncio.sleep(0)
+
+    def _drain(self, sub: Subscription) -> List[Tuple[str, int, List[Any]]]:
+        # Receive without awaiting through a synchronous view of the socket,
+        # the frames are not copied as DataChunk.from_bytes rebuilds the
+        # arrays on top of them. At most ``comms.drain-max`` messages are
+        # received per pass, not to starve the other sockets and tasks when
+        # the publishers send faster than they are received
+        socket: zmq.Socket = zmq.Socket.shadow(sub.socket.underlying)
+        queued: List[List[Any]] = []
+        limit = config.get("comms.drain-max")
+        while len(queued) < limit:
+            try:
+                queued.append(socket.recv_multipart(zmq.NOBLOCK, copy=False))
+            except zmq.Again:
+                break
+
+        # Only the latest message of each stream matters when conflating,
+        # the stale ones are counted as dropped
+        streams = [get_stream(data[0].bytes) for data in queued]
+        latest = {stream: i for i, stream in enumerate(streams)}
+
+        # Remove the topic and sequence number and, for shared memory, get
+        # the buffers
+        messages: List[Tuple[str, int, List[Any]]] = []
+        for i, data in enumerate(queued):
+            stream = streams[i]
+            sequence = self._update_sequence(sub, stream, data[1])
+            if sub.delivery == "conflate" and latest[stream] != i:
+                sub.stats.dropped += 1
+                continue
+            frames = self._get_frames(sub, data[2:])
+            if frames is not None:
+                sub.stats.received += 1
+                messages.append((stream, sequence, frames))
+            else:
+                sub.stats.dropped += 1
+
+        return messages
+
+    def _update_sequence(self, sub: Subscription, stream: str, frame: Any) -> int:
+        (sequence,) = SEQUENCE.unpack(frame.bytes)
+
+        # Restarted publishers begin again from 0
+        previous = sub.sequences.get(stream)
+        if previous is not None and sequence > previous + 1:
+            missing = sequence - previous - 1
+            sub.stats.gaps += 1
+            sub.stats.dropped += missing
+            if sub.delivery == "lossless":
+                logger.warning(f"{self}: {sub.id} missed {missing} messages")
+
+        sub.sequences[stream] = sequence
+        return sequence
+
+    def _get_frames(self, sub: Subscription, frames: List[Any]) -> Optional[List[Any]]:
+        if not sub.shm_reader:
+            return frames
+
+        descriptor, header, *buffers = frames
+        if len(descriptor.bytes) == 0:
+            return [header, *buffers]
+
+        shm_buffers = sub.shm_reader.read(descriptor.bytes)
+        if shm_buffers is None:
+            # Overwritten before it could be read
+            return None
+        return [header, *shm_buffers]
+
     async def start(self):
 
         # Warning if no "on" function is specified
@@ -121,15 +295,31 @@ class Subscriber:
         self._running = True
         self._poll_task = asyncio.create_task(self.poll_inputs())
 
-    def on_receive(self, fn: Union[Callable, Coroutine]):
+    def on_receive(self, fn: Union[Callable, Coroutine], with_streams: bool = False):
+        """Set the function called with the received messages.
+
+        The messages received together are delivered at once, as a \
+        dictionary of the subscriptions' ids to their messages in order \
+        (only the latest of each stream with ``conflate`` delivery), each \
+        message being its list of frames.
+
+        Args:
+            fn (Union[Callable, Coroutine]): The function.
+            with_streams (bool): Deliver each message as a tuple of its \
+                stream, sequence number and frames instead.
+
+        """
         self._on_receive = fn
+        self._with_streams = with_streams
 
     async def shutdown(self):
 
         if self._running:
 
-            # Stop the thread
+            # Stop waiting for messages, after delivering the current ones
             self._running = False
+            if self._poll_future:
+                self._poll_future.cancel()
             await self._poll_task
 
             subs = list(self.subscriptions.keys())
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Any, Dict
+from typing import Any, Dict, List, Union
 
 from ..data_protocols import NodeDiagnostics, NodePubTable
 from ..networking.client import Client
@@ -13,7 +13,7 @@ class EnableDiagnosticsEvent:  # enable_diagnostics
 
 @dataclass
 class NewInBoundDataEvent:
-    data_chunks: Dict[str, DataChunk]
+    data_chunks: Union[Dict[str, DataChunk], List[Dict[str, DataChunk]]]  # batched
 
 
 @dataclass
@@ -412,6 +412,12 @@ class Node:
     ## Back-End Lifecycle API
     ####################################################################
 
+    def _get_order_by(self) -> Optional[str]:
+        # Replicas mark their outputs with the followed input's sequence
+        if self.poller and self.node_config.replica and self.node_config.follow:
+            return self.poller.nicknames[self.node_config.follow]
+        return None
+
     async def _setup(self):
 
         # Adding state to the WorkerCommsService
@@ -459,13 +465,38 @@ class Node:
         # Identity the type of Node (source, step, or sink)
         in_bound_data = len(self.node_config.in_bound) != 0
 
-        # Create services
+        # Create services, starting with the poller if in-bound
+        if self.node_config and self.node_config.in_bound:
+            self.poller = PollerService(
+                name="poller",
+                in_bound=self.node_config.in_bound,
+                in_bound_by_name=self.node_config.in_bound_by_name,
+                follow=self.node_config.follow,
+                delivery=self.node_config.in_bound_delivery,
+                hwm=self.node_config.in_bound_hwm,
+                streams=self.node_config.in_bound_stream,
+                sync=self.node_config.sync,
+                slop=self.node_config.sync_slop,
+                buffer_size=self.node_config.sync_buffer_size,
+                batch_size=self.node_config.batch_size,
+                batch_timeout=self.node_config.batch_timeout,
+                replica=self.node_config.replica,
+                merge=self.node_config.in_bound_merge,
+                state=self.state,
+                eventbus=self.eventbus,
+                logger=self.logger,
+            )
+
         self.processor = ProcessorService(
             name="processor",
             setup_fn=self.setup,
             main_fn=main_fn,
             teardown_fn=self.teardown,
             operation_mode=mode,
+            batched=in_bound_data and self.node_config.batch_size > 1,
+            rate=self.node_config.rate,
+            pipelined=self.node_config.pipelined,
+            order_by=self._get_order_by(),
             registered_methods=self.registered_methods,
             registered_node_fns=registered_fns,
             state=self.state,
@@ -479,24 +510,6 @@ class Node:
             eventbus=self.eventbus,
             logger=self.logger,
         )
-        self.profiler = ProfilerService(
-            name="profiler",
-            state=self.state,
-            eventbus=self.eventbus,
-            logger=self.logger,
-        )
-
-        # If in-bound, enable the poller service
-        if self.node_config and self.node_config.in_bound:
-            self.poller = PollerService(
-                name="poller",
-                in_bound=self.node_config.in_bound,
-                in_bound_by_name=self.node_config.in_bound_by_name,
-                follow=self.node_config.follow,
-                state=self.state,
-                eventbus=self.eventbus,
-                logger=self.logger,
-            )
 
         # If out_bound, enable the publisher service
         if self.node_config and self.node_config.out_bound:
@@ -504,9 +517,23 @@ class Node:
                 "publisher",
                 state=self.state,
                 eventbus=self.eventbus,
+                policy=self.node_config.publisher_policy,
+                queue_size=self.node_config.publisher_queue_size,
+                streams=self.node_config.streams,
+                pipelined=self.node_config.pipelined,
                 logger=self.logger,
             )
 
+        self.profiler = ProfilerService(
+            name="profiler",
+            state=self.state,
+            eventbus=self.eventbus,
+            logger=self.logger,
+            publisher_stats=self.publisher.stats if self.publisher else None,
+            subscriber_stats=self.poller.stats if self.poller else None,
+            scheduler_stats=self.processor.stats,
+        )
+
         # Initialize all services
         if self.worker_comms:
             await self.worker_comms.async_init()
@@ -573,8 +600,8 @@ class Node:
 
         In this method, the logic that is executed within the ``Node``'s
         while loop. For data sources (no inputs), the ``step`` method
-        will execute as fast as possible; therefore, it is important to
-        add ``time.sleep`` to specify the sampling rate.
+        will execute at the node's ``rate``, or as fast as possible if
+        not set.
 
         For a ``Node`` that have inputs, these will be executed when new
         data is received.
@@ -587,7 +614,10 @@ class Node:
             For step and sink nodes, the ``data_dict`` must be included\
             to avoid an error. The variable is a dictionary, where the\
             key is the in-bound ``Node``'s name and the value is the\
-            output of the in-bound ``Node``'s ``step`` function.
+            output of the in-bound ``Node``'s ``step`` function.\
+            In batch mode (``batch_size`` of ``Graph.add_node`` above\
+            one), it is a list of these dictionaries, and a list\
+            returned is published as individual outputs.
 
         """
         ...
@@ -639,6 +669,23 @@ class Node:
         self.eventloop_future, _ = self._exec_coro(self.arun(self.eventbus))
         return 1
 
+    def join(self) -> int:
+        """Wait, after ``run``, until the ``Node`` is torn down.
+
+        Returns:
+            int: The exit value of the ``Node``'s event loop.
+
+        """
+        if self.eventloop_future:
+            self.eventloop_future.result()
+        future, _ = self._exec_coro(self._join())
+        return future.result()
+
+    async def _join(self) -> int:
+        if self.eventloop_task:
+            return await self.eventloop_task
+        return 1
+
     async def arun(self, eventbus: Optional[EventBus] = None):
         self.logger = self.get_logger()
         self.logger.setLevel(self.logging_level)
@@ -1,11 +1,15 @@
 import typing
-from typing import List, Literal, Optional, Tuple, Union
+from typing import Dict, List, Literal, Optional, Tuple, Union
 
 if typing.TYPE_CHECKING:
     from .node import Node
 
 import dill
 
+from ..networking.publisher import BackpressurePolicy
+from ..networking.subscriber import DeliveryMode
+from .poller_service import SyncPolicy
+
 
 class NodeConfig:
     id: str
@@ -15,6 +19,22 @@ class NodeConfig:
     out_bound: List[str]
     follow: Optional[str]
     context: Literal["multiprocessing", "threading"]
+    publisher_policy: BackpressurePolicy
+    publisher_queue_size: int
+    in_bound_delivery: Dict[str, DeliveryMode]
+    in_bound_hwm: Dict[str, int]
+    in_bound_stream: Dict[str, str]
+    streams: Dict[str, List[str]]
+    sync: SyncPolicy
+    sync_slop: Optional[float]
+    sync_buffer_size: Optional[int]
+    replica: Optional[Tuple[int, int]]
+    in_bound_merge: Dict[str, str]
+    batch_size: int
+    batch_timeout: float
+    rate: Optional[float]
+    pipelined: bool
+    cpu_affinity: Optional[List[int]]
 
     def __init__(
         self,
@@ -24,6 +44,22 @@ class NodeConfig:
         out_bound: Optional[List[str]] = None,
         follow: Optional[str] = None,
         context: Literal["multiprocessing", "threading"] = "multiprocessing",
+        publisher_policy: BackpressurePolicy = "drop-newest",
+        publisher_queue_size: int = 1,
+        in_bound_delivery: Optional[Dict[str, DeliveryMode]] = None,
+        in_bound_hwm: Optional[Dict[str, int]] = None,
+        in_bound_stream: Optional[Dict[str, str]] = None,
+        streams: Optional[Dict[str, List[str]]] = None,
+        sync: SyncPolicy = "follow-latest",
+        sync_slop: Optional[float] = None,
+        sync_buffer_size: Optional[int] = None,
+        replica: Optional[Tuple[int, int]] = None,
+        in_bound_merge: Optional[Dict[str, str]] = None,
+        batch_size: int = 1,
+        batch_timeout: float = 0.01,
+        rate: Optional[float] = None,
+        pipelined: bool = False,
+        cpu_affinity: Optional[List[int]] = None,
     ):
 
         # Save parameters
@@ -39,6 +75,22 @@ class NodeConfig:
         self.out_bound = out_bound
         self.follow = follow
         self.context = context
+        self.publisher_policy = publisher_policy
+        self.publisher_queue_size = publisher_queue_size
+        self.in_bound_delivery = in_bound_delivery or {}
+        self.in_bound_hwm = in_bound_hwm or {}
+        self.in_bound_stream = in_bound_stream or {}
+        self.streams = streams or {}
+        self.sync = sync
+        self.sync_slop = sync_slop
+        self.sync_buffer_size = sync_buffer_size
+        self.replica = replica
+        self.in_bound_merge = in_bound_merge or {}
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.rate = rate
+        self.pipelined = pipelined
+        self.cpu_affinity = cpu_affinity
 
         if node:
             if isinstance(node, tuple):
@@ -58,7 +110,16 @@ class NodeConfig:
             f"in_bound_by_name={self.in_bound_by_name} "
             f"out_bound={self.out_bound} "
             f"follow={self.follow} "
-            f"context={self.context}>"
+            f"context={self.context} "
+            f"publisher_policy={self.publisher_policy} "
+            f"in_bound_delivery={self.in_bound_delivery} "
+            f"in_bound_stream={self.in_bound_stream} "
+            f"streams={list(self.streams)} "
+            f"sync={self.sync} "
+            f"replica={self.replica} "
+            f"batch_size={self.batch_size} "
+            f"rate={self.rate} "
+            f"pipelined={self.pipelined}>"
         )
 
         return string
@@ -1,16 +1,24 @@
-import datetime
+import asyncio
 import logging
-from typing import Dict, List, Optional
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterator, List, Literal, Optional, Tuple
 
-from chimerapy.engine import _logger
+from chimerapy.engine import _logger, config
 
-from ..data_protocols import NodePubEntry, NodePubTable
+from ..data_protocols import NodePubEntry, NodePubTable, SubscriberStats
 from ..eventbus import Event, EventBus, TypedObserver
 from ..networking import DataChunk, Subscriber
+from ..networking.subscriber import DeliveryMode
 from ..service import Service
 from ..states import NodeState
+from ..utils import get_ip_address
 from .events import NewInBoundDataEvent, ProcessNodePubTableEvent
 
+# How the latest messages of the inputs are combined to step
+SyncPolicy = Literal["follow-latest", "exact-sequence", "approximate-time"]
+
 
 class PollerService(Service):
     def __init__(
@@ -21,14 +29,102 @@ class PollerService(Service):
         state: NodeState,
         eventbus: EventBus,
         follow: Optional[str] = None,
+        delivery: Optional[Dict[str, DeliveryMode]] = None,
+        hwm: Optional[Dict[str, int]] = None,
+        streams: Optional[Dict[str, str]] = None,
+        sync: SyncPolicy = "follow-latest",
+        slop: Optional[float] = None,
+        buffer_size: Optional[int] = None,
+        batch_size: int = 1,
+        batch_timeout: float = 0.0,
+        replica: Optional[Tuple[int, int]] = None,
+        merge: Optional[Dict[str, str]] = None,
+        lazy: Optional[bool] = None,
         logger: Optional[logging.Logger] = None,
     ):
+        """Receive the inputs of the node and trigger its steps.
+
+        With ``follow-latest``, the node steps for every message of the \
+        ``follow`` input, with the latest messages of the others. \
+        ``exact-sequence`` steps with messages of the same sequence \
+        number on all inputs. These are counted by each publisher, so they \
+        only identify the same origin if the inputs publish once per \
+        message of a common source, started together (e.g. nodes stepping \
+        on the same input, losslessly). ``approximate-time`` steps with \
+        messages created at most ``slop`` seconds apart (by wall clock, so \
+        the machines' clocks must be synchronized). Both keep the \
+        received messages in bounded buffers until they are matched, and \
+        count the ones discarded in the inputs' ``unmatched`` stats.
+
+        The received messages are deserialized on a thread pool, in \
+        parallel for different inputs, before the node steps. With \
+        ``lazy`` decoding, only their headers are parsed there and each \
+        record is decoded when the node first uses it, if ever. \
+        Otherwise, all the records are decoded on the thread pool.
+
+        With a ``batch_size`` above one, the node steps with a list of up \
+        to ``batch_size`` input sets instead, collected for at most \
+        ``batch_timeout`` seconds after the first one.
+
+        A replica only steps for its share of the followed input's \
+        messages, those whose sequence number modulo the number of \
+        replicas is its index. The outputs of another node's replicas \
+        are merged back as a single input, in the order of the replicas' \
+        inputs.
+
+        Args:
+            name (str): The name of the service.
+            in_bound (List[str]): The ids of the input nodes.
+            in_bound_by_name (List[str]): Their names.
+            state (NodeState): The node's state.
+            eventbus (EventBus): The node's event bus.
+            follow (Optional[str]): The input that triggers the steps with \
+                ``follow-latest``.
+            delivery (Optional[Dict[str, DeliveryMode]]): Delivery mode \
+                per input, ``conflate`` by default.
+            hwm (Optional[Dict[str, int]]): Queue size per ``lossless`` \
+                input.
+            streams (Optional[Dict[str, str]]): Stream to receive per \
+                input, the complete outputs by default.
+            sync (SyncPolicy): How the inputs are combined.
+            slop (Optional[float]): Maximum time between the messages \
+                matched by ``approximate-time``, ``comms.sync.slop`` by \
+                default.
+            buffer_size (Optional[int]): Messages kept per input while \
+                waiting for a match, ``comms.sync.buffer-size`` by default.
+            batch_size (int): Maximum number of input sets per step.
+            batch_timeout (float): Maximum time (in seconds) to wait for a \
+                complete batch.
+            replica (Optional[Tuple[int, int]]): The index of this node \
+                among its replicas, and their number.
+            merge (Optional[Dict[str, str]]): The replicated node of each \
+                input that is one of its replicas.
+            lazy (Optional[bool]): Decode the records on first use, \
+                ``codecs.lazy-decoding`` by default.
+            logger (Optional[logging.Logger]): The node's logger.
+
+        """
         super().__init__(name)
 
         # Parameters
         self.in_bound: List[str] = in_bound
         self.in_bound_by_name: List[str] = in_bound_by_name
         self.follow: Optional[str] = follow
+        self.delivery: Dict[str, DeliveryMode] = delivery or {}
+        self.hwm: Dict[str, int] = hwm or {}
+        self.streams: Dict[str, str] = streams or {}
+        self.sync: SyncPolicy = sync
+        self.slop: int = int(
+            (slop if slop is not None else config.get("comms.sync.slop")) * 1e9
+        )  # ns
+        self.buffer_size: int = buffer_size or config.get("comms.sync.buffer-size")
+        self.batch_size: int = batch_size
+        self.batch_timeout: float = batch_timeout
+        self.replica: Optional[Tuple[int, int]] = replica
+        self.merge: Dict[str, str] = merge or {}
+        self.lazy: bool = (
+            lazy if lazy is not None else config.get("codecs.lazy-decoding")
+        )
         self.state = state
         self.eventbus = eventbus
 
@@ -38,10 +134,51 @@ class PollerService(Service):
         else:
             self.logger = _logger.getLogger("chimerapy-engine")
 
+        # The inputs, with the replicas of a node as a single one
+        self.inputs: List[str] = list(
+            dict.fromkeys(self.merge.get(k, k) for k in in_bound)
+        )
+        self.nicknames: Dict[str, str] = {
+            self.merge.get(k, k): in_bound_by_name[i] for i, k in enumerate(in_bound)
+        }
+
         # Containers
         self.sub: Optional[Subscriber] = None
         self.in_bound_data: Dict[str, DataChunk] = {}
 
+        # Decoding off the event loop, the codecs' own pool can't be used
+        # as they also decode tiles with it
+        self.executor = ThreadPoolExecutor(
+            max_workers=config.get("codecs.decoding-threads"),
+            thread_name_prefix="decoding",
+        )
+
+        # Messages waiting for a match, with their sequence number or
+        # creation time, per input
+        self.buffers: Dict[str, Deque[Tuple[int, DataChunk]]] = {
+            input_id: deque() for input_id in self.inputs
+        }
+
+        # Replicas' outputs waiting for the previous ones, by the sequence of
+        # their inputs, with the next one to release and each replica's last
+        self.pending: Dict[str, Dict[int, DataChunk]] = {}
+        self.next_orders: Dict[str, int] = {}
+        self.last_orders: Dict[str, Dict[str, int]] = {}
+        for in_bound_id, input_id in self.merge.items():
+            self.pending[input_id] = {}
+            self.last_orders.setdefault(input_id, {})[in_bound_id] = -1
+
+        # Input sets of the next batch, sent when full or on timeout
+        self.batch: List[Dict[str, DataChunk]] = []
+        self.batch_timer: Optional[asyncio.TimerHandle] = None
+        self.batch_task: Optional[asyncio.Task] = None
+
+        # Counters of the subscriptions (and merged inputs), shared with the
+        # profiler
+        self.stats: Dict[str, SubscriberStats] = {
+            k: SubscriberStats() for k in dict.fromkeys([*in_bound, *self.inputs])
+        }
+
     async def async_init(self):
 
         # Specify observers
@@ -65,9 +202,16 @@ class PollerService(Service):
 
     async def teardown(self):
 
+        # Dropping the incomplete batch
+        if self.batch_timer:
+            self.batch_timer.cancel()
+        if self.batch_task:
+            await self.batch_task
+
         # Shutting down subscriber
         if self.sub and self.sub.running:
             await self.sub.shutdown()
+        self.executor.shutdown()
 
     ####################################################################
     ## Helper Methods
@@ -77,6 +221,7 @@ class PollerService(Service):
 
         # Create a subscriber
         self.sub = Subscriber()
+        ip = get_ip_address()
 
         # We determine all the out bound nodes
         for i, in_bound_id in enumerate(self.in_bound):
@@ -84,40 +229,230 @@ class PollerService(Service):
             # Determine the host and port information
             in_bound_entry: NodePubEntry = node_pub_table.table[in_bound_id]
 
-            # Create subscribers to other nodes' publishers
+            # Create subscribers to other nodes' publishers, through shared
+            # memory when on the same host
             self.sub.subscribe(
-                id=in_bound_id, host=in_bound_entry.ip, port=in_bound_entry.port
+                id=in_bound_id,
+                topic=self.streams.get(in_bound_id, ""),
+                host=in_bound_entry.ip,
+                port=in_bound_entry.port,
+                shm=config.get("comms.shm.enabled") and in_bound_entry.ip == ip,
+                endpoints=in_bound_entry.endpoints,
+                pid=in_bound_entry.pid,
+                delivery=self.delivery.get(in_bound_id, "conflate"),
+                hwm=self.hwm.get(in_bound_id),
             )
+            self.sub.subscriptions[in_bound_id].stats = self.stats[in_bound_id]
 
         # Start
-        self.sub.on_receive(self.update_data)
+        self.sub.on_receive(self.update_data, with_streams=True)
         await self.sub.start()
 
-    async def update_data(self, datas: Dict[str, bytes]):
+    async def update_data(self, datas: Dict[str, List[Tuple[str, int, List[Any]]]]):
 
-        # Default value
-        follow_event = False
+        received = time.time_ns()
 
-        # Convert the data to DataChunk
-        for k, d in datas.items():
+        # The followed node's messages last, to step with the latest values
+        # of the others. Only a replica's share of the followed node's
+        # messages are decoded
+        in_bound_ids = sorted(datas, key=lambda k: self.merge.get(k, k) == self.follow)
+        messages: Dict[str, List[Tuple[str, int, List[Any]]]] = {}
+        for k in in_bound_ids:
+            messages[k] = datas[k]
+            if self.replica and k == self.follow:
+                messages[k] = [m for m in datas[k] if self._is_mine(m[1])]
 
-            # Reconstruct the DataChunk and marked when it was received
-            data_chunk = DataChunk.from_bytes(d)
-            meta = data_chunk.get("meta")
-            meta["value"]["received"] = datetime.datetime.now()
-            data_chunk.update("meta", meta)
+        # Reconstruct the DataChunks, the inputs in parallel but each one's
+        # messages in order (for stateful codecs)
+        loop = asyncio.get_running_loop()
+        decoded = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    self.executor, self._decode, messages[k], k in self.merge
+                )
+                for k in in_bound_ids
+            )
+        )
+
+        for i, k in enumerate(in_bound_ids):
+            for data_chunk in decoded[i]:
+                meta = data_chunk.get("meta")
+                meta["value"]["received"] = received
+                data_chunk.update("meta", meta)
+                if k in self.merge:
+                    for merged in self._merge(k, data_chunk):
+                        await self._update(self.merge[k], merged)
+                else:
+                    await self._update(k, data_chunk)
+
+        if self.sync != "follow-latest":
+            for matched in self._match():
+                self.in_bound_data = matched
+                await self._step(matched)
+
+    async def _update(self, input_id: str, data_chunk: DataChunk):
+
+        # Replicas' outputs are only known to be a replica's share once merged
+        sequence = data_chunk.get("meta")["value"]["sequence"]
+        if self.replica and input_id == self.follow and input_id not in self.in_bound:
+            if not self._is_mine(sequence):
+                return
+
+        if self.sync != "follow-latest":
+            self._buffer(input_id, data_chunk)
+            return
+
+        # Update the latest value
+        self.in_bound_data[self.nicknames[input_id]] = data_chunk
+
+        # Step for every new value of the node that is being followed, if all
+        # inputs are available
+        if self.follow == input_id and len(self.in_bound_data) == len(self.inputs):
+            await self._step(self.in_bound_data)
+
+    def _is_mine(self, sequence: Optional[int]) -> bool:
+        if self.replica is None or sequence is None:
+            return True
+        index, count = self.replica
+        return sequence % count == index
 
-            # Update the latest value
-            nickname = self.in_bound_by_name[self.in_bound.index(k)]
-            self.in_bound_data[nickname] = data_chunk
+    def _merge(self, in_bound_id: str, data_chunk: DataChunk) -> List[DataChunk]:
 
-            # Update flag if new values are coming from the node that is
-            # being followed
-            if self.follow == k:
-                follow_event = True
+        input_id = self.merge[in_bound_id]
+        pending = self.pending[input_id]
+        last_orders = self.last_orders[input_id]
+        order = data_chunk.get("meta")["value"]["order"]
+        last_orders[in_bound_id] = order
 
-        # If update on the follow and all inputs available, then use the inputs
-        if follow_event and len(self.in_bound_data) == len(self.in_bound):
+        # Already skipped
+        next_order = self.next_orders.get(input_id)
+        if next_order is not None and order < next_order:
+            self.stats[input_id].unmatched += 1
+            return []
+        pending[order] = data_chunk
+
+        # Starting once all the replicas have delivered
+        overflow = len(pending) > self.buffer_size
+        if next_order is None:
+            if min(last_orders.values()) < 0 and not overflow:
+                return []
+            next_order = min(pending)
+
+        # A missing output is skipped once all the replicas are past it (they
+        # deliver in order), or if too many are waiting
+        merged: List[DataChunk] = []
+        while pending:
+            if next_order in pending:
+                merged.append(pending.pop(next_order))
+            elif len(pending) > self.buffer_size:
+                next_order = min(pending)
+                continue
+            elif min(last_orders.values()) <= next_order:
+                break
+            next_order += 1
+
+        self.next_orders[input_id] = next_order
+        return merged
+
+    async def _step(self, data_chunks: Dict[str, DataChunk]):
+
+        if self.batch_size <= 1:
             await self.eventbus.asend(
-                Event("in_step", NewInBoundDataEvent(self.in_bound_data))
+                Event("in_step", NewInBoundDataEvent(data_chunks))
+            )
+            return
+
+        # The batch's deadline starts with its first input set
+        self.batch.append(data_chunks.copy())
+        if len(self.batch) >= self.batch_size:
+            await self._send_batch()
+        elif not self.batch_timer:
+            self.batch_timer = asyncio.get_running_loop().call_later(
+                self.batch_timeout, self._on_batch_timeout
             )
+
+    def _on_batch_timeout(self):
+        self.batch_timer = None
+        self.batch_task = asyncio.create_task(self._send_batch())
+
+    async def _send_batch(self):
+
+        if self.batch_timer:
+            self.batch_timer.cancel()
+            self.batch_timer = None
+
+        batch, self.batch = self.batch, []
+        if batch:
+            await self.eventbus.asend(Event("in_step", NewInBoundDataEvent(batch)))
+
+    def _decode(
+        self, messages: List[Tuple[str, int, List[Any]]], replicated: bool = False
+    ) -> List[DataChunk]:
+
+        data_chunks: List[DataChunk] = []
+        for _, sequence, frames in messages:
+            data_chunk = DataChunk.from_bytes(frames, lazy=self.lazy)
+
+            # With the sequence number in its publisher's stream, and the
+            # replicas' outputs with the sequence of their inputs
+            meta = data_chunk.get("meta")
+            meta["value"]["sequence"] = sequence
+            if replicated:
+                meta["value"]["sequence"] = meta["value"]["order"]
+            data_chunk.update("meta", meta)
+            data_chunks.append(data_chunk)
+
+        return data_chunks
+
+    def _buffer(self, input_id: str, data_chunk: DataChunk):
+
+        meta = data_chunk.get("meta")["value"]
+        if self.sync == "exact-sequence":
+            key = meta["sequence"]
+        else:
+            key = meta["created"]
+
+        # Bounded, the oldest message is discarded
+        buffer = self.buffers[input_id]
+        if len(buffer) >= self.buffer_size:
+            buffer.popleft()
+            self.stats[input_id].unmatched += 1
+        buffer.append((key, data_chunk))
+
+    def _discard(self, input_id: str, count: int):
+        for _ in range(count):
+            self.buffers[input_id].popleft()
+        self.stats[input_id].unmatched += count
+
+    def _match(self) -> Iterator[Dict[str, DataChunk]]:
+
+        slop = self.slop if self.sync == "approximate-time" else 0
+        while all(self.buffers.values()):
+
+            # A match includes the oldest message of one of the inputs, at
+            # the latest the newest of these. Older messages than that (minus
+            # the slop) can't be matched anymore
+            pivot = max(buffer[0][0] for buffer in self.buffers.values())
+            stale = False
+            for input_id, buffer in self.buffers.items():
+                count = 0
+                for key, _ in buffer:
+                    if key >= pivot - slop:
+                        break
+                    count += 1
+                if count:
+                    self._discard(input_id, count)
+                    stale = True
+            if stale:
+                continue
+
+            # The closest message to the pivot of each input
+            matched: Dict[str, DataChunk] = {}
+            for input_id, buffer in self.buffers.items():
+                closest = min(
+                    range(len(buffer)), key=lambda i: abs(buffer[i][0] - pivot)
+                )
+                self._discard(input_id, closest)
+                matched[self.nicknames[input_id]] = buffer.popleft()[1]
+
+            yield matched
@@ -1,13 +1,14 @@
 import asyncio
-import datetime
 import logging
 import threading
 import time
 import traceback
-from typing import Any, Callable, Coroutine, Dict, List, Literal, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Coroutine, Dict, List, Literal, Optional, Union
 
-from chimerapy.engine import _logger
+from chimerapy.engine import _logger, config
 
+from ..data_protocols import SchedulerStats
 from ..eventbus import Event, EventBus, TypedObserver
 from ..networking import DataChunk
 from ..networking.client import Client
@@ -22,6 +23,13 @@ from .events import (
 )
 from .registered_method import RegisteredMethod
 
+# The event loop's timers have a millisecond resolution, sources can wait
+# for the last millisecond before their deadline by yielding instead
+SPIN_NS = 1_000_000
+
+# Longest time a source steps without yielding to the event loop
+YIELD_NS = 1_000_000
+
 
 class ProcessorService(Service):
     def __init__(
@@ -36,6 +44,10 @@ class ProcessorService(Service):
         registered_methods: Dict[str, RegisteredMethod] = {},
         registered_node_fns: Dict[str, Callable] = {},
         operation_mode: Literal["main", "step"] = "step",
+        batched: bool = False,
+        rate: Optional[float] = None,
+        pipelined: bool = False,
+        order_by: Optional[str] = None,
         logger: Optional[logging.Logger] = None,
     ):
         super().__init__(name)
@@ -48,6 +60,10 @@ class ProcessorService(Service):
         self.teardown_fn = teardown_fn
         self.operation_mode = operation_mode
         self.in_bound_data = in_bound_data
+        self.batched = batched
+        self.rate = rate
+        self.pipelined = pipelined
+        self.order_by = order_by
         self.registered_methods = registered_methods
         self.registered_node_fns = registered_node_fns
 
@@ -64,6 +80,16 @@ class ProcessorService(Service):
         self.tasks: List[asyncio.Task] = []
         self.main_thread: Optional[threading.Thread] = None
 
+        # Timing of the source's steps, shared with the profiler
+        self.stats = SchedulerStats()
+
+        # Pipelined steps: bounded hand-off queues between the stages, each
+        # stage with its own thread (inputs are decoded by the poller and
+        # outputs encoded by the publisher)
+        self.inputs: Optional[asyncio.Queue] = None
+        self.outputs: Optional[asyncio.Queue] = None
+        self.step_executor: Optional[ThreadPoolExecutor] = None
+
     async def async_init(self):
 
         # Put observers
@@ -128,10 +154,14 @@ class ProcessorService(Service):
 
                 # If step or sink node, only run with inputs
                 if self.in_bound_data:
+                    if self.pipelined:
+                        self.start_pipeline()
                     observer = TypedObserver(
                         "in_step",
                         NewInBoundDataEvent,
-                        on_asend=self.safe_step,
+                        on_asend=(
+                            self.pipelined_step if self.pipelined else self.safe_step
+                        ),
                         handle_event="unpack",
                     )
                     await self.eventbus.asubscribe(observer)
@@ -139,11 +169,10 @@ class ProcessorService(Service):
 
                     # self.logger.debug(f"{self}: step or sink node: {self.state.id}")
 
-                # If source, run as fast as possible
+                # If source, run at its rate or as fast as possible
                 else:
                     # self.logger.debug(f"{self}: source node: {self.state.id}")
-                    while self.running:
-                        await self.safe_step()
+                    await self.run_source()
 
     async def stop(self):
         self.running = False
@@ -161,6 +190,13 @@ class ProcessorService(Service):
         if self.running_task:
             await self.running_task
 
+        # Dropping the steps still in the pipeline
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        if self.step_executor:
+            self.step_executor.shutdown()
+
         if self.teardown_fn:
             await self.safe_exec(self.teardown_fn)
 
@@ -241,6 +277,112 @@ class ProcessorService(Service):
     ## Helper Methods
     ####################################################################
 
+    def start_pipeline(self):
+        self.inputs = asyncio.Queue(maxsize=1)
+        self.outputs = asyncio.Queue(maxsize=1)
+        self.step_executor = ThreadPoolExecutor(1, thread_name_prefix="step")
+        self.tasks.append(asyncio.create_task(self._step_stage()))
+        self.tasks.append(asyncio.create_task(self._publish_stage()))
+
+    async def pipelined_step(
+        self,
+        data_chunks: Union[Dict[str, DataChunk], List[Dict[str, DataChunk]]],
+    ):
+        # Waiting while the step stage is busy with an input already queued,
+        # the poller decodes the next one meanwhile
+        assert self.inputs
+        await self.inputs.put(data_chunks)
+
+    async def _step_stage(self):
+
+        assert self.inputs and self.outputs
+        loop = asyncio.get_running_loop()
+        while True:
+            data_chunks = await self.inputs.get()
+
+            # An error only loses this input, the stage keeps running for
+            # the next ones
+            output, delta = None, 0.0
+            try:
+                if asyncio.iscoroutinefunction(self.main_fn):
+                    with self.step_lock:
+                        output, delta = await self.safe_exec(
+                            self.main_fn, kwargs={"data_chunks": data_chunks}
+                        )
+                else:
+                    output, delta = await loop.run_in_executor(
+                        self.step_executor, self._exec_step, data_chunks
+                    )
+            except Exception:
+                self.logger.error(traceback.format_exc())
+            await self.outputs.put((output, delta, data_chunks))
+
+    def _exec_step(self, data_chunks: Any):
+
+        tic = time.perf_counter()
+        output = None
+        with self.step_lock:
+            try:
+                output = self.main_fn(data_chunks=data_chunks)  # type: ignore[misc]
+            except Exception:
+                self.logger.error(traceback.format_exc())
+
+        return output, (time.perf_counter() - tic) * 1000
+
+    async def _publish_stage(self):
+
+        assert self.outputs
+        while True:
+            output, delta, data_chunks = await self.outputs.get()
+            try:
+                await self.publish_outputs(output, delta, data_chunks)
+            except Exception:
+                self.logger.error(traceback.format_exc())
+            self.step_id += 1
+
+    async def run_source(self):
+
+        # Absolute deadlines on a monotonic clock, for the rate to not drift
+        # with the steps' durations. Sleeping until them is up to a
+        # millisecond late, unless spinning for the last one (using a core)
+        period = int(1e9 / self.rate) if self.rate else 0
+        spin_ns = SPIN_NS if config.get("sources.spin-wait") else 0
+        deadline = time.monotonic_ns()
+        last_yield = deadline
+
+        while self.running:
+
+            if period:
+                now = time.monotonic_ns()
+                if deadline - now > spin_ns:
+                    await asyncio.sleep((deadline - now - spin_ns) / 1e9)
+                while time.monotonic_ns() < deadline:
+                    await asyncio.sleep(0)
+                last_yield = time.monotonic_ns()
+                self._update_jitter((last_yield - deadline) / 1e6)
+
+            await self.safe_step()
+            self.stats.steps += 1
+            now = time.monotonic_ns()
+
+            # Starting again from now when the step overran its period, the
+            # missed deadlines are skipped
+            if period:
+                deadline += period
+                if now > deadline:
+                    self.stats.overruns += 1
+                    deadline = now
+
+            # Yielding to the event loop only when it hasn't for a while
+            if now - last_yield > YIELD_NS:
+                await asyncio.sleep(0)
+                last_yield = time.monotonic_ns()
+
+    def _update_jitter(self, delay: float):
+        steps = self.stats.steps + 1
+        self.stats.jitter += (delay - self.stats.jitter) / steps
+        self.stats.max_jitter = max(self.stats.max_jitter, delay)
+
     async def safe_exec(
         self, func: Callable, args: List = [], kwargs: Dict = {}
     ) -> Any:
@@ -253,7 +395,6 @@ class ProcessorService(Service):
             if asyncio.iscoroutinefunction(func):
                 output = await func(*args, **kwargs)
             else:
-                await asyncio.sleep(1 / 1000)  # Allow other functions to run as well
                 output = func(*args, **kwargs)
         except Exception:
             traceback_info = traceback.format_exc()
@@ -265,7 +406,12 @@ class ProcessorService(Service):
 
         return output, delta
 
-    async def safe_step(self, data_chunks: Dict[str, DataChunk] = {}):
+    async def safe_step(
+        self,
+        data_chunks: Optional[
+            Union[Dict[str, DataChunk], List[Dict[str, DataChunk]]]
+        ] = None,
+    ):
 
         # Default value
         output = None
@@ -280,8 +426,41 @@ class ProcessorService(Service):
                 else:
                     output, delta = await self.safe_exec(self.main_fn)
 
+        await self.publish_outputs(output, delta, data_chunks)
+
+        # Update the counter
+        self.step_id += 1
+
+    async def publish_outputs(
+        self,
+        output: Any,
+        delta: float,
+        data_chunks: Optional[
+            Union[Dict[str, DataChunk], List[Dict[str, DataChunk]]]
+        ] = None,
+    ):
+
+        # A batch's outputs are published individually when listed
+        inputs = data_chunks if isinstance(data_chunks, list) else [data_chunks or {}]
+        outputs = [output]
+        if self.batched and isinstance(output, list):
+            outputs = output
+
+        # Replicas' outputs are merged in the order of their inputs, so each
+        # output of a batch needs its own
+        if len(inputs) != len(outputs):
+            if self.order_by:
+                self.logger.error(
+                    f"{self}: replicated batched nodes must output one value "
+                    f"per input set, got {len(outputs)} for {len(inputs)}"
+                )
+                return
+            inputs = inputs[-1:] * len(outputs)
+
         # If output generated, send it!
-        if output:
+        for i, output in enumerate(outputs):
+            if not output:
+                continue
 
             # If output is not DataChunk, just add as default
             if not isinstance(output, DataChunk):
@@ -292,16 +471,17 @@ class ProcessorService(Service):
 
             # And then save the latest value
             self.latest_data_chunk = output_data_chunk
+            output_data_chunk.set_source(self.state.id)
 
             # Add timestamp and step id to the DataChunk
             meta = output_data_chunk.get("meta")
-            meta["value"]["transmitted"] = datetime.datetime.now()
+            meta["value"]["transmitted"] = time.time_ns()
             meta["value"]["delta"] = delta
+            if self.order_by:
+                input_meta = inputs[i][self.order_by].get("meta")["value"]
+                meta["value"]["order"] = input_meta["sequence"]
             output_data_chunk.update("meta", meta)
 
             # Send out the output to the OutputsHandler
             event_data = NewOutBoundDataEvent(output_data_chunk)
             await self.eventbus.asend(Event("out_step", event_data))
-
-        # Update the counter
-        self.step_id += 1
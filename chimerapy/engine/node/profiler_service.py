@@ -1,9 +1,8 @@
 import datetime
 import logging
 import os
-import pickle
 from collections import deque
-from typing import Any, Dict, List, Optional
+from typing import Dict, List, Optional
 
 import pandas as pd
 from psutil import Process
@@ -11,7 +10,12 @@ from psutil import Process
 from chimerapy.engine import config
 
 from ..async_timer import AsyncTimer
-from ..data_protocols import NodeDiagnostics
+from ..data_protocols import (
+    NodeDiagnostics,
+    PublisherStats,
+    SchedulerStats,
+    SubscriberStats,
+)
 from ..eventbus import Event, EventBus, TypedObserver
 from ..networking.data_chunk import DataChunk
 from ..service import Service
@@ -21,7 +25,14 @@ from .events import DiagnosticsReportEvent, EnableDiagnosticsEvent, NewOutBoundD
 
 class ProfilerService(Service):
     def __init__(
-        self, name: str, state: NodeState, eventbus: EventBus, logger: logging.Logger
+        self,
+        name: str,
+        state: NodeState,
+        eventbus: EventBus,
+        logger: logging.Logger,
+        publisher_stats: Optional[PublisherStats] = None,
+        subscriber_stats: Optional[Dict[str, SubscriberStats]] = None,
+        scheduler_stats: Optional[SchedulerStats] = None,
     ):
         super().__init__(name=name)
 
@@ -29,6 +40,9 @@ class ProfilerService(Service):
         self.state = state
         self.eventbus = eventbus
         self.logger = logger
+        self.publisher_stats = publisher_stats
+        self.subscriber_stats = subscriber_stats or {}
+        self.scheduler_stats = scheduler_stats
 
         # State variables
         self._enable: bool = False
@@ -137,6 +151,20 @@ class ProfilerService(Service):
             memory_usage=memory_usage,
             cpu_usage=cpu_usage,
             num_of_steps=num_of_steps,
+            publisher=(
+                PublisherStats(**self.publisher_stats.to_dict())
+                if self.publisher_stats
+                else PublisherStats()
+            ),
+            subscribers={
+                in_bound_id: SubscriberStats(**stats.to_dict())
+                for in_bound_id, stats in self.subscriber_stats.items()
+            },
+            scheduler=(
+                SchedulerStats(**self.scheduler_stats.to_dict())
+                if self.scheduler_stats
+                else SchedulerStats()
+            ),
         )
 
         # Send the information to the Worker and ultimately the Manager
@@ -155,6 +183,15 @@ class ProfilerService(Service):
                 "memory_usage(KB)": memory_usage,
                 "cpu_usage(%)": cpu_usage,
                 "num_of_steps(int)": num_of_steps,
+                "sent(int)": diag.publisher.sent,
+                "dropped(int)": diag.publisher.dropped,
+                "in_gaps(int)": sum(s.gaps for s in diag.subscribers.values()),
+                "in_dropped(int)": sum(s.dropped for s in diag.subscribers.values()),
+                "in_unmatched(int)": sum(
+                    s.unmatched for s in diag.subscribers.values()
+                ),
+                "jitter(ms)": diag.scheduler.jitter,
+                "overruns(int)": diag.scheduler.overruns,
             }
 
             df = pd.Series(data).to_frame().T
@@ -179,13 +216,14 @@ class ProfilerService(Service):
 
         # Obtain the meta data of the data chunk
         meta = data_chunk.get("meta")["value"]
-        self.seen_uuids.append(data_chunk._uuid)
+        self.seen_uuids.append(data_chunk.uuid)
 
-        # Get the payload size (of all keys)
+        # Get the payload size (of all keys), reusing the serialization
+        # shared with the publisher
         total_size = 0.0
-        for key in data_chunk.contains():
-            payload = data_chunk.get(key)["value"]
-            total_size += self.get_object_kilobytes(payload)
+        for key, size in data_chunk.get_sizes().items():
+            if key != "meta":
+                total_size += size / 1024
         payload_sizes.append(total_size)
 
         # After processing all data_chunk keys, get payload total
@@ -195,8 +233,5 @@ class ProfilerService(Service):
         self.deques["latency(ms)"].append(meta["delta"])
         self.deques["payload_size(KB)"].append(payload_size)
 
-    def get_object_kilobytes(self, payload: Any) -> float:
-        return len(pickle.dumps(payload)) / 1024
-
     async def teardown(self):
         await self.async_timer.stop()
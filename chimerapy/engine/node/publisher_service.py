@@ -1,10 +1,16 @@
+import asyncio
 import logging
-from typing import Dict, Optional
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from chimerapy.engine import _logger
 
+from ..data_protocols import PublisherStats
 from ..eventbus import EventBus, TypedObserver
 from ..networking import DataChunk, Publisher
+from ..networking.codecs import get_codec
+from ..networking.publisher import BackpressurePolicy
 from ..service import Service
 from ..states import NodeState
 
@@ -18,6 +24,10 @@ class PublisherService(Service):
         name: str,
         state: NodeState,
         eventbus: EventBus,
+        policy: BackpressurePolicy = "drop-newest",
+        queue_size: int = 1,
+        streams: Optional[Dict[str, List[str]]] = None,
+        pipelined: bool = False,
         logger: Optional[logging.Logger] = None,
     ):
         super().__init__(name)
@@ -25,6 +35,22 @@ class PublisherService(Service):
         # Save information
         self.state = state
         self.eventbus = eventbus
+        self.policy = policy
+        self.queue_size = queue_size
+
+        # Named streams with some of the records of each DataChunk, besides
+        # the default stream with all of them
+        self.streams: Dict[str, List[str]] = streams or {}
+
+        # Pipelined nodes encode their outputs in their own thread
+        self.pipelined = pipelined
+        self.executor: Optional[ThreadPoolExecutor] = None
+
+        # Counters of the publisher, shared with the profiler
+        self.stats = PublisherStats()
+
+        # States (content type, key) of the stateful codecs published
+        self.codec_states: Set[Tuple[str, str]] = set()
 
         # Logging
         if logger:
@@ -50,18 +76,75 @@ class PublisherService(Service):
     def setup(self):
 
         # Creating publisher
-        self.publisher = Publisher()
+        self.publisher = Publisher(policy=self.policy, queue_size=self.queue_size)
+        self.publisher.stats = self.stats
+        self.publisher.on_drop = self.request_keyframes
         self.publisher.start()
         self.state.port = self.publisher.port
+        self.state.pid = os.getpid()
+        self.state.endpoints = self.publisher.endpoints
+
+        if self.pipelined:
+            self.executor = ThreadPoolExecutor(1, thread_name_prefix="encode")
 
     async def publish(self, data_chunk: DataChunk):
         # self.logger.debug(f"{self}: publishing {data_chunk}")
-        await self.publisher.publish(data_chunk.to_bytes())
+        # Image streams need a keyframe for new subscribers
+        if self.publisher.has_new_subscribers():
+            self.request_keyframes(self.codec_states)
+
+        # Only the streams with subscribers are produced, encoding only
+        # their records, and each of them once
+        selected: Dict[str, Optional[List[str]]] = {}
+        if self.publisher.is_subscribed(""):
+            selected[""] = None
+        for stream, names in self.streams.items():
+            if self.publisher.is_subscribed(stream):
+                selected[stream] = names
+        if not selected:
+            return
+
+        if self.executor:
+            streams = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self._serialize, data_chunk, selected
+            )
+        else:
+            streams = self._serialize(data_chunk, selected)
+
+        # And the next messages, if the keyframes of this one are dropped
+        states = data_chunk.get_codec_states()
+        self.codec_states.update((content_type, key) for content_type, key, _ in states)
+        keyframes = [
+            (content_type, key)
+            for content_type, key, is_keyframe in states
+            if is_keyframe
+        ]
+
+        if not await self.publisher.publish_streams(streams, tag=keyframes):
+            self.logger.debug(f"{self}: publisher saturated, stats={self.stats}")
+
+    def _serialize(
+        self, data_chunk: DataChunk, selected: Dict[str, Optional[List[str]]]
+    ) -> Dict[str, Any]:
+        streams: Dict[str, Any] = {}
+        for stream, names in selected.items():
+            if names is None:
+                streams[stream] = data_chunk.to_frames()
+            else:
+                data_chunk.encode(names)
+                streams[stream] = data_chunk.select(names).to_frames()
+        return streams
+
+    def request_keyframes(self, codec_states: Iterable[Tuple[str, str]]):
+        for content_type, key in codec_states:
+            get_codec(content_type).request_keyframe(key)
 
     def teardown(self):
 
         # Shutting down publisher
         if self.publisher:
             self.publisher.shutdown()
+        if self.executor:
+            self.executor.shutdown()
 
         # self.logger.debug(f"{self}: shutdown")
@@ -6,7 +6,7 @@ from typing import Dict, Literal, Optional
 
 from dataclasses_json import DataClassJsonMixin, cfg
 
-from .data_protocols import NodeDiagnostics
+from .data_protocols import NodeDiagnostics, NodePubEntry
 from .node.registered_method import RegisteredMethod
 
 # As https://github.com/lidatong/dataclasses-json/issues/202#issuecomment-1186373078
@@ -19,6 +19,8 @@ class NodeState(DataClassJsonMixin):
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
     name: str = ""
     port: int = 0
+    pid: int = 0
+    endpoints: Dict[str, str] = field(default_factory=dict)
 
     fsm: Literal[
         "NULL",
@@ -51,6 +53,9 @@ class WorkerState(DataClassJsonMixin):
     # Node Handler Information
     nodes: Dict[str, NodeState] = field(default_factory=dict)
 
+    # Relays of remote nodes' publishers, by node id
+    relays: Dict[str, NodePubEntry] = field(default_factory=dict)
+
     # Http Server Information
     ip: str = "0.0.0.0"
     port: int = 0
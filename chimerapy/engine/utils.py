@@ -8,7 +8,7 @@ import socket
 import time
 import uuid
 from concurrent.futures import Future
-from typing import Any, Callable, Coroutine, Dict, Optional, Tuple, Union
+from typing import Any, Callable, Coroutine, Dict, Optional, Set, Tuple, Union
 
 # Third-party
 # Internal
@@ -103,6 +103,62 @@ def waiting_for(
                     return False
 
 
+class ChangeNotifier:
+    """Wake the coroutines waiting for a condition when the state changes.
+
+    Unlike ``async_waiting_for``, which polls the condition, ``wait_for`` \
+    re-evaluates it only when the state's owner calls ``notify`` after \
+    changing it, and returns as soon as it holds.
+
+    """
+
+    def __init__(self):
+        self._waiters: Set[asyncio.Future] = set()
+
+    def notify(self, *args, **kwargs):
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(True)
+
+    async def wait_for(
+        self,
+        condition: Callable[[], bool],
+        timeout: Optional[Union[int, float]] = None,
+        timeout_raise: Optional[bool] = False,
+    ) -> bool:
+        """Wait until the condition holds.
+
+        Args:
+            condition (Callable[[], bool]): Checked on each change.
+            timeout (Optional[Union[int, float]]): In seconds, forever if \
+                ``None``.
+            timeout_raise (Optional[bool]): Raise ``TimeoutError`` instead \
+                of returning ``False`` on timeout.
+
+        Returns:
+            bool: Whether the condition holds.
+
+        """
+        loop = asyncio.get_running_loop()
+
+        async def wait():
+            while not condition():
+                waiter = loop.create_future()
+                self._waiters.add(waiter)
+                try:
+                    await waiter
+                finally:
+                    self._waiters.discard(waiter)
+
+        try:
+            await asyncio.wait_for(wait(), timeout or None)
+        except asyncio.TimeoutError:
+            if timeout_raise:
+                raise TimeoutError(str(condition) + ": FAILURE") from None
+            return False
+        return True
+
+
 def get_open_port(start_port: int) -> socket.socket:
 
     # Creating socket to connect
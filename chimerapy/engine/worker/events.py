@@ -1,9 +1,10 @@
 import pathlib
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 from ..data_protocols import NodePubTable
+from ..networking.subscriber import DeliveryMode
 from ..node.node_config import NodeConfig
 
 
@@ -30,6 +31,11 @@ class CreateNodeEvent:
     node_config: NodeConfig
 
 
+@dataclass
+class CreateNodesEvent:
+    node_configs: List[NodeConfig]
+
+
 @dataclass
 class DestroyNodeEvent:
     node_id: str
@@ -40,6 +46,12 @@ class ProcessNodePubTableEvent:
     node_pub_table: NodePubTable
 
 
+@dataclass
+class CreateRelaysEvent:
+    node_pub_table: NodePubTable
+    streams: Dict[str, Dict[str, DeliveryMode]] = field(default_factory=dict)
+
+
 @dataclass
 class RegisteredMethodEvent:
     node_id: str
@@ -15,12 +15,15 @@ from ..data_protocols import (
 from ..eventbus import Event, EventBus, TypedObserver
 from ..networking import Server
 from ..networking.enums import NODE_MESSAGE
+from ..node.node_config import NodeConfig
 from ..service import Service
 from ..states import NodeState, WorkerState
 from ..utils import update_dataclass
 from .events import (
     BroadcastEvent,
     CreateNodeEvent,
+    CreateNodesEvent,
+    CreateRelaysEvent,
     DestroyNodeEvent,
     EnableDiagnosticsEvent,
     ProcessNodePubTableEvent,
@@ -56,9 +59,11 @@ class HttpServerService(Service):
             id=self.state.id,
             routes=[
                 web.post("/nodes/create", self._async_create_node_route),
+                web.post("/nodes/create_batch", self._async_create_nodes_route),
                 web.post("/nodes/destroy", self._async_destroy_node_route),
                 web.get("/nodes/pub_table", self._async_get_node_pub_table),
                 web.post("/nodes/pub_table", self._async_process_node_pub_table),
+                web.post("/nodes/relays", self._async_create_relays_route),
                 web.get("/nodes/gather", self._async_report_node_gather),
                 web.post("/nodes/collect", self._async_collect),
                 web.post("/nodes/step", self._async_step_route),
@@ -148,7 +153,12 @@ class HttpServerService(Service):
         # Construct simple data structure for Node to address information
         node_pub_table = NodePubTable()
         for node_id, node_state in self.state.nodes.items():
-            node_entry = NodePubEntry(ip=self.state.ip, port=node_state.port)
+            node_entry = NodePubEntry(
+                ip=self.state.ip,
+                port=node_state.port,
+                pid=node_state.pid,
+                endpoints=node_state.endpoints,
+            )
             node_pub_table.table[node_id] = node_entry
 
         return node_pub_table
@@ -224,6 +234,19 @@ class HttpServerService(Service):
 
         return web.HTTPOk()
 
+    async def _async_create_nodes_route(self, request: web.Request) -> web.Response:
+        msg_bytes = await request.read()
+
+        # Create the nodes concurrently, and report which are ready
+        node_configs: List[NodeConfig] = pickle.loads(msg_bytes)
+        await self.eventbus.asend(Event("create_nodes", CreateNodesEvent(node_configs)))
+        results = {
+            node_config.id: node_config.id in self.state.nodes
+            and self.state.nodes[node_config.id].fsm == "READY"
+            for node_config in node_configs
+        }
+        return web.json_response(results)
+
     async def _async_destroy_node_route(self, request: web.Request) -> web.Response:
         msg = await request.json()
 
@@ -249,6 +272,16 @@ class HttpServerService(Service):
 
         return web.HTTPOk()
 
+    async def _async_create_relays_route(self, request: web.Request) -> web.Response:
+        msg = await request.json()
+        node_pub_table: NodePubTable = NodePubTable.from_dict(msg["node_pub_table"])
+
+        # Create the relays and provide their entries in the nodes' stead
+        event_data = CreateRelaysEvent(node_pub_table, msg.get("streams", {}))
+        await self.eventbus.asend(Event("create_relays", event_data))
+        relay_table = NodePubTable(table=dict(self.state.relays))
+        return web.json_response(relay_table.to_json())
+
     async def _async_step_route(self, request: web.Request) -> web.Response:
         await self.eventbus.asend(Event("step_nodes"))
         return web.HTTPOk()
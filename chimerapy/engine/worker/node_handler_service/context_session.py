@@ -1,11 +1,29 @@
 import abc
 import asyncio
-from concurrent.futures import Future, ThreadPoolExecutor
+import collections
+import importlib
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from functools import partial
-from typing import Awaitable, Callable, List, Optional, Union
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import multiprocess as mp
 
+from chimerapy.engine import config
+
 
 class MultiprocessExecutor:
     def __init__(self, pool: Optional[mp.Pool] = None, processes=None):
@@ -32,12 +50,187 @@ class MultiprocessExecutor:
             self.pool.join()
 
 
+def _watch_parent():
+    """Exit with the parent (e.g. the Worker crashed), instead of orphaned."""
+    parent_pid = os.getppid()
+    while os.getppid() == parent_pid:
+        time.sleep(1)
+    os._exit(1)
+
+
+def _host(connection: Any, preload: List[str]):
+    """Wait, with the modules preloaded, for a function to execute."""
+    threading.Thread(target=_watch_parent, daemon=True).start()
+
+    for module in preload:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+    try:
+        task = connection.recv()
+    except EOFError:
+        return
+    if task is None:
+        return
+
+    fn, args, kwargs = task
+    try:
+        result = (True, fn(*args, **kwargs))
+    except BaseException as e:
+        result = (False, e)
+    connection.send(result)
+    connection.close()
+
+
+class ProcessExecutor(Executor):
+    def __init__(
+        self,
+        start_method: Optional[str] = None,
+        warm: int = 0,
+        preload: Sequence[str] = (),
+    ):
+        """Execute each submitted function in a process of its own.
+
+        After the first submission, ``warm`` idle processes are started \
+        in advance, with the ``preload`` modules already imported, and \
+        take the submitted functions as they come, so that the process \
+        startup and imports aren't paid for on submission. Each taken \
+        process is replaced, in the background.
+
+        The processes aren't daemonic, for the nodes to start their own, \
+        but exit if the process of the executor does.
+
+        Args:
+            start_method (Optional[str]): ``spawn``, ``forkserver`` or \
+                ``fork``, the platform's default if ``None``.
+            warm (int): Number of idle processes kept ready.
+            preload (Sequence[str]): Modules imported by the processes.
+
+        """
+        self.context = mp.get_context(start_method)
+        self.warm = warm
+        self.preload = list(preload)
+        self.processes: List[Any] = []
+        self.idle: Deque[Tuple[Any, Any]] = collections.deque()
+        self._lock = threading.Lock()
+
+        # Started with the first submission, and refilled by this thread
+        self._filler = ThreadPoolExecutor(1, thread_name_prefix="warm")
+
+    def _spawn(self) -> Tuple[Any, Any]:
+        connection, child_connection = self.context.Pipe()
+        process = self.context.Process(
+            target=_host, args=(child_connection, self.preload), daemon=False
+        )
+        process.start()
+        child_connection.close()
+        return process, connection
+
+    def _fill(self):
+        while len(self.idle) < self.warm:
+            self.idle.append(self._spawn())
+
+    def _acquire(self) -> Tuple[Any, Any]:
+        while True:
+            with self._lock:
+                if not self.idle:
+                    break
+                process, connection = self.idle.popleft()
+            if process.is_alive():
+                return process, connection
+            connection.close()
+        return self._spawn()
+
+    def submit(self, fn, *args, **kwargs):  # type: ignore[override]
+        future: Future = Future()
+        future.set_running_or_notify_cancel()
+
+        # Starting a process takes a while, not done in the caller's thread
+        threading.Thread(
+            target=self._run, args=(fn, args, kwargs, future), daemon=True
+        ).start()
+        return future
+
+    def _run(self, fn: Callable, args: Tuple, kwargs: Dict, future: Future):
+
+        # The function is sent to the process, and the result comes back,
+        # through a pipe
+        process, connection = self._acquire()
+        with self._lock:
+            self.processes.append(process)
+            if self.warm:
+                self._filler.submit(self._fill)
+        try:
+            connection.send((fn, args, kwargs))
+        except (BrokenPipeError, OSError) as e:
+            future.set_exception(e)
+            self._release(process)
+            return
+
+        self._wait(process, connection, future)
+
+    def _release(self, process: Any):
+        process.join()
+        with self._lock:
+            if process in self.processes:
+                self.processes.remove(process)
+
+    def _wait(self, process: Any, connection: Any, future: Future):
+        try:
+            success, result = connection.recv()
+        except EOFError:
+            success, result = False, None
+        connection.close()
+
+        # Without waiting for the process to exit, unless it died
+        if success:
+            future.set_result(result)
+        else:
+            if result is None:
+                process.join()
+                result = RuntimeError(
+                    f"Process {process.pid} exited with code {process.exitcode}"
+                )
+            future.set_exception(result)
+        self._release(process)
+
+    def shutdown(self, wait=True, **kwargs):
+        # The idle processes exit when sent nothing to execute
+        with self._lock:
+            self.warm = 0
+        self._filler.shutdown()
+        while self.idle:
+            process, connection = self.idle.popleft()
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+            process.join()
+
+        if not wait:
+            return
+
+        # Terminating the processes that don't exit
+        with self._lock:
+            processes = list(self.processes)
+        for process in processes:
+            process.join(timeout=config.get("worker.timeout.node-shutdown"))
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        with self._lock:
+            self.processes = []
+
+
 class ContextSession(abc.ABC):
 
     futures: List[Awaitable]
     loop: asyncio.AbstractEventLoop
     pool: Optional[mp.Pool]
-    executor: Union[MultiprocessExecutor, ThreadPoolExecutor]
+    executor: Union[MultiprocessExecutor, ProcessExecutor, ThreadPoolExecutor]
 
     async def wait_for_all(self):
         await asyncio.wait(self.futures)
@@ -52,10 +245,14 @@ class ContextSession(abc.ABC):
 
 
 class MPSession(ContextSession):
-    def __init__(self):
+    def __init__(self, start_method: Optional[str] = None, warm: Optional[int] = None):
         self.loop = asyncio.get_running_loop()
-        self.pool = mp.Pool(processes=1)
-        self.executor = MultiprocessExecutor(self.pool)
+        self.pool = None
+        self.executor = ProcessExecutor(
+            start_method or config.get("worker.start-method"),
+            warm=config.get("worker.warm-processes") if warm is None else warm,
+            preload=config.get("worker.preload"),
+        )
         self.futures = []
 
 
@@ -1,10 +1,12 @@
 import abc
+import asyncio
 import logging
 import typing
-from typing import Any, Awaitable, Optional, Union
+from typing import Any, Awaitable, List, Optional, Union
 
 # Third-party Imports
 import multiprocess as mp
+from psutil import Process
 
 from ...networking import DataChunk
 from .context_session import ContextSession
@@ -13,6 +15,32 @@ if typing.TYPE_CHECKING:
     from ...node.node import Node
 
 
+def run_node(
+    node_object: "Node",
+    running: Any,
+    cpu_affinity: Optional[List[int]] = None,
+) -> int:
+    """Execute a node in the current process until it's torn down.
+
+    Args:
+        node_object (Node): The node.
+        running (mp.Value): Shared flag to stop the node.
+        cpu_affinity (Optional[List[int]]): The CPUs to pin the process to.
+
+    Returns:
+        int: The node's exit value.
+
+    """
+    if cpu_affinity:
+        try:
+            Process().cpu_affinity(cpu_affinity)
+        except (AttributeError, NotImplementedError, ValueError) as e:
+            node_object.logger.warning(f"{node_object}: CPU affinity not set: {e}")
+
+    node_object.run(None, running)
+    return node_object.join()
+
+
 class NodeController(abc.ABC):
 
     running: Union[bool, mp.Value]
@@ -73,11 +101,21 @@ class MPNodeController(NodeController):
         assert (
             self.running is not None
         ), "MPNodeController must be initialized with an mp.Manager"
+
+        # In a process of its own, until the node is torn down
         self.future = context.add(
-            self.node_object.run,
-            None,
+            run_node,
+            self.node_object,
             self.running,
+            self.node_object.node_config.cpu_affinity,
         )
+        asyncio.ensure_future(self.future).add_done_callback(self._on_exit)
+
+    def _on_exit(self, future: asyncio.Future):
+        if not future.cancelled() and future.exception():
+            self.logger.error(
+                f"{self.node_object}: process failed: {future.exception()}"
+            )
 
     def stop(self):
         if self.running is not None:
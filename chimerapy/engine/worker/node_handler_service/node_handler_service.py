@@ -1,7 +1,7 @@
 import asyncio
 import logging
 import warnings
-from typing import Any, Dict, Type, Union
+from typing import Any, Dict, List, Type, Union
 
 # Third-party Imports
 import dill
@@ -18,10 +18,11 @@ from ...node.node_config import NodeConfig
 from ...node.worker_comms_service import WorkerCommsService
 from ...service import Service
 from ...states import NodeState, WorkerState
-from ...utils import async_waiting_for
+from ...utils import ChangeNotifier
 from ..events import (
     BroadcastEvent,
     CreateNodeEvent,
+    CreateNodesEvent,
     DestroyNodeEvent,
     EnableDiagnosticsEvent,
     ProcessNodePubTableEvent,
@@ -55,6 +56,9 @@ class NodeHandlerService(Service):
         self.node_controllers: Dict[str, NodeController] = {}
         self.mp_manager = mp.Manager()
 
+        # Waking the waits on the nodes' states and responses
+        self.changes = ChangeNotifier()
+
         # Map cls to context
         self.context_class_map: Dict[str, Type[NodeController]] = {
             "multiprocessing": MPNodeController,
@@ -75,6 +79,12 @@ class NodeHandlerService(Service):
                 on_asend=self.async_create_node,
                 handle_event="unpack",
             ),
+            "create_nodes": TypedObserver(
+                "create_nodes",
+                CreateNodesEvent,
+                on_asend=self.async_create_nodes,
+                handle_event="unpack",
+            ),
             "destroy_node": TypedObserver(
                 "destroy_node",
                 DestroyNodeEvent,
@@ -129,6 +139,9 @@ class NodeHandlerService(Service):
                 on_asend=self.update_results,
                 handle_event="unpack",
             ),
+            "WorkerState.changed": TypedObserver(
+                "WorkerState.changed", on_asend=self.changes.notify, handle_event="drop"
+            ),
         }
         for ob in self.observers.values():
             await self.eventbus.asubscribe(ob)
@@ -167,10 +180,12 @@ class NodeHandlerService(Service):
     def update_gather(self, node_id: str, gather: Any):
         self.node_controllers[node_id].gather = gather
         self.node_controllers[node_id].response = True
+        self.changes.notify()
 
     def update_results(self, node_id: str, results: Any):
         self.node_controllers[node_id].registered_method_results = results
         self.node_controllers[node_id].response = True
+        self.changes.notify()
 
     ###################################################################################
     ## Node Handling
@@ -232,7 +247,7 @@ class NodeHandlerService(Service):
             # self.logger.debug(f"{self}: started {node_object}")
 
             # Wait until response from node
-            success = await async_waiting_for(
+            success = await self.changes.wait_for(
                 condition=lambda: self.state.nodes[id].fsm in ["INITIALIZED", "READY"],
                 timeout=config.get("worker.timeout.node-creation"),
             )
@@ -243,7 +258,7 @@ class NodeHandlerService(Service):
                 continue
 
             # Now we wait until the node has fully initialized and ready-up
-            success = await async_waiting_for(
+            success = await self.changes.wait_for(
                 condition=lambda: self.state.nodes[id].fsm == "READY",
                 timeout=config.get("worker.timeout.info-request"),
             )
@@ -266,6 +281,25 @@ class NodeHandlerService(Service):
 
         return success
 
+    async def async_create_nodes(
+        self, node_configs: List[NodeConfig]
+    ) -> Dict[str, bool]:
+        """Create the nodes concurrently.
+
+        Args:
+            node_configs (List[NodeConfig]): The nodes' configurations.
+
+        Returns:
+            Dict[str, bool]: Success in creating each node, by id.
+
+        """
+        results = await asyncio.gather(
+            *[self.async_create_node(node_config) for node_config in node_configs]
+        )
+        return {
+            node_config.id: results[i] for i, node_config in enumerate(node_configs)
+        }
+
     async def async_destroy_node(self, node_id: str) -> bool:
 
         # self.logger.debug(f"{self}: received request for Node {node_id} destruction")
@@ -278,6 +312,7 @@ class NodeHandlerService(Service):
 
             if node_id in self.state.nodes:
                 del self.state.nodes[node_id]
+                self.changes.notify()
 
             success = True
 
@@ -299,7 +334,7 @@ class NodeHandlerService(Service):
         success = []
         for node_id in self.state.nodes:
             for i in range(config.get("worker.allowed-failures")):
-                if await async_waiting_for(
+                if await self.changes.wait_for(
                     condition=lambda: self.state.nodes[node_id].fsm == "CONNECTED",
                     timeout=config.get("worker.timeout.info-request"),
                 ):
@@ -341,7 +376,7 @@ class NodeHandlerService(Service):
         await self.eventbus.asend(
             Event("broadcast", BroadcastEvent(signal=WORKER_MESSAGE.STOP_NODES))
         )
-        await async_waiting_for(
+        await self.changes.wait_for(
             lambda: all(
                 [
                     x.fsm in ["STOPPED", "SAVED", "SHUTDOWN"]
@@ -369,7 +404,7 @@ class NodeHandlerService(Service):
         await self.eventbus.asend(Event("send", event_data))
 
         # Then wait for the Node response
-        success = await async_waiting_for(
+        success = await self.changes.wait_for(
             condition=lambda: self.node_controllers[node_id].response is True,
         )
 
@@ -406,7 +441,7 @@ class NodeHandlerService(Service):
         for node_id in self.state.nodes:
             for i in range(config.get("worker.allowed-failures")):
 
-                if await async_waiting_for(
+                if await self.changes.wait_for(
                     condition=lambda: self.node_controllers[node_id].response is True,
                     timeout=config.get("worker.timeout.info-request"),
                 ):
@@ -447,7 +482,7 @@ class NodeHandlerService(Service):
         for i in range(config.get("worker.allowed-failures")):
             for node_id in self.state.nodes:
 
-                if await async_waiting_for(
+                if await self.changes.wait_for(
                     condition=lambda: self.state.nodes[node_id].fsm == "SAVED",
                     timeout=None,
                 ):
@@ -0,0 +1,89 @@
+import logging
+import os
+from typing import Dict, Optional
+
+from ..data_protocols import NodePubEntry, NodePubTable
+from ..eventbus import EventBus, TypedObserver
+from ..networking import Relay
+from ..networking.subscriber import DeliveryMode
+from ..service import Service
+from ..states import WorkerState
+from .events import CreateRelaysEvent
+
+
+class RelayService(Service):
+    def __init__(
+        self,
+        name: str,
+        state: WorkerState,
+        eventbus: EventBus,
+        logger: logging.Logger,
+    ):
+        super().__init__(name=name)
+
+        # Input parameters
+        self.state = state
+        self.eventbus = eventbus
+        self.logger = logger
+
+        # Containers
+        self.relays: Dict[str, Relay] = {}
+
+    async def async_init(self):
+
+        # Specify observers
+        self.observers: Dict[str, TypedObserver] = {
+            "shutdown": TypedObserver(
+                "shutdown", on_asend=self.shutdown, handle_event="drop"
+            ),
+            "create_relays": TypedObserver(
+                "create_relays",
+                CreateRelaysEvent,
+                on_asend=self.create_relays,
+                handle_event="unpack",
+            ),
+        }
+        for ob in self.observers.values():
+            await self.eventbus.asubscribe(ob)
+
+    async def shutdown(self):
+        for relay in self.relays.values():
+            await relay.shutdown()
+        self.relays.clear()
+
+    async def create_relays(
+        self,
+        node_pub_table: NodePubTable,
+        streams: Optional[Dict[str, Dict[str, DeliveryMode]]] = None,
+    ):
+        """Relay the given publishers, replacing the previous relays.
+
+        The local entries of the relays, for the Manager to distribute to \
+        this Worker's nodes, are stored in ``WorkerState.relays``. An empty \
+        table tears the previous relays down.
+
+        Args:
+            node_pub_table (NodePubTable): The remote nodes' publishers.
+            streams (Optional[Dict[str, Dict[str, DeliveryMode]]]): The \
+                streams to relay per node with their delivery, all of \
+                them if not given.
+
+        """
+        await self.shutdown()
+        if streams is None:
+            streams = {}
+
+        relay_entries: Dict[str, NodePubEntry] = {}
+        for node_id, entry in node_pub_table.table.items():
+            relay = Relay(host=entry.ip, port=entry.port, streams=streams.get(node_id))
+            await relay.start()
+            self.relays[node_id] = relay
+            relay_entries[node_id] = NodePubEntry(
+                ip=relay.host,
+                port=relay.port,
+                pid=os.getpid(),
+                endpoints=relay.endpoints,
+            )
+            # self.logger.debug(f"{self}: created {relay}")
+
+        self.state.relays = relay_entries
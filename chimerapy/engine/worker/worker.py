@@ -19,6 +19,7 @@ from ..states import NodeState, WorkerState
 from .http_client_service import HttpClientService
 from .http_server_service import HttpServerService
 from .node_handler_service import NodeHandlerService
+from .relay_service import RelayService
 
 
 class Worker:
@@ -105,10 +106,17 @@ class Worker:
             logger=self.logger,
             logreceiver=self.logreceiver,
         )
+        self.relay = RelayService(
+            name="relay",
+            state=self.state,
+            eventbus=self.eventbus,
+            logger=self.logger,
+        )
 
         await self.http_client.async_init()
         await self.http_server.async_init()
         await self.node_handler.async_init()
+        await self.relay.async_init()
 
         # Start all services
         await self.eventbus.asend(Event("start"))
@@ -1,7 +1,9 @@
 import asyncio
+import json
 import os
 import pathlib
 import time
+from typing import Dict
 
 import pytest
 
@@ -16,6 +18,34 @@ TEST_DIR = pathlib.Path(os.path.abspath(__file__)).parent.parent
 TEST_PACKAGE_DIR = TEST_DIR / "MOCK"
 
 
+class CountNode(cpe.Node):
+    def setup(self):
+        self.i = 0
+
+    def step(self):
+        self.i += 1
+        return self.i
+
+
+class SquareNode(cpe.Node):
+    def step(self, data_chunks: Dict[str, cpe.DataChunk]):
+        time.sleep(0.05)
+        return data_chunks["Count"].get("default")["value"] ** 2
+
+
+class CollectNode(cpe.Node):
+    def __init__(self, name: str, path: pathlib.Path):
+        super().__init__(name=name)
+        self.path = path
+
+    def setup(self):
+        self.values = []
+
+    def step(self, data_chunks: Dict[str, cpe.DataChunk]):
+        self.values.append(data_chunks["Square"].get("default")["value"])
+        self.path.write_text(json.dumps(self.values))
+
+
 @pytest.fixture
 def local_node_graph(gen_node):
     graph = cpe.Graph()
@@ -160,3 +190,33 @@ class TestLifeCycle:
         assert ((delta2 - delta) / (delta)) < 1
 
         await manager.async_reset()
+
+    async def test_manager_replicated_pipeline(self, manager_with_worker, tmp_path):
+        manager, worker = manager_with_worker
+
+        # Define graph, the square node being slower than the count node
+        count_node = CountNode(name="Count")
+        square_node = SquareNode(name="Square")
+        collect_node = CollectNode(name="Collect", path=tmp_path / "values.json")
+        graph = cpe.Graph()
+        graph.add_node(count_node, rate=40)
+        graph.add_node(square_node, replicas=3)
+        graph.add_node(collect_node)
+        graph.add_edge(src=count_node, dst=square_node)
+        graph.add_edge(src=square_node, dst=collect_node, delivery="lossless")
+
+        # Configure the worker and obtain the mapping
+        mapping = {worker.id: [count_node.id, square_node.id, collect_node.id]}
+        assert await manager.async_commit(graph, mapping)
+
+        assert await manager.async_start()
+        await asyncio.sleep(3)
+        assert await manager.async_stop()
+
+        # The replicas' outputs are merged back in order, without gaps
+        values = json.loads((tmp_path / "values.json").read_text())
+        first = round(values[0] ** 0.5)
+        assert len(values) > 40
+        assert values == [i**2 for i in range(first, first + len(values))]
+
+        await manager.async_reset()
@@ -85,6 +85,21 @@ async def test_worker_handler_create_node(testbed_setup):
     assert "Gen1" not in worker_handler.state.workers[worker.id].nodes
 
 
+async def test_worker_handler_create_nodes(testbed_setup):
+    worker_handler, worker, simple_graph = testbed_setup
+
+    # Register graph
+    worker_handler._register_graph(simple_graph)
+
+    assert await worker_handler._request_nodes_creation(
+        worker_id=worker.id, node_ids=["Gen1", "Con1"]
+    )
+    assert "Gen1" in worker.state.nodes and "Con1" in worker.state.nodes
+
+    # Teardown
+    assert await worker_handler.reset()
+
+
 async def test_worker_handler_create_connections(testbed_setup):
     worker_handler, worker, simple_graph = testbed_setup
 
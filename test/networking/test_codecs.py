@@ -0,0 +1,192 @@
+import numpy as np
+import pytest
+
+import chimerapy.engine as cpe
+from chimerapy.engine.networking import Codec, get_codec, register_codec
+from chimerapy.engine.networking.codecs import (
+    BloscCodec,
+    DeltaImageCodec,
+    JPEGCodec,
+    NDArrayCodec,
+    PNGCodec,
+)
+
+
+class NegateCodec(Codec):
+    def encode(self, value):
+        return -value
+
+    def decode(self, data):
+        return -data
+
+
+@pytest.fixture
+def depth_map():
+    return np.random.rand(48, 64).astype(np.float32)
+
+
+@pytest.fixture
+def image():
+    return (np.random.rand(48, 64, 3) * 255).astype(np.uint8)
+
+
+@pytest.mark.parametrize("content_type", ["raw", "blosc"])
+def test_lossless_array_codecs(depth_map, content_type):
+    data_chunk = cpe.DataChunk()
+    data_chunk.add("depth", depth_map, content_type=content_type)
+
+    for new_data_chunk in [
+        cpe.DataChunk.from_bytes(data_chunk.to_bytes()),
+        cpe.DataChunk.from_bytes(data_chunk.to_frames()),
+    ]:
+        assert np.array_equal(new_data_chunk.get("depth")["value"], depth_map)
+
+
+def test_png_codec(image):
+    data_chunk = cpe.DataChunk()
+    data_chunk.add("image", image, content_type="png")
+
+    new_data_chunk = cpe.DataChunk.from_bytes(data_chunk.to_frames())
+    assert np.array_equal(new_data_chunk.get("image")["value"], image)
+
+
+def test_jpeg_quality(image):
+    low = JPEGCodec(quality=10).encode(image)
+    high = JPEGCodec(quality=95).encode(image)
+    assert len(low) < len(high)
+
+
+def test_blosc_shuffle_selection():
+    codec = BloscCodec(shuffle="auto")
+    assert codec._get_shuffle(1) != codec._get_shuffle(4)
+
+
+def test_register_custom_codec():
+    register_codec("negate", NegateCodec(), overwrite=True)
+    assert isinstance(get_codec("negate"), NegateCodec)
+
+    data_chunk = cpe.DataChunk()
+    data_chunk.add("value", 5, content_type="negate")
+    new_data_chunk = cpe.DataChunk.from_bytes(data_chunk.to_bytes())
+    assert new_data_chunk.get("value")["value"] == 5
+
+
+def test_register_codec_errors():
+    with pytest.raises(ValueError):
+        register_codec("other", NegateCodec())
+    with pytest.raises(ValueError):
+        register_codec("image", NegateCodec())
+    with pytest.raises(KeyError):
+        cpe.DataChunk().add("value", 5, content_type="unknown")
+
+
+@pytest.mark.parametrize("channels", [(), (3,)])
+def test_tiled_image_codec(channels):
+    # Tall enough to be split in tiles, with a smaller last tile
+    image = (np.random.rand(1000, 64, *channels) * 255).astype(np.uint8)
+    codec = PNGCodec()
+
+    tiles = codec.encode(image)
+    assert isinstance(tiles, list) and len(tiles) > 1
+    assert np.array_equal(codec.decode(tiles), image)
+
+    jpeg_image = JPEGCodec().decode(JPEGCodec().encode(image))
+    assert jpeg_image.shape == image.shape
+
+
+def test_images_codec_order():
+    images = [np.full((32, 32, 3), i * 20, dtype=np.uint8) for i in range(8)]
+    data_chunk = cpe.DataChunk()
+    data_chunk.add("images", images, content_type="images")
+
+    new_data_chunk = cpe.DataChunk.from_bytes(data_chunk.to_frames())
+    new_images = new_data_chunk.get("images")["value"]
+    assert len(new_images) == len(images)
+    for i, image in enumerate(images):
+        assert np.abs(new_images[i].astype(int) - image).max() <= 2
+
+
+@pytest.mark.parametrize("order", ["C", "F"])
+@pytest.mark.parametrize("dtype", [np.float32, np.int16, np.uint8])
+def test_ndarray_content_type(order, dtype):
+    array = np.asarray((np.random.rand(20, 30, 4) * 100).astype(dtype), order=order)
+    data_chunk = cpe.DataChunk()
+    data_chunk.add("tensor", array, content_type="ndarray")
+
+    for new_data_chunk in [
+        cpe.DataChunk.from_bytes(data_chunk.to_bytes()),
+        cpe.DataChunk.from_bytes(data_chunk.to_frames()),
+    ]:
+        new_array = new_data_chunk.get("tensor")["value"]
+        assert new_array.dtype == array.dtype
+        assert np.array_equal(new_array, array)
+
+
+@pytest.mark.parametrize("order", ["C", "F"])
+def test_ndarray_codec_compression(depth_map, order):
+    array = np.asarray(depth_map, order=order)
+    encoded = NDArrayCodec(cname="lz4").encode(array)
+    assert isinstance(encoded, bytes)
+
+    # Any NDArrayCodec can decode both forms
+    new_array = NDArrayCodec().decode(encoded)
+    assert new_array.dtype == array.dtype
+    assert np.array_equal(new_array, array)
+
+    zeros = np.zeros((100, 100), dtype=np.float64)
+    assert len(NDArrayCodec(cname="lz4").encode(zeros)) < zeros.nbytes / 10
+
+
+def test_delta_image_codec():
+    sender, receiver = DeltaImageCodec(), DeltaImageCodec()
+    image = (np.random.rand(240, 320, 3) * 255).astype(np.uint8)
+
+    keyframe = sender.encode(image)
+    assert "data" in keyframe
+
+    # Before receiving a keyframe, nothing can be decoded
+    changed = image.copy()
+    changed[100:110, 200:220] = 0
+    delta = sender.encode(changed)
+    assert "data" not in delta and len(delta["patches"]) >= 1
+    assert receiver.decode(delta) is None
+
+    assert receiver.decode(keyframe).shape == image.shape
+    new_image = receiver.decode(delta)
+    assert new_image.shape == image.shape
+    assert np.abs(new_image[100:110, 200:220].astype(int)).mean() < 10
+
+    # Unchanged images only send empty patches
+    assert sender.encode(image)["patches"] == []
+
+    # Keyframes on request
+    sender.request_keyframe()
+    assert "data" in sender.encode(changed)
+
+
+def test_delta_image_codec_keys():
+    codec = DeltaImageCodec()
+    image = (np.random.rand(64, 64) * 255).astype(np.uint8)
+
+    # Each key keeps its own keyframe chain
+    assert "data" in codec.encode(image, key="node1/screen")
+    assert "data" in codec.encode(image, key="node2/screen")
+    assert codec.is_keyframe(codec.encode(image, key="node1/screen")) is False
+
+    # Requesting a keyframe only affects that key
+    codec.request_keyframe("node1/screen")
+    assert codec.is_keyframe(codec.encode(image, key="node1/screen"))
+    assert not codec.is_keyframe(codec.encode(image, key="node2/screen"))
+
+
+def test_image_stream_content_type():
+    image = (np.random.rand(64, 64) * 255).astype(np.uint8)
+    for i in range(3):
+        image[i * 10 : i * 10 + 5] = 0
+        data_chunk = cpe.DataChunk()
+        data_chunk.add("screen", image, content_type="image-stream")
+
+        # Decoded on reception, even if lazy, to keep the stream's state
+        new_data_chunk = cpe.DataChunk.from_bytes(data_chunk.to_frames(), lazy=True)
+        new_image = new_data_chunk.get("screen")["value"]
+        assert new_image.shape == image.shape
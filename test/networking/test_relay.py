@@ -0,0 +1,138 @@
+import asyncio
+from typing import Dict, List
+
+import pytest
+
+import chimerapy.engine as cpe
+from chimerapy.engine.networking import Publisher, Relay, Subscriber
+
+logger = cpe._logger.getLogger("chimerapy-engine")
+
+
+@pytest.fixture
+async def publisher():
+    pub = Publisher(policy="drop-newest", queue_size=1)
+    pub.start()
+    yield pub
+    pub.shutdown()
+
+
+@pytest.fixture
+async def relay(publisher):
+    relay = Relay(host=publisher.host, port=publisher.port)
+    await relay.start()
+    yield relay
+    await relay.shutdown()
+
+
+async def test_relay_forwards_to_local_subscribers(publisher, relay):
+
+    received: Dict[str, List[int]] = {"a": [], "b": []}
+
+    def update(datas: Dict[str, List]):
+        for id, messages in datas.items():
+            for frames in messages:
+                value = cpe.DataChunk.from_bytes(frames).get("i")["value"]
+                received[id].append(value)
+
+    # Both subscribers share the relay's single upstream connection
+    sub = Subscriber()
+    for id in received:
+        sub.subscribe(
+            host=relay.host,
+            port=relay.port,
+            id=id,
+            endpoints=relay.endpoints,
+            delivery="lossless",
+        )
+    sub.on_receive(update)
+    await sub.start()
+
+    pending = [publisher, relay.publisher]
+    for _ in range(50):
+        pending = [pub for pub in pending if not pub.has_new_subscribers()]
+        if not pending:
+            break
+        await asyncio.sleep(0.1)
+    await asyncio.sleep(0.1)
+
+    # The messages dropped by the publisher are still counted downstream
+    for i in range(5):
+        data_chunk = cpe.DataChunk()
+        data_chunk.add("i", i)
+        await publisher.publish(data_chunk.to_frames())
+    await asyncio.sleep(0.5)
+
+    data_chunk = cpe.DataChunk()
+    data_chunk.add("i", 5)
+    await publisher.publish(data_chunk.to_frames())
+    await asyncio.sleep(0.5)
+
+    assert received == {"a": [0, 5], "b": [0, 5]}
+    for subscription in sub.subscriptions.values():
+        assert subscription.stats.gaps == 1 and subscription.stats.dropped == 4
+
+    await sub.shutdown()
+
+
+async def test_relay_streams_delivery(publisher):
+    relay = Relay(
+        host=publisher.host,
+        port=publisher.port,
+        streams={"rgb": "conflate", "audio": "lossless"},
+    )
+    await relay.start()
+
+    # Latest-value streams don't queue, and the relay never waits
+    subscriptions = relay.subscriber.subscriptions
+    assert subscriptions["rgb"].delivery == "conflate" and subscriptions["rgb"].hwm == 1
+    assert subscriptions["audio"].delivery == "lossless"
+    assert relay.publisher.policy != "block"
+
+    await relay.shutdown()
+
+
+async def test_relay_forwards_all_streams(publisher, relay):
+
+    received: Dict[str, List[int]] = {"a": [], "b": []}
+
+    def update(datas: Dict[str, List]):
+        for id, messages in datas.items():
+            for frames in messages:
+                value = cpe.DataChunk.from_bytes(frames).get("i")["value"]
+                received[id].append(value)
+
+    sub = Subscriber()
+    for id in received:
+        sub.subscribe(
+            host=relay.host,
+            port=relay.port,
+            topic=id,
+            id=id,
+            endpoints=relay.endpoints,
+            delivery="lossless",
+        )
+    sub.on_receive(update)
+    await sub.start()
+
+    pending = [publisher, relay.publisher]
+    for _ in range(50):
+        pending = [pub for pub in pending if not pub.has_new_subscribers()]
+        if not pending:
+            break
+        await asyncio.sleep(0.1)
+    await asyncio.sleep(0.1)
+
+    # Without ``streams``, every stream of the publisher is relayed
+    for i in range(3):
+        data_chunk = cpe.DataChunk()
+        data_chunk.add("i", i)
+        await publisher.publish_streams(
+            {"a": data_chunk.to_frames(), "b": data_chunk.to_frames()}
+        )
+        await asyncio.sleep(0.1)
+    await asyncio.sleep(0.5)
+
+    assert received == {"a": [0, 1, 2], "b": [0, 1, 2]}
+
+    await sub.shutdown()
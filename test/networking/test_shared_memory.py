@@ -0,0 +1,30 @@
+import numpy as np
+
+from chimerapy.engine.networking.shared_memory import (
+    SharedMemoryReader,
+    SharedMemoryRing,
+)
+
+
+def test_shared_memory_ring():
+    ring = SharedMemoryRing(slots=2, slot_size=1024)
+    reader = SharedMemoryReader()
+
+    array = np.arange(100, dtype=np.float32)
+    descriptor = ring.write([b"HELLO", array])
+    buffers = reader.read(descriptor)
+    assert buffers is not None
+    assert bytes(buffers[0]) == b"HELLO"
+    assert np.array_equal(np.frombuffer(buffers[1], dtype=np.float32), array)
+
+    # Once the ring wraps around, the slot is overwritten, but the buffers
+    # read are copies
+    ring.write([b"A"])
+    ring.write([b"B"])
+    assert reader.read(descriptor) is None
+    assert bytes(buffers[0]) == b"HELLO"
+
+    assert not ring.fits([np.zeros(2048, dtype=np.uint8)])
+
+    reader.close()
+    ring.close()
@@ -1,11 +1,13 @@
 # Built-in Imports
 import asyncio
-from typing import Dict
+import os
+from typing import Dict, List
 
 import numpy as np
 
 # Third-party Imports
 import pytest
+import zmq
 from pytest_lazyfixture import lazy_fixture
 
 # Internal Imports
@@ -50,6 +52,15 @@ def image_data_chunk():
     return data
 
 
+@pytest.fixture
+def array_data_chunk():
+    # Create the data
+    data = cpe.DataChunk()
+    test_array = np.random.rand(480, 640, 3)
+    data.add(name="test_array", value=test_array)
+    return data
+
+
 async def test_pub_instance(publisher):
     ...
 
@@ -69,9 +80,9 @@ async def test_sending_data_chunk_between_pub_and_sub(
     flag = asyncio.Event()
     expected_data_chunk = None
 
-    def update(datas: Dict[str, bytes]):
+    def update(datas: Dict[str, List]):
         nonlocal expected_data_chunk
-        expected_data_chunk = cpe.DataChunk.from_bytes(datas["test"])
+        expected_data_chunk = cpe.DataChunk.from_bytes(datas["test"][-1])
         flag.set()
 
     subscriber.on_receive(update)
@@ -80,3 +91,419 @@ async def test_sending_data_chunk_between_pub_and_sub(
 
     await asyncio.wait_for(flag.wait(), timeout=5)
     assert expected_data_chunk == data_chunk
+
+
+async def test_sending_data_chunk_frames_between_pub_and_sub(
+    publisher, subscriber, array_data_chunk
+):
+
+    flag = asyncio.Event()
+    expected_data_chunk = None
+
+    def update(datas: Dict[str, List]):
+        nonlocal expected_data_chunk
+        expected_data_chunk = cpe.DataChunk.from_bytes(datas["test"][-1])
+        flag.set()
+
+    subscriber.on_receive(update)
+    await subscriber.start()
+    await publisher.publish(array_data_chunk.to_frames())
+
+    await asyncio.wait_for(flag.wait(), timeout=5)
+    assert np.array_equal(
+        expected_data_chunk.get("test_array")["value"],
+        array_data_chunk.get("test_array")["value"],
+    )
+
+
+async def test_publisher_detects_new_subscribers(publisher):
+    assert not publisher.has_new_subscribers()
+
+    sub = Subscriber()
+    sub.subscribe(host=publisher.host, port=publisher.port)
+    detected = False
+    for _ in range(50):
+        detected = publisher.has_new_subscribers()
+        if detected:
+            break
+        await asyncio.sleep(0.1)
+    assert detected
+
+    assert not publisher.has_new_subscribers()
+    await sub.shutdown()
+
+
+async def test_sending_data_chunk_through_shared_memory(publisher, array_data_chunk):
+    sub = Subscriber()
+    sub.subscribe(host=publisher.host, port=publisher.port, id="test", shm=True)
+
+    flag = asyncio.Event()
+    expected_data_chunk = None
+
+    def update(datas: Dict[str, List]):
+        nonlocal expected_data_chunk
+        # The buffers are in shared memory instead of in the message
+        frames = datas["test"][-1]
+        assert len(frames) == 2 and isinstance(frames[1], memoryview)
+        expected_data_chunk = cpe.DataChunk.from_bytes(frames)
+        flag.set()
+
+    sub.on_receive(update)
+    await sub.start()
+
+    # Wait for the subscription to reach the publisher
+    for _ in range(50):
+        await publisher.publish(array_data_chunk.to_frames())
+        if flag.is_set():
+            break
+        await asyncio.sleep(0.1)
+
+    await asyncio.wait_for(flag.wait(), timeout=5)
+    assert np.array_equal(
+        expected_data_chunk.get("test_array")["value"],
+        array_data_chunk.get("test_array")["value"],
+    )
+
+    del expected_data_chunk
+    await sub.shutdown()
+
+
+def test_shared_memory_size_limit(array_data_chunk):
+    pub = Publisher()
+    frames = array_data_chunk.to_frames()
+    assert len(pub._to_shm_frames(frames)[0]) > 0
+    pub._ring.close()
+    pub._ring = None
+
+    # Messages that don't fit in the limit go through the socket
+    max_size = cpe.config.get("comms.shm.max-size")
+    cpe.config.set("comms.shm.max-size", 1024)
+    try:
+        shm_frames = pub._to_shm_frames(frames)
+        assert shm_frames[0] == b"" and len(shm_frames) == len(frames) + 1
+        assert pub._ring is None
+    finally:
+        cpe.config.set("comms.shm.max-size", max_size)
+
+
+@pytest.mark.parametrize("transport", ["inproc", "ipc", "tcp"])
+async def test_subscriber_selects_cheapest_endpoint(
+    publisher, text_data_chunk, transport
+):
+    assert "tcp" in publisher.endpoints and "inproc" in publisher.endpoints
+    if transport == "ipc" and "ipc" not in publisher.endpoints:
+        pytest.skip("ipc not supported")
+
+    # Only give what's reachable for the transport
+    pid = os.getpid() if transport == "inproc" else None
+    endpoints = {k: v for k, v in publisher.endpoints.items() if k != "inproc"}
+    if transport == "inproc":
+        endpoints = publisher.endpoints
+    elif transport == "tcp":
+        endpoints = None
+
+    sub = Subscriber()
+    sub.subscribe(
+        host=publisher.host,
+        port=publisher.port,
+        id="test",
+        endpoints=endpoints,
+        pid=pid,
+    )
+    endpoint = sub.subscriptions["test"].socket.getsockopt_string(zmq.LAST_ENDPOINT)
+    assert endpoint.startswith(transport)
+
+    flag = asyncio.Event()
+    sub.on_receive(lambda datas: flag.set())
+    await sub.start()
+    for _ in range(50):
+        await publisher.publish(text_data_chunk.to_frames())
+        if flag.is_set():
+            break
+        await asyncio.sleep(0.1)
+
+    assert flag.is_set()
+    await sub.shutdown()
+
+
+@pytest.mark.parametrize(
+    "policy, queued, dropped",
+    [("drop-newest", 2, 3), ("drop-oldest", 5, 3), ("adaptive", 2, 3)],
+)
+async def test_publisher_backpressure_policies(
+    text_data_chunk, policy, queued, dropped
+):
+    pub = Publisher(policy=policy, queue_size=2)
+    pub.start()
+
+    # Without awaiting, the queue is not sent in between
+    for _ in range(5):
+        await pub.publish(text_data_chunk.to_frames())
+    assert pub.queue_length == 2
+    assert pub.stats.queued == queued
+    assert pub.stats.dropped == dropped
+
+    await asyncio.sleep(0.1)
+    assert pub.queue_length == 0
+    assert pub.stats.sent == 2
+    pub.shutdown()
+
+
+async def test_publisher_on_drop(text_data_chunk):
+    pub = Publisher(policy="drop-oldest", queue_size=2)
+    dropped = []
+    pub.on_drop = dropped.append
+    pub.start()
+
+    for i in range(5):
+        await pub.publish(text_data_chunk.to_frames(), tag=i)
+    assert dropped == [0, 1, 2]
+    pub.shutdown()
+
+
+async def test_publisher_block_policy(text_data_chunk):
+    pub = Publisher(policy="block", queue_size=1)
+    pub.start()
+
+    for _ in range(5):
+        await pub.publish(text_data_chunk.to_frames())
+    await asyncio.sleep(0.1)
+
+    assert pub.stats.dropped == 0
+    assert pub.stats.sent == 5
+    pub.shutdown()
+
+
+async def wait_for_subscription(publisher):
+    for _ in range(50):
+        if publisher.has_new_subscribers():
+            break
+        await asyncio.sleep(0.1)
+    # The subscription arrives before the connection is ready on all ends
+    await asyncio.sleep(0.1)
+
+
+async def test_lossless_subscription_receives_every_message():
+    pub = Publisher(policy="block", queue_size=10)
+    pub.start()
+    sub = Subscriber()
+    sub.subscribe(host=pub.host, port=pub.port, id="test", delivery="lossless")
+
+    received: List[int] = []
+
+    def update(datas: Dict[str, List]):
+        for frames in datas["test"]:
+            received.append(cpe.DataChunk.from_bytes(frames).get("i")["value"])
+
+    sub.on_receive(update)
+    await sub.start()
+    await wait_for_subscription(pub)
+
+    for i in range(100):
+        data_chunk = cpe.DataChunk()
+        data_chunk.add("i", i)
+        await pub.publish(data_chunk.to_frames())
+
+    for _ in range(50):
+        if len(received) == 100:
+            break
+        await asyncio.sleep(0.1)
+
+    assert received == list(range(100))
+    assert sub.subscriptions["test"].sequences == {"": 99}
+    stats = sub.subscriptions["test"].stats
+    assert stats.received == 100 and stats.gaps == 0 and stats.dropped == 0
+
+    await sub.shutdown()
+    pub.shutdown()
+
+
+@pytest.mark.parametrize("delivery", ["conflate", "lossless"])
+async def test_subscriber_detects_gaps(text_data_chunk, delivery):
+    pub = Publisher(policy="drop-newest", queue_size=1)
+    pub.start()
+    sub = Subscriber()
+    sub.subscribe(host=pub.host, port=pub.port, id="test", delivery=delivery)
+
+    flag = asyncio.Event()
+    sub.on_receive(lambda datas: flag.set())
+    await sub.start()
+    await wait_for_subscription(pub)
+
+    # Only the first message is queued, the next four are dropped
+    for _ in range(5):
+        await pub.publish(text_data_chunk.to_frames())
+    await asyncio.wait_for(flag.wait(), timeout=5)
+    flag.clear()
+
+    await pub.publish(text_data_chunk.to_frames())
+    await asyncio.wait_for(flag.wait(), timeout=5)
+
+    assert sub.subscriptions["test"].sequences == {"": 5}
+    stats = sub.subscriptions["test"].stats
+    assert stats.received == 2 and stats.gaps == 1 and stats.dropped == 4
+
+    await sub.shutdown()
+    pub.shutdown()
+
+
+async def test_subscriber_delivers_queued_messages_in_one_batch(text_data_chunk):
+    pubs = [Publisher(policy="block", queue_size=10) for _ in range(3)]
+    sub = Subscriber()
+    for i, pub in enumerate(pubs):
+        pub.start()
+        sub.subscribe(host=pub.host, port=pub.port, id=str(i), delivery="lossless")
+    for pub in pubs:
+        await wait_for_subscription(pub)
+
+    # Queued before the subscriber starts receiving
+    for pub in pubs:
+        for _ in range(10):
+            await pub.publish(text_data_chunk.to_frames())
+    await asyncio.sleep(0.5)
+
+    batches: List[Dict[str, List]] = []
+    sub.on_receive(batches.append)
+    await sub.start()
+    await asyncio.sleep(0.5)
+
+    assert len(batches) == 1
+    assert {k: len(v) for k, v in batches[0].items()} == {str(i): 10 for i in range(3)}
+    for subscription in sub.subscriptions.values():
+        assert subscription.stats.received == 10
+
+    await sub.shutdown()
+    for pub in pubs:
+        pub.shutdown()
+
+
+async def test_subscriber_limits_messages_per_pass(text_data_chunk):
+    pub = Publisher(policy="block", queue_size=10)
+    pub.start()
+    sub = Subscriber()
+    sub.subscribe(host=pub.host, port=pub.port, id="test", delivery="lossless")
+    await wait_for_subscription(pub)
+
+    for _ in range(10):
+        await pub.publish(text_data_chunk.to_frames())
+    await asyncio.sleep(0.5)
+
+    batches: List[Dict[str, List]] = []
+    sub.on_receive(batches.append, with_streams=True)
+    drain_max = cpe.config.get("comms.drain-max")
+    cpe.config.set("comms.drain-max", 4)
+    try:
+        await sub.start()
+        await asyncio.sleep(0.5)
+    finally:
+        cpe.config.set("comms.drain-max", drain_max)
+
+    assert [len(batch["test"]) for batch in batches] == [4, 4, 2]
+    assert [sequence for _, sequence, _ in batches[0]["test"]] == [0, 1, 2, 3]
+    assert all(stream == "" for batch in batches for stream, _, _ in batch["test"])
+
+    await sub.shutdown()
+    pub.shutdown()
+
+
+async def test_conflate_keeps_the_latest_message_of_each_stream(text_data_chunk):
+    pub = Publisher(policy="block", queue_size=10)
+    pub.start()
+    sub = Subscriber()
+    sub.subscribe(
+        host=pub.host, port=pub.port, topic=None, id="test", delivery="lossless"
+    )
+    await wait_for_subscription(pub)
+
+    # Conflating the messages queued by the (deeper) lossless queue
+    sub.subscriptions["test"].delivery = "conflate"
+
+    # Queued before the subscriber starts receiving
+    for stream in ["a", "b", "a"]:
+        await pub.publish_streams({stream: text_data_chunk.to_frames()})
+    await asyncio.sleep(0.5)
+
+    batches: List[Dict[str, List]] = []
+    sub.on_receive(batches.append, with_streams=True)
+    await sub.start()
+    await asyncio.sleep(0.5)
+
+    assert len(batches) == 1
+    assert [(stream, sequence) for stream, sequence, _ in batches[0]["test"]] == [
+        ("b", 0),
+        ("a", 1),
+    ]
+    stats = sub.subscriptions["test"].stats
+    assert stats.received == 2 and stats.gaps == 0 and stats.dropped == 1
+
+    await sub.shutdown()
+    pub.shutdown()
+
+
+async def test_conflate_subscription_to_all_streams(text_data_chunk):
+    pub = Publisher(policy="block", queue_size=10)
+    pub.start()
+    sub = Subscriber()
+    sub.subscribe(host=pub.host, port=pub.port, topic=None, id="test")
+
+    received: Dict[str, int] = {}
+
+    async def update(datas: Dict[str, List]):
+        for stream, sequence, _ in datas["test"]:
+            received[stream] = sequence
+        await asyncio.sleep(0.05)
+
+    sub.on_receive(update, with_streams=True)
+    await sub.start()
+    await wait_for_subscription(pub)
+
+    # Slower than the publisher, but no stream starves the other
+    for _ in range(300):
+        await pub.publish_streams({"a": text_data_chunk.to_frames()})
+        await pub.publish_streams({"b": text_data_chunk.to_frames()})
+    await asyncio.sleep(0.5)
+
+    assert received == {"a": 299, "b": 299}
+
+    await sub.shutdown()
+    pub.shutdown()
+
+
+async def test_subscribers_only_receive_their_stream(publisher):
+    sub = Subscriber()
+    sub.subscribe(host=publisher.host, port=publisher.port, id="all")
+    sub.subscribe(host=publisher.host, port=publisher.port, topic="depth", id="depth")
+
+    received: Dict[str, List[str]] = {"all": [], "depth": []}
+
+    def update(datas: Dict[str, List]):
+        for id, messages in datas.items():
+            for frames in messages:
+                received[id].append(cpe.DataChunk.from_bytes(frames).contains())
+
+    sub.on_receive(update)
+    await sub.start()
+    for _ in range(50):
+        if publisher.is_subscribed("depth") and publisher.is_subscribed(""):
+            break
+        await asyncio.sleep(0.1)
+    await asyncio.sleep(0.1)
+    assert not publisher.is_subscribed("rgb")
+    assert not publisher.is_subscribed("dept")
+
+    data_chunk = cpe.DataChunk()
+    data_chunk.add("rgb", "RGB")
+    data_chunk.add("depth", "DEPTH")
+    await publisher.publish_streams(
+        {
+            "": data_chunk.to_frames(),
+            "depth": data_chunk.select(["depth"]).to_frames(),
+            "rgb": data_chunk.select(["rgb"]).to_frames(),
+        }
+    )
+    await asyncio.sleep(0.5)
+
+    assert received == {"all": [["rgb", "depth"]], "depth": [["depth"]]}
+    assert sub.subscriptions["depth"].sequences == {"depth": 0}
+
+    await sub.shutdown()
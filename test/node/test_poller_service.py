@@ -1,12 +1,17 @@
 import asyncio
+import threading
+import time
+from itertools import zip_longest
 
 import pytest
 
 import chimerapy.engine as cpe
 from chimerapy.engine.data_protocols import NodePubEntry, NodePubTable
-from chimerapy.engine.eventbus import EventBus
+from chimerapy.engine.eventbus import EventBus, TypedObserver
+from chimerapy.engine.networking import Codec, register_codec
 from chimerapy.engine.networking.data_chunk import DataChunk
 from chimerapy.engine.networking.publisher import Publisher
+from chimerapy.engine.node.events import NewInBoundDataEvent
 from chimerapy.engine.node.poller_service import PollerService
 from chimerapy.engine.states import NodeState
 
@@ -74,3 +79,215 @@ async def test_poll_message(poller_setup):
     # Sleep
     await asyncio.sleep(1)
     assert poller.eventbus._event_counts > 0
+
+
+def make_data_chunk(sequence: int, created: int) -> DataChunk:
+    data_chunk = DataChunk()
+    meta = data_chunk.get("meta")
+    meta["value"]["sequence"] = sequence
+    meta["value"]["created"] = created
+    data_chunk.update("meta", meta)
+    data_chunk.add("sequence", sequence)
+    return data_chunk
+
+
+@pytest.mark.parametrize(
+    "sync, a, b, expected",
+    [
+        ("exact-sequence", [0, 1, 2, 3, 4], [0, 2, 4], [(0, 0), (2, 2), (4, 4)]),
+        (
+            "approximate-time",
+            [0, 10, 20, 30, 40],
+            [1, 18, 19, 45, 62],
+            [(0, 1), (20, 19), (40, 45)],
+        ),
+    ],
+)
+def test_sync_policies(sync, a, b, expected):
+
+    poller = PollerService(
+        "poller",
+        in_bound=["a_id", "b_id"],
+        in_bound_by_name=["a", "b"],
+        state=NodeState(),
+        eventbus=EventBus(),
+        sync=sync,
+        slop=5e-9,  # 5 ns
+    )
+
+    matches = []
+    for key_a, key_b in zip_longest(a, b):
+        if key_a is not None:
+            poller._buffer("a_id", make_data_chunk(key_a, key_a))
+        if key_b is not None:
+            poller._buffer("b_id", make_data_chunk(key_b, key_b))
+        for matched in poller._match():
+            matches.append(
+                (
+                    matched["a"].get("sequence")["value"],
+                    matched["b"].get("sequence")["value"],
+                )
+            )
+
+    assert matches == expected
+    unmatched = poller.stats["a_id"].unmatched + poller.stats["b_id"].unmatched
+    assert unmatched == len(a) + len(b) - 2 * len(expected) - sum(
+        len(buffer) for buffer in poller.buffers.values()
+    )
+
+
+def test_sync_buffers_are_bounded():
+
+    poller = PollerService(
+        "poller",
+        in_bound=["a_id", "b_id"],
+        in_bound_by_name=["a", "b"],
+        state=NodeState(),
+        eventbus=EventBus(),
+        sync="exact-sequence",
+        buffer_size=4,
+    )
+
+    # The other input never arrives
+    for i in range(10):
+        poller._buffer("a_id", make_data_chunk(i, i))
+        assert list(poller._match()) == []
+
+    assert len(poller.buffers["a_id"]) == 4
+    assert poller.stats["a_id"].unmatched == 6
+
+
+async def test_batching_input_sets():
+
+    eventbus = EventBus()
+    poller = PollerService(
+        "poller",
+        in_bound=["a_id"],
+        in_bound_by_name=["a"],
+        state=NodeState(),
+        eventbus=eventbus,
+        batch_size=3,
+        batch_timeout=0.1,
+    )
+
+    batches = []
+
+    async def receive(data_chunks):
+        batches.append(data_chunks)
+
+    observer = TypedObserver(
+        "in_step", NewInBoundDataEvent, on_asend=receive, handle_event="unpack"
+    )
+    await eventbus.asubscribe(observer)
+
+    # A full batch is sent right away, the rest once timed out
+    for i in range(4):
+        await poller._step({"a": make_data_chunk(i, i)})
+    assert [len(batch) for batch in batches] == [3]
+
+    await asyncio.sleep(0.3)
+    assert [len(batch) for batch in batches] == [3, 1]
+    assert batches[1][0]["a"].get("sequence")["value"] == 3
+
+    await poller.teardown()
+
+
+class SlowCodec(Codec):
+    def encode(self, value):
+        return value
+
+    def decode(self, data):
+        time.sleep(0.2)
+        return threading.current_thread().name
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+async def test_decoding_inputs_in_parallel_off_the_loop(lazy):
+
+    register_codec("slow", SlowCodec(), overwrite=True)
+
+    eventbus = EventBus()
+    poller = PollerService(
+        "poller",
+        in_bound=["a_id", "b_id"],
+        in_bound_by_name=["a", "b"],
+        follow="a_id",
+        state=NodeState(),
+        eventbus=eventbus,
+        lazy=lazy,
+    )
+
+    steps = []
+
+    async def receive(data_chunks):
+        steps.append(data_chunks)
+
+    observer = TypedObserver(
+        "in_step", NewInBoundDataEvent, on_asend=receive, handle_event="unpack"
+    )
+    await eventbus.asubscribe(observer)
+
+    data_chunk = DataChunk()
+    data_chunk.add("value", 0, "slow")
+    frames = data_chunk.to_frames()
+
+    tic = time.perf_counter()
+    await poller.update_data({"a_id": [("", 0, frames)], "b_id": [("", 0, frames)]})
+    assert time.perf_counter() - tic < (0.1 if lazy else 0.35)
+
+    # Lazily, the records are decoded by the step that uses them
+    assert len(steps) == 1
+    for name in ["a", "b"]:
+        decoded_by = steps[0][name].get("value")["value"]
+        assert decoded_by.startswith("decoding") != lazy
+
+    await poller.teardown()
+
+
+def test_merging_replicas_outputs_in_order():
+
+    poller = PollerService(
+        "poller",
+        in_bound=["b0_id", "b1_id"],
+        in_bound_by_name=["b", "b"],
+        follow="b_id",
+        state=NodeState(),
+        eventbus=EventBus(),
+        merge={"b0_id": "b_id", "b1_id": "b_id"},
+    )
+    assert poller.inputs == ["b_id"]
+
+    def output(order):
+        data_chunk = make_data_chunk(order, order)
+        meta = data_chunk.get("meta")
+        meta["value"]["order"] = order
+        data_chunk.update("meta", meta)
+        return data_chunk
+
+    def merge(in_bound_id, order):
+        merged = poller._merge(in_bound_id, output(order))
+        return [data_chunk.get("sequence")["value"] for data_chunk in merged]
+
+    # Waiting for both replicas, then in order
+    assert merge("b1_id", 1) == []
+    assert merge("b0_id", 0) == [0, 1]
+    assert merge("b1_id", 3) == []
+    assert merge("b0_id", 2) == [2, 3]
+
+    # A missing output (4) is skipped once both replicas are past it
+    assert merge("b1_id", 5) == []
+    assert merge("b0_id", 6) == [5, 6]
+
+
+def test_replica_share_of_the_followed_input():
+
+    poller = PollerService(
+        "poller",
+        in_bound=["a_id"],
+        in_bound_by_name=["a"],
+        follow="a_id",
+        state=NodeState(),
+        eventbus=EventBus(),
+        replica=(1, 3),
+    )
+    assert [s for s in range(9) if poller._is_mine(s)] == [1, 4, 7]
@@ -1,11 +1,12 @@
 import asyncio
+import threading
 import time
 from typing import Dict
 
 import pytest
 from pytest_lazyfixture import lazy_fixture
 
-from chimerapy.engine import _logger
+from chimerapy.engine import _logger, config
 from chimerapy.engine.eventbus import Event, EventBus, TypedObserver
 from chimerapy.engine.networking.data_chunk import DataChunk
 from chimerapy.engine.node.events import NewInBoundDataEvent, NewOutBoundDataEvent
@@ -193,3 +194,210 @@ async def test_main(ptype, processor_setup):
     assert CHANGE_FLAG
     if ptype == "step":
         assert RECEIVE_FLAG
+
+
+async def test_batched_step_publishes_outputs_individually():
+
+    eventbus = EventBus()
+    processor = ProcessorService(
+        "processor",
+        in_bound_data=True,
+        state=NodeState(),
+        eventbus=eventbus,
+        main_fn=lambda data_chunks: [len(data_chunks)] * len(data_chunks),
+        operation_mode="step",
+        batched=True,
+    )
+    await processor.async_init()
+    await processor.setup()
+
+    outputs = []
+
+    async def receive(data_chunk):
+        outputs.append(data_chunk.get("default")["value"])
+
+    observer = TypedObserver(
+        "out_step", NewOutBoundDataEvent, on_asend=receive, handle_event="unpack"
+    )
+    await eventbus.asubscribe(observer)
+
+    await processor.safe_step([{"data": DataChunk()} for _ in range(4)])
+    assert outputs == [4, 4, 4, 4]
+
+    await processor.teardown()
+
+
+def make_input_set(sequence):
+    data_chunk = DataChunk()
+    meta = data_chunk.get("meta")
+    meta["value"]["sequence"] = sequence
+    data_chunk.update("meta", meta)
+    return {"data": data_chunk}
+
+
+@pytest.mark.parametrize("outputs_per_batch, expected", [(4, [0, 1, 2, 3]), (1, [])])
+async def test_replicated_batched_step_orders_each_output(outputs_per_batch, expected):
+
+    eventbus = EventBus()
+    processor = ProcessorService(
+        "processor",
+        in_bound_data=True,
+        state=NodeState(),
+        eventbus=eventbus,
+        main_fn=lambda data_chunks: ["output"] * outputs_per_batch,
+        operation_mode="step",
+        batched=True,
+        order_by="data",
+    )
+    await processor.async_init()
+    await processor.setup()
+
+    orders = []
+
+    async def receive(data_chunk):
+        orders.append(data_chunk.get("meta")["value"]["order"])
+
+    observer = TypedObserver(
+        "out_step", NewOutBoundDataEvent, on_asend=receive, handle_event="unpack"
+    )
+    await eventbus.asubscribe(observer)
+
+    # Each output has the order of its own input, a batch with fewer outputs
+    # can't be merged
+    await processor.safe_step([make_input_set(i) for i in range(4)])
+    assert orders == expected
+
+    await processor.teardown()
+
+
+@pytest.mark.parametrize(
+    "step_time, expected_steps, spin_wait",
+    [
+        (0, 200, False),
+        (0, 200, True),
+        (0.02, 50, False),  # each step overruns its period
+    ],
+)
+async def test_source_steps_at_its_rate(step_time, expected_steps, spin_wait):
+
+    config.set("sources.spin-wait", spin_wait)
+
+    processor = ProcessorService(
+        "processor",
+        in_bound_data=False,
+        state=NodeState(),
+        eventbus=EventBus(),
+        main_fn=lambda: time.sleep(step_time),
+        operation_mode="step",
+        rate=200,
+    )
+    await processor.async_init()
+    await processor.setup()
+
+    async def stop():
+        await asyncio.sleep(1)
+        await processor.stop()
+
+    try:
+        await asyncio.gather(processor.main(), stop())
+    finally:
+        config.set("sources.spin-wait", False)
+
+    stats = processor.stats
+    assert 0.9 * expected_steps <= stats.steps <= 1.1 * expected_steps
+    if step_time:
+        assert stats.overruns == stats.steps
+    else:
+        assert stats.overruns < stats.steps / 10
+        assert stats.jitter < 1  # ms
+
+    await processor.teardown()
+
+
+async def test_pipelined_steps_keep_their_order():
+    def slow_step(data_chunks):
+        time.sleep(0.05)
+        value = data_chunks["data"].get("value")["value"]
+        return (value, threading.current_thread().name)
+
+    eventbus = EventBus()
+    processor = ProcessorService(
+        "processor",
+        in_bound_data=True,
+        state=NodeState(),
+        eventbus=eventbus,
+        main_fn=slow_step,
+        operation_mode="step",
+        pipelined=True,
+    )
+    await processor.async_init()
+    await processor.setup()
+    await processor.main()
+
+    outputs = []
+
+    async def receive(data_chunk):
+        outputs.append(data_chunk.get("default")["value"])
+
+    observer = TypedObserver(
+        "out_step", NewOutBoundDataEvent, on_asend=receive, handle_event="unpack"
+    )
+    await eventbus.asubscribe(observer)
+
+    for i in range(5):
+        data_chunk = DataChunk()
+        data_chunk.add("value", i)
+        await eventbus.asend(
+            Event("in_step", NewInBoundDataEvent({"data": data_chunk}))
+        )
+
+    # Only blocked by the bounded queues, while the steps run in a thread
+    assert len(outputs) < 5
+    await asyncio.sleep(0.5)
+    assert [value for value, _ in outputs] == list(range(5))
+    assert all(thread.startswith("step") for _, thread in outputs)
+
+    await processor.teardown()
+
+
+async def test_pipelined_stages_survive_errors():
+    eventbus = EventBus()
+    processor = ProcessorService(
+        "processor",
+        in_bound_data=True,
+        state=NodeState(),
+        eventbus=eventbus,
+        main_fn=lambda data_chunks: data_chunks["data"].get("value")["value"],
+        operation_mode="step",
+        pipelined=True,
+    )
+    await processor.async_init()
+    await processor.setup()
+    await processor.main()
+
+    outputs = []
+
+    async def receive(data_chunk):
+        value = data_chunk.get("default")["value"]
+        if value == 2:
+            raise ValueError("Failed publishing")
+        outputs.append(value)
+
+    observer = TypedObserver(
+        "out_step", NewOutBoundDataEvent, on_asend=receive, handle_event="unpack"
+    )
+    await eventbus.asubscribe(observer)
+
+    for i in range(1, 6):
+        data_chunk = DataChunk()
+        data_chunk.add("value", i)
+        await eventbus.asend(
+            Event("in_step", NewInBoundDataEvent({"data": data_chunk}))
+        )
+
+    # Only the failed output is lost
+    await asyncio.sleep(0.5)
+    assert outputs == [1, 3, 4, 5]
+    assert processor.step_id == 5
+
+    await processor.teardown()
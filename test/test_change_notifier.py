@@ -0,0 +1,41 @@
+import asyncio
+import time
+
+import pytest
+
+import chimerapy.engine as cpe
+from chimerapy.engine.utils import ChangeNotifier
+
+logger = cpe._logger.getLogger("chimerapy-engine")
+
+
+@pytest.fixture
+def notifier():
+    return ChangeNotifier()
+
+
+async def test_wait_for_wakes_on_change(notifier):
+    state = {"fsm": "NULL"}
+
+    async def change():
+        for fsm in ["INITIALIZED", "READY"]:
+            await asyncio.sleep(0.05)
+            state["fsm"] = fsm
+            notifier.notify()
+
+    task = asyncio.create_task(change())
+    start = time.perf_counter()
+    assert await notifier.wait_for(lambda: state["fsm"] == "READY", timeout=1)
+    assert time.perf_counter() - start < 0.1 + 0.05
+    await task
+
+
+async def test_wait_for_already_true(notifier):
+    assert await notifier.wait_for(lambda: True, timeout=1)
+
+
+async def test_wait_for_timeout(notifier):
+    assert not await notifier.wait_for(lambda: False, timeout=0.1)
+    with pytest.raises(TimeoutError):
+        await notifier.wait_for(lambda: False, timeout=0.1, timeout_raise=True)
+    assert not notifier._waiters
@@ -1,10 +1,13 @@
 import json
+import threading
+import time
 
 import numpy as np
 import pytest
 from pytest_lazyfixture import lazy_fixture
 
 import chimerapy.engine as cpe
+from chimerapy.engine.networking import Codec, register_codec
 
 
 @pytest.fixture
@@ -50,3 +53,134 @@ def test_jsonify_data_chunk(data_chunk):
     json_data = json.dumps(data_chunk.to_json())
     new_data_chunk = cpe.DataChunk.from_json(json.loads(json_data))
     assert data_chunk == new_data_chunk
+
+
+def test_data_chunk_frames_round_trip():
+    data_chunk = cpe.DataChunk()
+    array = np.random.rand(100, 50).astype(np.float32)
+    data_chunk.add("array", array)
+    data_chunk.add("msg", "HELLO")
+
+    frames = data_chunk.to_frames()
+    assert len(frames) == 2
+
+    new_data_chunk = cpe.DataChunk.from_bytes(frames)
+    new_array = new_data_chunk.get("array")["value"]
+    assert new_array.dtype == array.dtype
+    assert np.array_equal(new_array, array)
+    assert new_data_chunk.get("msg")["value"] == "HELLO"
+
+
+def test_data_chunk_lazy_decoding():
+    class CountingCodec(Codec):
+        def __init__(self):
+            self.decodes = 0
+
+        def encode(self, value):
+            return value.encode()
+
+        def decode(self, data):
+            self.decodes += 1
+            return bytes(data).decode()
+
+    codec = CountingCodec()
+    register_codec("counting", codec, overwrite=True)
+
+    data_chunk = cpe.DataChunk()
+    data_chunk.add("msg", "HELLO", "counting")
+
+    new_data_chunk = cpe.DataChunk.from_bytes(data_chunk.to_frames(), lazy=True)
+    assert codec.decodes == 0
+
+    # Re-sending an undecoded record reuses its encoding
+    resent_data_chunk = cpe.DataChunk.from_bytes(new_data_chunk.to_bytes())
+    assert codec.decodes == 1
+    assert resent_data_chunk.get("msg")["value"] == "HELLO"
+
+    assert new_data_chunk.get("msg")["value"] == "HELLO"
+    assert new_data_chunk.get("msg")["value"] == "HELLO"
+    assert codec.decodes == 2
+
+
+def test_data_chunk_serialize_once():
+    data_chunk = cpe.DataChunk()
+    array = np.random.rand(100, 50).astype(np.float32)
+    data_chunk.add("array", array)
+    data_chunk.add("msg", "HELLO")
+
+    frames = data_chunk.to_frames()
+    assert data_chunk.to_frames()[0] is frames[0]
+    assert data_chunk.to_bytes() is data_chunk.to_bytes()
+
+    sizes = data_chunk.get_sizes()
+    assert sizes["array"] == array.nbytes
+    assert "msg" in sizes and "meta" in sizes
+
+    # Changing a record invalidates the cached serialization
+    data_chunk.add("msg", "HELLO WORLD")
+    assert data_chunk.to_frames()[0] is not frames[0]
+    assert data_chunk.get_sizes()["msg"] > sizes["msg"]
+    new_data_chunk = cpe.DataChunk.from_bytes(data_chunk.to_frames())
+    assert new_data_chunk.get("msg")["value"] == "HELLO WORLD"
+
+
+def test_data_chunk_select_shares_encoded_records():
+    data_chunk = cpe.DataChunk()
+    rgb = (np.random.rand(20, 20, 3) * 255).astype(np.uint8)
+    data_chunk.add("rgb", rgb, content_type="image")
+    data_chunk.add("depth", np.random.rand(20, 20), content_type="ndarray")
+    data_chunk.to_frames()
+
+    depth_data_chunk = data_chunk.select(["depth"])
+    assert depth_data_chunk.contains() == ["depth"]
+    assert depth_data_chunk._encoded["depth"] is data_chunk._encoded["depth"]
+
+    new_data_chunk = cpe.DataChunk.from_bytes(depth_data_chunk.to_frames())
+    assert np.array_equal(
+        new_data_chunk.get("depth")["value"], data_chunk.get("depth")["value"]
+    )
+    assert new_data_chunk.get("meta")["value"]["created"] == (
+        data_chunk.get("meta")["value"]["created"]
+    )
+
+
+def test_data_chunk_encode_only_some_records():
+    data_chunk = cpe.DataChunk()
+    data_chunk.add("rgb", np.zeros((20, 20, 3), dtype=np.uint8), content_type="image")
+    data_chunk.add("depth", np.random.rand(20, 20), content_type="ndarray")
+    data_chunk.encode(["depth"])
+    assert list(data_chunk._encoded) == ["depth"]
+
+    depth_data_chunk = data_chunk.select(["depth"])
+    assert depth_data_chunk._encoded["depth"] is data_chunk._encoded["depth"]
+
+
+def test_data_chunk_is_lightweight():
+    data_chunk = cpe.DataChunk()
+    assert not hasattr(data_chunk, "__dict__")
+    assert data_chunk._uuid is None
+    assert data_chunk.uuid == data_chunk.uuid
+
+    meta = data_chunk.get("meta")["value"]
+    assert isinstance(meta["created"], int)
+
+    # Wall clock, comparable between machines
+    assert abs(meta["created"] - time.time_ns()) < 1e9
+
+
+def test_data_chunk_concurrent_serialization(video_data_chunk):
+    frames = []
+    threads = [
+        threading.Thread(target=lambda: frames.append(video_data_chunk.to_frames()))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    data_bytes = video_data_chunk.to_bytes()
+    for thread in threads:
+        thread.join()
+
+    # Each record is encoded once, shared by all the serialized forms
+    assert all(f[1] is frames[0][1] for f in frames)
+    new_data_chunk = cpe.DataChunk.from_bytes(data_bytes)
+    assert new_data_chunk.contains() == ["image"]
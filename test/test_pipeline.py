@@ -77,3 +77,43 @@ def test_graph_simple_visualization(graph):
 
     # Visualize the graph
     graph.plot()
+
+
+def test_graph_expand_replicas():
+
+    a = cpe.Node(name="a")
+    b = cpe.Node(name="b")
+    c = cpe.Node(name="c")
+
+    graph = cpe.Graph()
+    graph.add_node(a)
+    graph.add_node(b, replicas=3)
+    graph.add_node(c)
+    graph.add_edge(a, b)
+    graph.add_edge(b, c)
+
+    expanded, replicas = graph.expand_replicas()
+
+    assert list(replicas) == [b.id]
+    assert not expanded.has_node_by_id(b.id)
+    for index, replica_id in enumerate(replicas[b.id]):
+        data = expanded.G.nodes[replica_id]
+        assert data["replica"] == (index, 3)
+        assert data["replica_of"] == b.id
+        assert data["follow"] == a.id
+        assert expanded.G.edges[a.id, replica_id]["delivery"] == "lossless"
+        assert expanded.G.has_edge(replica_id, c.id)
+
+    # The nodes after the replicas still follow the replicated node
+    assert expanded.G.nodes[c.id]["follow"] == b.id
+    assert graph.has_node_by_id(b.id)
+
+
+def test_graph_replicas_need_inputs():
+
+    a = cpe.Node(name="a")
+    graph = cpe.Graph()
+    graph.add_node(a, replicas=2)
+
+    with pytest.raises(ValueError):
+        graph.expand_replicas()
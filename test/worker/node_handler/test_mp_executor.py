@@ -2,14 +2,17 @@ import asyncio
 
 # import multiprocess as mp
 import multiprocessing as mp
+import os
 import time
 from concurrent.futures import Future
 
+import multiprocess
 import pytest
 
 import chimerapy.engine as cpe
 from chimerapy.engine.worker.node_handler_service.context_session import (
     MultiprocessExecutor,
+    ProcessExecutor,
 )
 
 logger = cpe._logger.getLogger("chimerapy-engine")
@@ -33,6 +36,20 @@ def worker(running, counter):
     return counter.value
 
 
+def failing_worker():
+    raise ValueError("failed")
+
+
+def crashing_worker():
+    os._exit(3)
+
+
+def preloaded_worker():
+    import sys
+
+    return os.getpid(), "json" in sys.modules
+
+
 def test_instance_mp_manager(mp_manager):
     running = mp_manager.Value("i", 1)
     counter = mp_manager.Value("i", 0)
@@ -76,3 +93,67 @@ async def test_mp_executor(mp_manager):
     running.value = 0
     final_counter = await future
     assert final_counter != 0
+
+
+@pytest.mark.parametrize("start_method", ["spawn", "forkserver"])
+async def test_process_executor(start_method):
+    # With the processes' library, for them to authenticate with the manager
+    mp_manager = multiprocess.Manager()
+    running = mp_manager.Value("i", 1)
+    counters = [mp_manager.Value("i", 0) for _ in range(2)]
+
+    loop = asyncio.get_running_loop()
+    executor = ProcessExecutor(start_method)
+
+    # A process per function, running concurrently
+    futures = [
+        loop.run_in_executor(executor, worker, running, counter) for counter in counters
+    ]
+    await asyncio.sleep(2)
+    assert len({process.pid for process in executor.processes}) == 2
+
+    running.value = 0
+    assert all(final_counter != 0 for final_counter in await asyncio.gather(*futures))
+
+    with pytest.raises(ValueError):
+        await loop.run_in_executor(executor, failing_worker)
+    with pytest.raises(RuntimeError):
+        await loop.run_in_executor(executor, crashing_worker)
+
+    executor.shutdown()
+    assert not executor.processes
+    mp_manager.shutdown()
+
+
+async def wait_for(condition):
+    for _ in range(100):
+        if condition():
+            return True
+        await asyncio.sleep(0.1)
+    return False
+
+
+async def test_process_executor_warm_processes():
+    loop = asyncio.get_running_loop()
+    executor = ProcessExecutor("spawn", warm=2, preload=["json"])
+
+    # Only started once a process is used
+    assert not executor.idle
+    pid, _ = await loop.run_in_executor(executor, preloaded_worker)
+    assert await wait_for(lambda: len(executor.idle) == 2)
+    warm_pids = {process.pid for process, _ in executor.idle}
+    assert pid not in warm_pids
+
+    # Taken by the idle processes, which are replaced
+    results = await asyncio.gather(
+        *[loop.run_in_executor(executor, preloaded_worker) for _ in range(2)]
+    )
+    assert {pid for pid, _ in results} == warm_pids
+    assert all(preloaded for _, preloaded in results)
+    assert await wait_for(lambda: len(executor.idle) == 2)
+
+    # And the exited processes are no longer tracked
+    assert await wait_for(lambda: not executor.processes)
+
+    executor.shutdown()
+    assert not executor.idle and not executor.processes
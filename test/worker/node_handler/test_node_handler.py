@@ -137,6 +137,20 @@ async def test_create_node_along_with_different_context(
     assert await node_handler.async_destroy_node(con_node.id)
 
 
+@pytest.mark.parametrize("context", ["multiprocessing", "threading"])
+async def test_create_nodes(node_handler_setup, gen_node, con_node, context):
+    node_handler, _ = node_handler_setup
+    results = await node_handler.async_create_nodes(
+        [
+            cpe.NodeConfig(gen_node, context=context),
+            cpe.NodeConfig(con_node, context=context),
+        ]
+    )
+    assert results == {gen_node.id: True, con_node.id: True}
+    assert await node_handler.async_destroy_node(gen_node.id)
+    assert await node_handler.async_destroy_node(con_node.id)
+
+
 @linux_run_only
 async def test_create_unknown_node(node_handler_setup):
 
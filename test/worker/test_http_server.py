@@ -25,6 +25,11 @@ def pickled_gen_node_config(gen_node):
     return pickle.dumps(NodeConfig(gen_node))
 
 
+@pytest.fixture
+def pickled_gen_node_configs(gen_node):
+    return pickle.dumps([NodeConfig(gen_node)])
+
+
 @pytest.fixture
 async def http_server():
 
@@ -65,9 +70,15 @@ async def test_http_server_instanciate(http_server):
     "route_type, route, payload",
     [
         ("post", "/nodes/create", lazy_fixture("pickled_gen_node_config")),
+        ("post", "/nodes/create_batch", lazy_fixture("pickled_gen_node_configs")),
         ("post", "/nodes/destroy", json.dumps({"id": 0})),
         ("get", "/nodes/pub_table", None),
         ("post", "/nodes/pub_table", NodePubTable().to_json()),
+        (
+            "post",
+            "/nodes/relays",
+            json.dumps({"node_pub_table": NodePubTable().to_dict()}),
+        ),
         ("get", "/nodes/gather", None),
         ("post", "/nodes/collect", json.dumps({"path": str(TEST_DATA_DIR)})),
         ("post", "/nodes/step", json.dumps({})),